@@ -0,0 +1,172 @@
+"""
+Compares the encodings of the lazy import table on a package that exports
+many names: the default literals, the compact strings (``--lazy_compact``)
+and the ``_mkinit_index.json`` sidecar file (``--lazy_sidecar``).
+
+For each encoding the benchmark reports the size of the generated
+``__init__.py``, the time to compile it, and, in fresh interpreters, the
+time and memory (tracemalloc) to import the package with and without a
+``__pycache__``, as well as the time of the first attribute access.
+
+CommandLine:
+    python dev/bench/bench_lazy_table.py
+    python dev/bench/bench_lazy_table.py --num_modules=50 --attrs_per_module=100 --repeat=20
+"""
+
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from os.path import join
+
+_IMPORT_SCRIPT = """
+import json
+import sys
+import time
+import tracemalloc
+tracemalloc.start()
+start = time.perf_counter()
+import {pkgname}
+import_seconds = time.perf_counter() - start
+current, peak = tracemalloc.get_traced_memory()
+start = time.perf_counter()
+getattr({pkgname}, {attr!r})
+access_seconds = time.perf_counter() - start
+print(json.dumps({{
+    'import_seconds': import_seconds,
+    'access_seconds': access_seconds,
+    'current_bytes': current,
+    'peak_bytes': peak,
+}}))
+"""
+
+
+def make_wide_package(dpath, pkgname, num_modules, attrs_per_module):
+    """
+    Writes a flat package whose submodules each define many cheap names.
+    """
+    root = join(dpath, pkgname)
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    os.makedirs(root)
+    with open(join(root, '__init__.py'), 'w') as file:
+        file.write('')
+    for mod_idx in range(num_modules):
+        lines = [
+            'm{}_name{} = {}'.format(mod_idx, attr_idx, attr_idx)
+            for attr_idx in range(attrs_per_module)
+        ]
+        with open(join(root, 'mod{}.py'.format(mod_idx)), 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+    return root
+
+
+def _run_import(dpath, pkgname, attr, keep_cache):
+    if not keep_cache:
+        shutil.rmtree(join(dpath, pkgname, '__pycache__'), ignore_errors=True)
+    env = os.environ.copy()
+    env['PYTHONPATH'] = dpath
+    env.pop('EAGER_IMPORT', None)
+    script = _IMPORT_SCRIPT.format(pkgname=pkgname, attr=attr)
+    out = subprocess.check_output([sys.executable, '-c', script], env=env)
+    return json.loads(out)
+
+
+ENCODINGS = {
+    'default': {},
+    'compact': {'lazy_compact': True},
+    'sidecar': {'lazy_sidecar': True},
+}
+
+
+def bench_encoding(dpath, encoding, args):
+    import mkinit
+
+    pkgname = 'wide_' + encoding
+    root = make_wide_package(
+        dpath, pkgname, args.num_modules, args.attrs_per_module
+    )
+    mkinit.autogen_init(
+        root,
+        options={'lazy_import': True, **ENCODINGS[encoding]},
+        dry=False,
+    )
+    with open(join(root, '__init__.py'), 'r') as file:
+        text = file.read()
+
+    compile_durations = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        compile(text, '__init__.py', 'exec')
+        compile_durations.append(time.perf_counter() - start)
+
+    attr = 'm{}_name{}'.format(args.num_modules - 1, args.attrs_per_module - 1)
+    # The last cold import writes the cache used by the warm runs
+    cold = [
+        _run_import(dpath, pkgname, attr, False) for _ in range(args.repeat)
+    ]
+    warm = [_run_import(dpath, pkgname, attr, True) for _ in range(args.repeat)]
+
+    def median(runs, key):
+        return statistics.median(run[key] for run in runs)
+
+    return {
+        'encoding': encoding,
+        'init_bytes': len(text.encode('utf8')),
+        'init_lines': text.count('\n'),
+        'compile_seconds': statistics.median(compile_durations),
+        'cold_import_seconds': median(cold, 'import_seconds'),
+        'warm_import_seconds': median(warm, 'import_seconds'),
+        'first_access_seconds': median(warm, 'access_seconds'),
+        'import_current_bytes': median(warm, 'current_bytes'),
+        'import_peak_bytes': median(warm, 'peak_bytes'),
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--num_modules', type=int, default=50)
+    parser.add_argument('--attrs_per_module', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--out', default=None)
+    args = parser.parse_args()
+
+    dpath = tempfile.mkdtemp(prefix='mkinit_bench_lazy_table_')
+    try:
+        results = [
+            bench_encoding(dpath, encoding, args) for encoding in ENCODINGS
+        ]
+    finally:
+        shutil.rmtree(dpath)
+
+    num_names = args.num_modules * args.attrs_per_module
+    print('Lazy import table with {} names'.format(num_names))
+    keys = [k for k in results[0] if k != 'encoding']
+    row_fmt = '{:<24}' + ' {:>12}' * len(results)
+    print(row_fmt.format('metric', *ENCODINGS))
+    for key in keys:
+        values = [row[key] for row in results]
+        if key.endswith('_seconds'):
+            cells = ['{:.2f}ms'.format(v * 1000) for v in values]
+        else:
+            cells = ['{}'.format(v) for v in values]
+        print(row_fmt.format(key, *cells))
+
+    if args.out is not None:
+        data = {
+            'python': sys.version,
+            'num_names': num_names,
+            'results': results,
+        }
+        with open(args.out, 'w') as file:
+            json.dump(data, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark :func:`mkinit.static_analysis.parse_static_value` against the
+previous implementation, which walked every node of the tree.
+
+The synthetic module imitates generated code (e.g. protobuf or ORM models),
+with many classes and functions and ``__all__`` defined at the top.
+
+CommandLine:
+    python dev/bench/bench_parse_static_value.py
+    python dev/bench/bench_parse_static_value.py --num_classes=5000
+"""
+
+import ast
+import timeit
+
+from mkinit.static_analysis import _parse_static_node_value, parse_static_value
+
+
+def legacy_parse_static_value(key, source):
+    """
+    The generic NodeVisitor implementation this benchmark compares against
+    """
+    pt = ast.parse(source)
+
+    class AssignentVisitor(ast.NodeVisitor):
+        def visit_Assign(self, node):
+            for target in node.targets:
+                target_id = getattr(target, 'id', None)
+                if target_id == key:
+                    self.value = _parse_static_node_value(node.value)
+
+        def visit_AnnAssign(self, node):
+            target_id = getattr(node.target, 'id', None)
+            if target_id == key:
+                if node.value is not None:
+                    self.value = _parse_static_node_value(node.value)
+
+    sentinal = object()
+    visitor = AssignentVisitor()
+    visitor.value = sentinal
+    visitor.visit(pt)
+    if visitor.value is sentinal:
+        raise NameError('No static variable named {!r}'.format(key))
+    return visitor.value
+
+
+def make_generated_module(num_classes):
+    names = ['Message{}'.format(idx) for idx in range(num_classes)]
+    lines = ['__all__ = {!r}'.format(names), '']
+    for name in names:
+        lines.extend(
+            [
+                'class {}:'.format(name),
+                '    field_a = 1',
+                '    field_b = "b"',
+                '',
+                '    def serialize(self, stream):',
+                '        result = {"a": self.field_a, "b": self.field_b}',
+                '        for key, value in result.items():',
+                '            stream.write(key, value)',
+                '        return result',
+                '',
+            ]
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--num_classes', type=int, default=2000)
+    parser.add_argument('--number', type=int, default=5)
+    args = parser.parse_args()
+
+    source = make_generated_module(args.num_classes)
+    num_lines = source.count('\n') + 1
+    print('Synthetic module with {} lines'.format(num_lines))
+
+    assert parse_static_value('__all__', source) == legacy_parse_static_value(
+        '__all__', source
+    )
+
+    cases = {
+        'ast.parse only': lambda: ast.parse(source),
+        'legacy parse_static_value': lambda: legacy_parse_static_value(
+            '__all__', source
+        ),
+        'parse_static_value': lambda: parse_static_value('__all__', source),
+        'parse_static_value (missing key)': lambda: _missing(source),
+    }
+    for label, func in cases.items():
+        seconds = min(timeit.repeat(func, number=args.number, repeat=3))
+        print('{:<34} {:8.2f} ms'.format(label, 1000 * seconds / args.number))
+
+
+def _missing(source):
+    try:
+        parse_static_value('__version__', source)
+    except NameError:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+Benchmarks the stages of the static pipeline on synthetic packages of
+increasing size and writes the timings as JSON.
+
+Stages:
+
+    * ``static_init`` - generate the text of the root package only
+    * ``autogen_init_recursive`` - generate and write every package in a
+      freshly written tree, without the persistent parse cache
+    * ``autogen_init_recursive_cold_cache`` - the same with an empty parse
+      cache, which is filled during the run
+    * ``autogen_init_recursive_warm_cache`` - the same with a parse cache
+      that already has every module of the tree
+    * ``find_insert_points`` - locate the autogen region of a large init
+    * ``initstr`` - format the root package's imports
+
+The package is written again before each repeat of the ``autogen_init``
+stages (which is not timed), so every repeat generates and writes every
+init. Apart from the cache stages, the persistent parse cache is disabled,
+so the timings include parsing.
+
+CommandLine:
+    python dev/bench/bench_static_pipeline.py
+    python dev/bench/bench_static_pipeline.py --sizes=1,10,100 --out=bench.json
+    python dev/bench/bench_static_pipeline.py --sizes=1,10,100,1000,10000 --repeat=1
+"""
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import warnings
+from os.path import dirname, join
+
+sys.path.insert(0, dirname(__file__))
+
+from synthetic_package import make_synthetic_package  # NOQA: E402
+
+DEFAULT_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def _time(func, repeat, setup=None):
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return {
+        'min_seconds': min(durations),
+        'mean_seconds': sum(durations) / len(durations),
+        'repeat': repeat,
+    }
+
+
+def _make_large_init_lines(num_lines):
+    """
+    A hand-maintained style init with a large ``__module_properties__`` class
+    and an autogenerated region at the end.
+    """
+    lines = ['"""\n', 'Large init\n', '"""\n', "__version__ = '1.0'\n"]
+    lines.append('class __module_properties__:\n')
+    num_props = max(1, num_lines // 4)
+    for idx in range(num_props):
+        lines += [
+            '    @property\n',
+            '    def prop{}(self):\n'.format(idx),
+            '        return {}\n'.format(idx),
+            '\n',
+        ]
+    lines.append("__submodules__ = ['a', 'b']\n")
+    lines.append('from .a import x\n')
+    return lines
+
+
+def bench_size(dpath, num_modules, args):
+    import shutil
+
+    import mkinit
+    from mkinit import cache
+    from mkinit.formatting import _find_insert_points, _initstr
+    from mkinit.static_mkinit import _static_parse_imports
+
+    def _make_package():
+        return make_synthetic_package(
+            dpath,
+            num_modules,
+            depth=args.depth,
+            modules_per_package=args.modules_per_package,
+            attrs_per_module=args.attrs_per_module,
+            all_fraction=args.all_fraction,
+            decl_density=args.decl_density,
+        )
+
+    info = _make_package()
+    root = info['root']
+    cache_dpath = join(dpath, 'parse_cache')
+    repeat = args.repeat
+    results = []
+
+    def _record(stage, timing):
+        row = {
+            'stage': stage,
+            'num_modules': num_modules,
+            'num_packages': info['num_packages'],
+        }
+        row.update(timing)
+        results.append(row)
+        print(
+            '{:>6} modules {:<34} {:10.4f} s'.format(
+                num_modules, stage, timing['min_seconds']
+            ),
+            file=sys.stderr,
+        )
+
+    _record('static_init', _time(lambda: mkinit.static_init(root), repeat))
+
+    def _autogen():
+        mkinit.autogen_init(root, recursive=True, jobs=args.jobs)
+
+    def _setup_no_cache():
+        _make_package()
+        cache.set_parse_cache(None)
+
+    def _setup_cold_cache():
+        _make_package()
+        shutil.rmtree(cache_dpath, ignore_errors=True)
+        cache.set_parse_cache(cache_dpath)
+
+    def _setup_warm_cache():
+        # The modules are rewritten with the same content, which the cache
+        # still recognizes
+        _make_package()
+        cache.set_parse_cache(cache_dpath)
+
+    _record('autogen_init_recursive', _time(_autogen, repeat, _setup_no_cache))
+    _record(
+        'autogen_init_recursive_cold_cache',
+        _time(_autogen, repeat, _setup_cold_cache),
+    )
+    _record(
+        'autogen_init_recursive_warm_cache',
+        _time(_autogen, repeat, _setup_warm_cache),
+    )
+    cache.set_parse_cache(None)
+    lines = _make_large_init_lines(num_modules * 10)
+    _record(
+        'find_insert_points', _time(lambda: _find_insert_points(lines), repeat)
+    )
+
+    # Format all names of every module at once, which is the largest init
+    # this package could produce.
+    modname, imports, from_imports = _static_parse_imports(root)
+    for pkg_dpath, _, _ in os.walk(root):
+        if pkg_dpath == root:
+            continue
+        _, sub_imports, sub_from_imports = _static_parse_imports(pkg_dpath)
+        from_imports += sub_from_imports
+    _record(
+        'initstr',
+        _time(lambda: _initstr(modname, imports, from_imports), repeat),
+    )
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        '--sizes',
+        default=','.join(map(str, DEFAULT_SIZES)),
+        help='comma separated numbers of modules',
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--modules_per_package', type=int, default=10)
+    parser.add_argument('--attrs_per_module', type=int, default=10)
+    parser.add_argument('--all_fraction', type=float, default=0.5)
+    parser.add_argument('--decl_density', type=float, default=0.5)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--dpath', default=None, help='where to write packages')
+    parser.add_argument(
+        '--out', default=None, help='write JSON here instead of stdout'
+    )
+    args = parser.parse_args()
+
+    import mkinit
+    from mkinit import cache
+
+    # The cache stages use their own cache directories
+    cache.set_parse_cache(None)
+
+    # Synthetic inits use __module_properties__ without the lazy option
+    warnings.filterwarnings('ignore', message='Only the custom lazy option')
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    dpath = args.dpath or tempfile.mkdtemp(prefix='mkinit_bench_')
+
+    results = []
+    for num_modules in sizes:
+        results += bench_size(join(dpath, str(num_modules)), num_modules, args)
+
+    data = {
+        'meta': {
+            'mkinit_version': mkinit.__version__,
+            'python': sys.version,
+            'platform': platform.platform(),
+            'params': {k: v for k, v in args.__dict__.items() if k != 'out'},
+        },
+        'results': results,
+    }
+    text = json.dumps(data, indent=2)
+    if args.out is None:
+        print(text)
+    else:
+        with open(args.out, 'w') as file:
+            file.write(text)
+        print('Wrote {}'.format(args.out), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
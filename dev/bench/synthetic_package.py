@@ -0,0 +1,200 @@
+"""
+Generates synthetic packages for benchmarking the static pipeline.
+
+CommandLine:
+    python dev/bench/synthetic_package.py --dpath=/tmp/synth --num_modules=100
+"""
+
+import math
+import os
+import random
+from os.path import join
+
+
+def make_synthetic_package(
+    dpath,
+    num_modules,
+    pkgname='synth_pkg',
+    depth=3,
+    modules_per_package=10,
+    attrs_per_module=10,
+    all_fraction=0.5,
+    decl_density=0.5,
+    module_properties=True,
+    seed=0,
+):
+    """
+    Writes a package with ``num_modules`` modules spread over a tree of
+    subpackages. Any existing package with the same name is replaced.
+
+    Args:
+        dpath (str): directory to write the package into
+
+        num_modules (int): total number of (non-init) modules
+
+        pkgname (str): name of the root package
+
+        depth (int): maximum depth of nested subpackages
+
+        modules_per_package (int): number of modules in each package
+
+        attrs_per_module (int): number of top-level names in each module
+
+        all_fraction (float): fraction of modules that define ``__all__``
+
+        decl_density (float): fraction of package ``__init__.py`` files with
+            user declarations (``__ignore__``, ``__explicit__``,
+            ``__module_properties__``) and user code.
+
+        module_properties (bool): if False, no ``__module_properties__``
+            classes are written. Only the lazy boilerplate supports them, so
+            eagerly generated packages can only be imported without them.
+
+        seed (int): random seed
+
+    Returns:
+        Dict: the root path and the number of packages and modules
+    """
+    import shutil
+
+    rng = random.Random(seed)
+    root = join(dpath, pkgname)
+    if os.path.exists(root):
+        shutil.rmtree(root)
+
+    num_packages = max(1, math.ceil(num_modules / modules_per_package))
+    # Choose a branching factor so all packages fit in the requested depth
+    branching = max(1, math.ceil(num_packages ** (1 / max(depth, 1))))
+    if branching == 1 and num_packages > 1:
+        branching = 2
+
+    # Create package paths breadth first
+    pkg_dpaths = [root]
+    frontier = [root]
+    while len(pkg_dpaths) < num_packages:
+        next_frontier = []
+        for parent in frontier:
+            for idx in range(branching):
+                if len(pkg_dpaths) >= num_packages:
+                    break
+                child = join(parent, 'sub{}'.format(idx))
+                pkg_dpaths.append(child)
+                next_frontier.append(child)
+        frontier = next_frontier
+
+    for pkg_dpath in pkg_dpaths:
+        os.makedirs(pkg_dpath, exist_ok=True)
+
+    for mod_idx in range(num_modules):
+        pkg_dpath = pkg_dpaths[mod_idx // modules_per_package]
+        fpath = join(pkg_dpath, 'mod{}.py'.format(mod_idx))
+        text = _make_module_text(mod_idx, attrs_per_module, all_fraction, rng)
+        with open(fpath, 'w') as file:
+            file.write(text)
+
+    for pkg_idx, pkg_dpath in enumerate(pkg_dpaths):
+        text = ''
+        if rng.random() < decl_density:
+            text = _make_user_init_text(pkg_idx, rng, module_properties)
+        with open(join(pkg_dpath, '__init__.py'), 'w') as file:
+            file.write(text)
+
+    info = {
+        'root': root,
+        'num_packages': len(pkg_dpaths),
+        'num_modules': num_modules,
+        'branching': branching,
+    }
+    return info
+
+
+def _make_module_text(mod_idx, attrs_per_module, all_fraction, rng):
+    lines = [
+        '"""',
+        'Synthetic module {}'.format(mod_idx),
+        '"""',
+        'import os',
+        '',
+    ]
+    names = []
+    for attr_idx in range(attrs_per_module):
+        kind = attr_idx % 4
+        name = 'm{}_attr{}'.format(mod_idx, attr_idx)
+        if kind == 0:
+            lines += [
+                'def {}(x, y=None):'.format(name),
+                '    """Docstring"""',
+                '    if y is None:',
+                '        y = os.sep',
+                '    return x, y',
+                '',
+            ]
+        elif kind == 1:
+            name = name.capitalize()
+            lines += [
+                'class {}:'.format(name),
+                '    value = 1',
+                '',
+                '    def method(self):',
+                '        return self.value',
+                '',
+            ]
+        elif kind == 2:
+            lines += ['{}: int = {}'.format(name, attr_idx), '']
+        else:
+            name = '_' + name
+            lines += ['{} = {!r}'.format(name, str(attr_idx)), '']
+        names.append(name)
+    if rng.random() < all_fraction:
+        public = [n for n in names if not n.startswith('_')]
+        exported = public[: max(1, len(public) // 2)]
+        lines.insert(4, '__all__ = {!r}'.format(exported))
+    return '\n'.join(lines) + '\n'
+
+
+def _make_user_init_text(pkg_idx, rng, module_properties=True):
+    # User code comes before the declarations, because mkinit regenerates
+    # the text after the last declaration
+    header = [
+        '"""',
+        'Synthetic package {}'.format(pkg_idx),
+        '"""',
+    ]
+    code = []
+    decls = ["__version__ = '0.1.{}'".format(pkg_idx)]
+    if rng.random() < 0.5:
+        decls.append("__ignore__ = ['*_attr1']")
+    if rng.random() < 0.5:
+        decls.append("__explicit__ = ['user_func']")
+        code += ['', 'def user_func():', '    return 1', '']
+    if rng.random() < 0.3 and module_properties:
+        code += [
+            '',
+            'class __module_properties__:',
+            '    @property',
+            '    def lazy_value(self):',
+            '        return 1',
+            '',
+        ]
+    lines = header + code + [''] + decls
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dpath', required=True)
+    parser.add_argument('--num_modules', type=int, default=100)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--modules_per_package', type=int, default=10)
+    parser.add_argument('--attrs_per_module', type=int, default=10)
+    parser.add_argument('--all_fraction', type=float, default=0.5)
+    parser.add_argument('--decl_density', type=float, default=0.5)
+    args = parser.parse_args()
+    info = make_synthetic_package(**args.__dict__)
+    print('info = {!r}'.format(info))
+
+
+if __name__ == '__main__':
+    main()
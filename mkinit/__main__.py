@@ -1,12 +1,21 @@
-def main():
+def main(argv=None):
     """
     The mkinit CLI main
+
+    Args:
+        argv (List[str] | None): the arguments, defaults to ``sys.argv[1:]``
+
+    Returns:
+        int: the exit code, which is 1 if ``--check`` found out of date
+            files or a name given to ``--lookup`` is not defined by any
+            module, and 0 otherwise
     """
     import argparse
     import logging
+    import sys
     import textwrap
 
-    from mkinit import static_mkinit
+    from mkinit import cache, static_mkinit
 
     description = textwrap.dedent(
         """
@@ -39,6 +48,10 @@ def main():
             `__ignore__` - Tells mkinit to ignore particular attributes.
                 Supports glob patterns: e.g., ['DEPRECATED_*', '_*']
 
+            `__lazy__` - Submodules to import lazily with a `lazy_import`
+                boilerplate while the others are imported eagerly.
+                Supports glob patterns: e.g., ['plot*']
+
             `__module_properties__` - can be a class with properties that will
                 be exposed on a module level if using mkinits lazy boilerplate.
         """
@@ -76,6 +89,39 @@ def main():
         default=False,
     )
 
+    parser.add_argument(
+        '--diff-format',
+        '--diff_format',
+        dest='diff_format',
+        default='ndiff',
+        choices=['ndiff', 'unified'],
+        help=(
+            'The format used by --diff. The ndiff format with intraline '
+            'hints (always highlighted), or a faster unified diff (colored '
+            'when stdout is a terminal)'
+        ),
+    )
+
+    parser.add_argument(
+        '--check',
+        dest='check',
+        action='store_true',
+        default=False,
+        help=(
+            'Do not write or show anything (a --manifest is only read). '
+            'Exit with status 1 if any __init__.py file is out of date. Stops '
+            'at the first out of date file unless --all is given.'
+        ),
+    )
+
+    parser.add_argument(
+        '--all',
+        dest='check_all',
+        action='store_true',
+        default=False,
+        help='With --check, find and list every out of date file',
+    )
+
     parser.add_argument(
         '--noattrs',
         dest='with_attrs',
@@ -132,6 +178,68 @@ def main():
         ),
     )
 
+    parser.add_argument(
+        '--lazy_thread_safe',
+        '--lazy-thread-safe',
+        action='store_true',
+        default=False,
+        help=(
+            'Implies --lazy. Generates a lazy __getattr__ that locks each '
+            'name on first access, so concurrent threads import it only once'
+        ),
+    )
+
+    parser.add_argument(
+        '--lazy_telemetry',
+        '--lazy-telemetry',
+        action='store_true',
+        default=False,
+        help=(
+            'Implies --lazy. Generates a lazy __getattr__ that records the '
+            'time taken to resolve each name in __lazy_import_times__. Set '
+            'the LAZY_IMPORT_TELEMETRY environment variable to 1 or a file '
+            'path to dump the times at exit'
+        ),
+    )
+
+    parser.add_argument(
+        '--lazy_parallel_eager',
+        '--lazy-parallel-eager',
+        action='store_true',
+        default=False,
+        help=(
+            'Implies --lazy. When EAGER_IMPORT is set, the generated '
+            'lazy_import warms independent submodules on a thread pool with '
+            'EAGER_IMPORT_WORKERS threads (default 8)'
+        ),
+    )
+
+    parser.add_argument(
+        '--lazy_compact',
+        '--lazy-compact',
+        action='store_true',
+        default=False,
+        help=(
+            'Implies --lazy. Encodes the names exported by each submodule as '
+            'one space separated string and builds the name index on the '
+            'first attribute access. Intended for packages with thousands '
+            'of names'
+        ),
+    )
+
+    parser.add_argument(
+        '--lazy_sidecar',
+        '--lazy-sidecar',
+        action='store_true',
+        default=False,
+        help=(
+            'Implies --lazy. Writes the table of lazily imported names to a '
+            '_mkinit_index.json file next to each __init__.py, which loads '
+            'it on the first attribute access and checks it with an embedded '
+            'hash'
+        ),
+    )
+
     parser.add_argument(
         '--black',
         action='store_true',
@@ -154,6 +262,161 @@ def main():
         help='If specified, runs mkinit on all subpackages in a package',
     )
 
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        dest='jobs',
+        type=int,
+        default=1,
+        help=(
+            'Number of worker processes used to generate subpackages in '
+            '--recursive mode. Packages are generated after all of their '
+            'subpackages. Use 0 for one worker per CPU.'
+        ),
+    )
+
+    parser.add_argument(
+        '--manifest',
+        dest='manifest',
+        nargs='?',
+        const=True,
+        default=None,
+        help=(
+            'Record the inputs of each generated __init__.py in a manifest '
+            'and skip packages whose inputs have not changed since. If no '
+            'path is given, uses .mkinit-manifest.json next to the package.'
+        ),
+    )
+
+    parser.add_argument(
+        '--watch',
+        dest='watch',
+        action='store_true',
+        default=False,
+        help=(
+            'Keep running and regenerate the __init__.py files affected by '
+            'changes to the package until interrupted'
+        ),
+    )
+
+    parser.add_argument(
+        '--watch-interval',
+        '--watch_interval',
+        dest='watch_interval',
+        type=float,
+        default=0.5,
+        help='Seconds between checks for changes with --watch',
+    )
+
+    parser.add_argument(
+        '--watch-debounce',
+        '--watch_debounce',
+        dest='watch_debounce',
+        type=float,
+        default=0.2,
+        help=(
+            'Seconds without further changes to wait before regenerating '
+            'with --watch'
+        ),
+    )
+
+    parser.add_argument(
+        '--profile',
+        dest='profile',
+        nargs='?',
+        const='text',
+        default=None,
+        choices=['text', 'json'],
+        help=(
+            'Print the wall time and number of calls of each phase of the '
+            'run and the slowest files to stderr, as a table or as json.'
+        ),
+    )
+
+    parser.add_argument(
+        '--profile-top',
+        '--profile_top',
+        dest='profile_top',
+        type=int,
+        default=10,
+        help='Number of slowest files to show with --profile',
+    )
+
+    parser.add_argument(
+        '--import-profile',
+        '--import_profile',
+        dest='import_profile',
+        nargs='?',
+        const='text',
+        default=None,
+        choices=['text', 'json'],
+        help=(
+            'Instead of generating, import each submodule in a separate '
+            '``python -X importtime`` process and print the self and '
+            'cumulative import time and number of modules pulled in by each, '
+            'as a table or as json.'
+        ),
+    )
+
+    parser.add_argument(
+        '--export-index',
+        '--export_index',
+        dest='export_index',
+        nargs='?',
+        const='-',
+        default=None,
+        metavar='FPATH',
+        help=(
+            'Instead of generating, analyze the package and all of its '
+            'subpackages and write an index of the names exported by every '
+            'module and of the modules that define each name as JSON to '
+            'FPATH (or stdout). Nothing is imported or written otherwise.'
+        ),
+    )
+
+    parser.add_argument(
+        '--lookup',
+        nargs='+',
+        metavar='NAME',
+        default=None,
+        help=(
+            'With --export-index, only output the modules that define each '
+            'of these names'
+        ),
+    )
+
+    parser.add_argument(
+        '--import-costs',
+        '--import_costs',
+        dest='import_costs',
+        default=None,
+        help=(
+            'A JSON file written by --import-profile=json. Submodules that '
+            'take at least --lazy-threshold milliseconds to import are '
+            'imported lazily and the others eagerly.'
+        ),
+    )
+
+    parser.add_argument(
+        '--lazy-threshold',
+        '--lazy_threshold',
+        dest='lazy_threshold',
+        type=float,
+        default=10.0,
+        help='Milliseconds of import time at which --import-costs makes a submodule lazy',
+    )
+
+    parser.add_argument(
+        '--report',
+        dest='report',
+        default=None,
+        help=(
+            'Write a JSON report of the packages that were generated or '
+            'skipped, the files read and written, and which outputs changed '
+            'to this path'
+        ),
+    )
+
     parser.add_argument(
         '--norespect_all',
         '--norespect-all',
@@ -178,6 +441,26 @@ def main():
         ),
     )
 
+    parser.add_argument(
+        '--cache-dir',
+        '--cache_dir',
+        dest='cache_dir',
+        default=None,
+        help=(
+            'Directory for the persistent parse cache. Defaults to the '
+            'MKINIT_CACHE_DIR environment variable or ~/.cache/mkinit/parse'
+        ),
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        '--no_cache',
+        dest='no_cache',
+        action='store_true',
+        default=False,
+        help='Do not use the persistent parse cache',
+    )
+
     parser.add_argument(
         '--verbose', nargs='?', default=0, type=int, help='Verbosity level'
     )
@@ -189,16 +472,29 @@ def main():
     import os
 
     if os.environ.get('MKINIT_ARGPARSE_LOOSE', ''):
-        args, unknown = parser.parse_known_args()
+        args, unknown = parser.parse_known_args(argv)
     else:
-        args = parser.parse_args()
+        args = parser.parse_args(argv)
     ns = args.__dict__.copy()
 
     if ns['version']:
         import mkinit
 
         print(mkinit.__version__)
-        return
+        return 0
+
+    if ns['lookup'] is not None and ns['export_index'] is None:
+        parser.error('--lookup requires --export-index')
+    if ns['watch']:
+        incompatible = {
+            '--jobs': ns['jobs'] != 1,
+            '--manifest': ns['manifest'] is not None,
+            '--check': ns['check'],
+            '--report': ns['report'] is not None,
+        }
+        for flag, given in incompatible.items():
+            if given:
+                parser.error('{} cannot be used with --watch'.format(flag))
 
     modname_or_path = ns['modname_or_path']
     if ns['verbose'] is None:
@@ -215,6 +511,20 @@ def main():
             '--lazy_boilerplate cannot be specified with --lazy_loader or --lazy_loader_typed. Use --lazy instead.'
         )
 
+    for key in [
+        'lazy_thread_safe',
+        'lazy_telemetry',
+        'lazy_parallel_eager',
+        'lazy_compact',
+        'lazy_sidecar',
+    ]:
+        if ns[key] and (ns['lazy_loader'] or ns['lazy_loader_typed']):
+            raise ValueError(
+                '--{} cannot be specified with --lazy_loader or --lazy_loader_typed. Use --lazy instead.'.format(
+                    key
+                )
+            )
+
     if not ns['with_all'] and ns['lazy_loader_typed']:
         raise ValueError('--noall cannot be combined with --lazy_loader_typed')
 
@@ -231,10 +541,24 @@ def main():
         'with_mods': ns['with_mods'],
         'with_all': ns['with_all'],
         'relative': ns['relative'] or ns['lazy_loader_typed'],
-        'lazy_import': ns['lazy'],
+        'lazy_import': (
+            ns['lazy']
+            or ns['lazy_thread_safe']
+            or ns['lazy_telemetry']
+            or ns['lazy_parallel_eager']
+            or ns['lazy_compact']
+            or ns['lazy_sidecar']
+        ),
         'lazy_loader': ns['lazy_loader'] or ns['lazy_loader_typed'],
         'lazy_loader_typed': ns['lazy_loader_typed'],
         'lazy_boilerplate': ns['lazy_boilerplate'],
+        'lazy_thread_safe': ns['lazy_thread_safe'],
+        'lazy_telemetry': ns['lazy_telemetry'],
+        'lazy_parallel_eager': ns['lazy_parallel_eager'],
+        'lazy_compact': ns['lazy_compact'],
+        'lazy_sidecar': ns['lazy_sidecar'],
+        'import_costs': ns['import_costs'],
+        'lazy_threshold': ns['lazy_threshold'],
         'use_black': ns['black'],
         'source_order': ns['source_order'],
     }
@@ -242,6 +566,40 @@ def main():
     diff = ns['diff']
     if diff:
         dry = True
+        diff = ns['diff_format']
+
+    if ns['no_cache']:
+        cache.set_parse_cache(None)
+    elif ns['cache_dir']:
+        cache.set_parse_cache(ns['cache_dir'])
+
+    if ns['export_index'] is not None:
+        # Runs before logging is set up so stdout only has the JSON
+        import json
+
+        from mkinit.export_index import ExportIndex
+
+        index = ExportIndex.build(
+            modname_or_path,
+            respect_all=respect_all,
+            options=options,
+            jobs=ns['jobs'],
+        )
+        if ns['lookup'] is None:
+            text = index.dumps()
+        else:
+            found = {
+                name: index.defining_modules(name) for name in ns['lookup']
+            }
+            text = json.dumps(found, indent=2)
+        if ns['export_index'] == '-':
+            print(text)
+        else:
+            with open(ns['export_index'], 'w') as file:
+                file.write(text + '\n')
+        if ns['lookup'] is not None and not all(found.values()):
+            return 1
+        return 0
 
     if verbose == 0:
         level = logging.WARNING
@@ -258,16 +616,76 @@ def main():
         level=level,
     )
 
+    if ns['import_profile']:
+        from mkinit.import_profile import profile_submodules
+
+        import_prof = profile_submodules(modname_or_path)
+        if ns['import_profile'] == 'json':
+            print(import_prof.dumps())
+        else:
+            print(import_prof.format_table())
+        return 0
+
+    if ns['watch']:
+        from mkinit.watch import Watcher
+
+        watcher = Watcher(
+            modname_or_path,
+            respect_all=respect_all,
+            options=options,
+            dry=dry,
+            diff=diff,
+            recursive=ns['recursive'],
+            interval=ns['watch_interval'],
+            debounce=ns['watch_debounce'],
+        )
+        watcher.run()
+        return 0
+
     # print('ns = {!r}'.format(ns))
-    static_mkinit.autogen_init(
+    ret = static_mkinit.autogen_init(
         modname_or_path,
         respect_all=respect_all,
         options=options,
         dry=dry,
         diff=diff,
         recursive=ns['recursive'],
+        jobs=ns['jobs'],
+        manifest=ns['manifest'],
+        profile=bool(ns['profile']),
+        # The report also lists the out of date files in check mode
+        report=bool(ns['report'] or ns['check']),
+        check=ns['check'],
+        check_all=ns['check_all'],
     )
 
+    prof = ret
+    if ns['report'] or ns['check']:
+        report = ret
+        prof = report.profile
+        if ns['report']:
+            with open(ns['report'], 'w') as file:
+                file.write(report.dumps())
+
+    if ns['profile']:
+        import json
+
+        if ns['profile'] == 'json':
+            text = json.dumps(prof.to_dict(top=ns['profile_top']), indent=2)
+        else:
+            text = prof.format_table(top=ns['profile_top'])
+        print(text, file=sys.stderr)
+
+    if ns['check']:
+        out_of_date = report.changed_fpaths
+        for fpath in out_of_date:
+            print('would update {}'.format(fpath))
+        if out_of_date:
+            return 1
+    return 0
+
 
 if __name__ == '__main__':
-    main()
+    import sys
+
+    sys.exit(main())
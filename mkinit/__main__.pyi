@@ -1 +1,3 @@
-def main() -> None: ...
+from typing import List
+
+def main(argv: List[str] | None = None) -> int: ...
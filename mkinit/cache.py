@@ -0,0 +1,284 @@
+"""
+Persistent on-disk cache for the attributes extracted from submodules.
+
+Every run of :func:`mkinit.static_mkinit.autogen_init` needs the list of names
+each submodule exports. Computing that list requires reading and parsing the
+module, which dominates the runtime of recursive runs over large packages.
+This module stores those lists on disk so subsequent runs can skip unchanged
+files.
+
+Entries are keyed by the absolute module path, the ``respect_all`` flag, the
+mkinit version and :data:`_EXTRACT_SCHEMA_VERSION`. An entry is considered valid if the file's mtime and size
+are unchanged, or, failing that, if the sha256 of the file content is
+unchanged. The cache is bounded, and the least recently used entries are
+evicted once it grows past ``max_entries``.
+
+The cache used by :func:`mkinit.static_mkinit.static_init` and
+:func:`mkinit.static_mkinit.autogen_init` is configured by the environment:
+
+    * ``MKINIT_CACHE_DIR`` - the directory to store entries in. Defaults to
+      ``$XDG_CACHE_HOME/mkinit/parse`` (or ``~/.cache/mkinit/parse``).
+
+    * ``MKINIT_CACHE_SIZE`` - the maximum number of entries to keep.
+
+    * ``MKINIT_NO_CACHE`` - if set to a truthy value, disables the cache.
+
+or programatically via :func:`set_parse_cache`.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from os.path import abspath, expanduser, join
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 16384
+
+# Files modified this recently (in seconds) before being cached may be
+# modified again without changing their mtime, so their content hash is always
+# checked (this is the "racy-git" problem).
+RACY_SECONDS = 2.0
+
+# Bump this whenever the names extracted from a module can change (e.g. the
+# rules for __all__ or for what is public), so cached results from earlier
+# checkouts with the same mkinit version are not reused.
+_EXTRACT_SCHEMA_VERSION = 1
+
+
+class ParseCache:
+    """
+    A bounded on-disk cache mapping module files to their extracted attributes.
+
+    Args:
+        dpath (str | PathLike): directory to store cache entries in
+
+        max_entries (int): the maximum number of entries to keep before
+            evicting the least recently used ones.
+
+    Attributes:
+        hits (int): number of lookups served from the cache
+        misses (int): number of lookups that required parsing
+        bytes_read (int): number of bytes read from module files
+
+    Example:
+        >>> from mkinit.cache import *  # NOQA
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/parse_cache').delete().ensuredir()
+        >>> fpath = dpath / 'mod.py'
+        >>> fpath.write_text('def foo(): pass')
+        >>> self = ParseCache(dpath / 'cache', max_entries=10)
+        >>> extract = lambda source: [source.split()[1][:3]]
+        >>> assert self.extract_attributes(fpath, True, extract) == ['foo']
+        >>> assert self.extract_attributes(fpath, True, extract) == ['foo']
+        >>> assert (self.hits, self.misses) == (1, 1)
+    """
+
+    def __init__(self, dpath, max_entries=DEFAULT_MAX_ENTRIES):
+        self.dpath = os.fspath(dpath)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+        self._num_entries = None
+
+    def __repr__(self):
+        return '{}({!r}, max_entries={})'.format(
+            self.__class__.__name__, self.dpath, self.max_entries
+        )
+
+    def _entry_fpath(self, fpath, respect_all):
+        import mkinit
+
+        key = '\n'.join(
+            [
+                fpath,
+                str(bool(respect_all)),
+                mkinit.__version__,
+                str(_EXTRACT_SCHEMA_VERSION),
+            ]
+        )
+        key_hash = hashlib.sha256(key.encode('utf8')).hexdigest()
+        return join(self.dpath, key_hash + '.json')
+
+    def _load_entry(self, entry_fpath):
+        try:
+            with open(entry_fpath, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def extract_attributes(self, fpath, respect_all, extract):
+        """
+        Returns the cached attributes of ``fpath`` or computes them.
+
+        Args:
+            fpath (str | PathLike): path to the module to extract attributes from
+            respect_all (bool): part of the cache key
+            extract (Callable[[str], List[str]]):
+                function that computes the attributes from the module source
+                on a cache miss.
+
+        Returns:
+            List[str]: the extracted attributes
+        """
+        fpath = abspath(os.fspath(fpath))
+        entry_fpath = self._entry_fpath(fpath, respect_all)
+        stat = os.stat(fpath)
+        entry = self._load_entry(entry_fpath)
+        if entry is not None and entry.get('fpath') == fpath:
+            if (
+                not entry['racy']
+                and entry['mtime_ns'] == stat.st_mtime_ns
+                and entry['size'] == stat.st_size
+            ):
+                self._touch(entry_fpath)
+                self.hits += 1
+                return entry['attrs']
+
+        with open(fpath, 'rb') as file:
+            data = file.read()
+        self.bytes_read += len(data)
+        content_hash = hashlib.sha256(data).hexdigest()
+        if entry is not None and entry.get('hash') == content_hash:
+            # The file was touched but its content did not change
+            attrs = entry['attrs']
+            self.hits += 1
+        else:
+            attrs = extract(data.decode('utf8'))
+            self.misses += 1
+        self._store(entry_fpath, fpath, stat, content_hash, attrs)
+        return attrs
+
+    def _touch(self, entry_fpath):
+        # The entry mtime is used as the access time for LRU eviction
+        try:
+            os.utime(entry_fpath)
+        except OSError:  # nocover
+            pass
+
+    def _store(self, entry_fpath, fpath, stat, content_hash, attrs):
+        entry = {
+            'fpath': fpath,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'racy': (time.time() - stat.st_mtime) < RACY_SECONDS,
+            'hash': content_hash,
+            'attrs': list(attrs),
+        }
+        is_new = not os.path.exists(entry_fpath)
+        try:
+            os.makedirs(self.dpath, exist_ok=True)
+            # Write to a temporary file and rename so concurrent readers never
+            # see a partially written entry.
+            fd, tmp_fpath = tempfile.mkstemp(dir=self.dpath, suffix='.tmp')
+            with os.fdopen(fd, 'w') as file:
+                json.dump(entry, file)
+            os.replace(tmp_fpath, entry_fpath)
+        except OSError as ex:  # nocover
+            logger.warning('Unable to write parse cache entry: {!r}'.format(ex))
+            return
+        if is_new:
+            if self._num_entries is None:
+                self._num_entries = len(self._entry_fpaths())
+            else:
+                self._num_entries += 1
+            if self._num_entries > self.max_entries:
+                self.evict()
+
+    def _entry_fpaths(self):
+        try:
+            fnames = os.listdir(self.dpath)
+        except FileNotFoundError:
+            return []
+        return [join(self.dpath, f) for f in fnames if f.endswith('.json')]
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache is at most 90%
+        of ``max_entries``, leaving room for new entries before the next
+        eviction.
+        """
+        entry_fpaths = self._entry_fpaths()
+        target = int(self.max_entries * 0.9)
+        num_remove = len(entry_fpaths) - target
+        if num_remove > 0:
+
+            def _atime(entry_fpath):
+                try:
+                    return os.stat(entry_fpath).st_mtime_ns
+                except OSError:  # nocover
+                    return 0
+
+            entry_fpaths = sorted(entry_fpaths, key=_atime)
+            for entry_fpath in entry_fpaths[:num_remove]:
+                try:
+                    os.remove(entry_fpath)
+                except OSError:  # nocover
+                    pass
+            logger.debug('Evicted {} parse cache entries'.format(num_remove))
+        self._num_entries = len(entry_fpaths) - max(num_remove, 0)
+
+    def clear(self):
+        """
+        Removes all entries from the cache
+        """
+        for entry_fpath in self._entry_fpaths():
+            os.remove(entry_fpath)
+        self._num_entries = 0
+
+
+def _default_cache_dpath():
+    dpath = os.environ.get('MKINIT_CACHE_DIR', '')
+    if not dpath:
+        cache_home = os.environ.get('XDG_CACHE_HOME', '') or '~/.cache'
+        dpath = join(cache_home, 'mkinit', 'parse')
+    return abspath(expanduser(dpath))
+
+
+_UNSET = object()
+_ACTIVE_CACHE = _UNSET
+
+
+def get_parse_cache():
+    """
+    Returns the parse cache used by :func:`mkinit.static_init`.
+
+    Returns:
+        ParseCache | None: the active cache or None if caching is disabled
+    """
+    global _ACTIVE_CACHE
+    if _ACTIVE_CACHE is _UNSET:
+        if os.environ.get('MKINIT_NO_CACHE', '').lower() in {
+            'true',
+            '1',
+            'on',
+            'yes',
+        }:
+            _ACTIVE_CACHE = None
+        else:
+            max_entries = int(
+                os.environ.get('MKINIT_CACHE_SIZE', DEFAULT_MAX_ENTRIES)
+            )
+            _ACTIVE_CACHE = ParseCache(
+                _default_cache_dpath(), max_entries=max_entries
+            )
+    return _ACTIVE_CACHE
+
+
+def set_parse_cache(cache):
+    """
+    Sets the parse cache used by :func:`mkinit.static_init`.
+
+    Args:
+        cache (ParseCache | str | PathLike | None):
+            a cache, a directory to create a cache in, or None to disable
+            caching.
+    """
+    global _ACTIVE_CACHE
+    if cache is not None and not isinstance(cache, ParseCache):
+        cache = ParseCache(abspath(expanduser(os.fspath(cache))))
+    _ACTIVE_CACHE = cache
@@ -0,0 +1,30 @@
+from os import PathLike
+from typing import Callable, List
+
+from _typeshed import Incomplete
+
+logger: Incomplete
+DEFAULT_MAX_ENTRIES: int
+RACY_SECONDS: float
+
+class ParseCache:
+    dpath: str
+    max_entries: int
+    hits: int
+    misses: int
+    bytes_read: int
+
+    def __init__(
+        self, dpath: str | PathLike, max_entries: int = ...
+    ) -> None: ...
+    def extract_attributes(
+        self,
+        fpath: str | PathLike,
+        respect_all: bool,
+        extract: Callable[[str], List[str]],
+    ) -> List[str]: ...
+    def evict(self) -> None: ...
+    def clear(self) -> None: ...
+
+def get_parse_cache() -> ParseCache | None: ...
+def set_parse_cache(cache: ParseCache | str | PathLike | None) -> None: ...
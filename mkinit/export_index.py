@@ -0,0 +1,247 @@
+"""
+An index of the names exported by every module of a package tree.
+
+The :class:`ExportIndex` maps every public name to the modules that define
+it, and every module and package to the names it exports. It is built from
+the analysis of a recursive run (see ``export_index=`` in
+:func:`mkinit.static_mkinit.autogen_init`), so the package is never
+imported, and a name can then be looked up without parsing anything.
+
+The exports of a package are the names in the ``__all__`` of its generated
+``__init__.py`` (or ``__init__.pyi``), as a parent package would see them.
+The exports of a module are its ``__all__`` or its public top-level names.
+Only modules define names; a package that re-exports a name is not one of
+its defining modules. Modules that no package imports from (e.g. those left
+out of ``__submodules__``) are not in the index.
+
+The index can be saved as JSON with ``mkinit <package> --export-index`` or
+:func:`ExportIndex.dumps`, and loaded again with :func:`ExportIndex.load`.
+
+Example:
+    >>> from mkinit.export_index import *  # NOQA
+    >>> index = ExportIndex.build('mkinit')
+    >>> index.defining_modules('autogen_init')
+    ['mkinit.static_mkinit']
+    >>> assert 'autogen_init' in index.exports('mkinit')
+    >>> assert 'autogen_init' in index.exports('mkinit.static_mkinit')
+    >>> assert 'mkinit.util' in index.packages
+"""
+
+import bisect
+import json
+import os
+from os.path import exists, join
+
+__all__ = ['ExportIndex']
+
+
+class ExportIndex:
+    """
+    Maps names to the modules that define them and modules to their exports.
+
+    Attributes:
+        modname (str | None): the root package
+
+        modules (Dict[str, List[str]]): the names exported by each module
+            and package
+
+        packages (Set[str]): the entries of ``modules`` that are packages
+
+        names (Dict[str, List[str]]): the modules that define each public
+            name
+
+    Example:
+        >>> from mkinit.export_index import *  # NOQA
+        >>> index = ExportIndex('pkg')
+        >>> index.add_module('pkg.a', ['func', '_private'])
+        >>> index.add_module('pkg.b', ['func', 'Class'])
+        >>> index.add_module('pkg', ['func', 'Class'], is_package=True)
+        >>> index.defining_modules('func')
+        ['pkg.a', 'pkg.b']
+        >>> assert '_private' not in index and 'Class' in index
+        >>> new = ExportIndex.from_dict(json.loads(index.dumps()))
+        >>> assert new.to_dict() == index.to_dict()
+    """
+
+    def __init__(self, modname=None):
+        self.modname = modname
+        self.modules = {}
+        self.packages = set()
+        self.names = {}
+
+    def __repr__(self):
+        return '{}({!r}, num_modules={}, num_names={})'.format(
+            self.__class__.__name__,
+            self.modname,
+            len(self.modules),
+            len(self.names),
+        )
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def defining_modules(self, name):
+        """
+        Args:
+            name (str): a public name
+
+        Returns:
+            List[str]: the sorted modules that define the name, if any
+        """
+        return list(self.names.get(name, []))
+
+    def exports(self, modname):
+        """
+        Args:
+            modname (str): a module or package in the index
+
+        Returns:
+            List[str]: the names it exports
+
+        Raises:
+            KeyError: if the module is not in the index
+        """
+        return list(self.modules[modname])
+
+    def add_module(self, modname, exports, is_package=False):
+        """
+        Records the exports of a module, replacing a previous record.
+
+        Args:
+            modname (str): the name of the module
+
+            exports (List[str]): the names it exports
+
+            is_package (bool): if True, the module re-exports names, so
+                it is not recorded as their defining module
+        """
+        if modname in self.modules and modname not in self.packages:
+            for name in self.modules[modname]:
+                modnames = self.names.get(name, [])
+                if modname in modnames:
+                    modnames.remove(modname)
+                    if not modnames:
+                        del self.names[name]
+        self.modules[modname] = list(exports)
+        if is_package:
+            self.packages.add(modname)
+            return
+        self.packages.discard(modname)
+        for name in exports:
+            if not name.startswith('_'):
+                bisect.insort(self.names.setdefault(name, []), modname)
+
+    def add_package(self, pkg_modpath, export_model, results):
+        """
+        Records a generated package and the modules it imports from.
+
+        Args:
+            pkg_modpath (str): the package directory
+
+            export_model (ExportModel): the analysis of the package
+
+            results (List[Tuple[str, str, str]]): the generated files, see
+                :func:`mkinit.static_mkinit._generate_package`
+        """
+        from mkinit.static_mkinit import _extract_attributes
+
+        for submod, attrs in export_model.from_imports:
+            if submod.startswith('.'):
+                rel_modname = submod.lstrip('.')
+                rel_parts = rel_modname.split('.')
+                if exists(join(pkg_modpath, *rel_parts, '__init__.py')):
+                    # Subpackages are recorded when they are generated
+                    continue
+                sub_modname = export_model.modname + '.' + rel_modname
+            else:
+                sub_modname = submod
+            self.add_module(sub_modname, attrs)
+
+        # The interface of a typed lazy package has a static __all__
+        texts = {os.path.basename(fpath): text for fpath, _, text in results}
+        text = texts.get('__init__.pyi', texts.get('__init__.py', ''))
+        exports = _extract_attributes(source=text)
+        self.add_module(export_model.modname, exports, is_package=True)
+
+    def to_dict(self):
+        """
+        Returns:
+            Dict: JSON serializable data
+        """
+        return {
+            'modname': self.modname,
+            'modules': {
+                modname: self.modules[modname]
+                for modname in sorted(self.modules)
+            },
+            'packages': sorted(self.packages),
+            'names': {name: self.names[name] for name in sorted(self.names)},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Args:
+            data (Dict): the result of :func:`ExportIndex.to_dict`
+
+        Returns:
+            ExportIndex
+        """
+        self = cls(data['modname'])
+        self.modules = {k: list(v) for k, v in data['modules'].items()}
+        self.packages = set(data['packages'])
+        self.names = {k: list(v) for k, v in data['names'].items()}
+        return self
+
+    def dumps(self):
+        """
+        Returns:
+            str: the index as JSON
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    @classmethod
+    def load(cls, fpath):
+        """
+        Reads an index written by :func:`ExportIndex.dumps`.
+
+        Args:
+            fpath (str | PathLike): the JSON file
+
+        Returns:
+            ExportIndex
+        """
+        with open(fpath, 'r') as file:
+            return cls.from_dict(json.load(file))
+
+    @classmethod
+    def build(cls, modpath_or_name, respect_all=True, options=None, jobs=1):
+        """
+        Analyzes a package and all of its subpackages without writing
+        anything.
+
+        Args:
+            modpath_or_name (str | PathLike): the root package
+
+            respect_all (bool): if False, ``__all__`` is ignored
+
+            options (dict | None): formatting options, see
+                :func:`mkinit.formatting._ensure_options`
+
+            jobs (int): number of worker processes
+
+        Returns:
+            ExportIndex
+        """
+        from mkinit.static_mkinit import autogen_init
+
+        return autogen_init(
+            modpath_or_name,
+            respect_all=respect_all,
+            options=options,
+            recursive=True,
+            jobs=jobs,
+            check=True,
+            check_all=True,
+            export_index=True,
+        )
@@ -0,0 +1,38 @@
+from os import PathLike
+from typing import Dict, List, Set, Tuple
+
+from mkinit.models import ExportModel
+
+class ExportIndex:
+    modname: str | None
+    modules: Dict[str, List[str]]
+    packages: Set[str]
+    names: Dict[str, List[str]]
+
+    def __init__(self, modname: str | None = None) -> None: ...
+    def __contains__(self, name: str) -> bool: ...
+    def defining_modules(self, name: str) -> List[str]: ...
+    def exports(self, modname: str) -> List[str]: ...
+    def add_module(
+        self, modname: str, exports: List[str], is_package: bool = False
+    ) -> None: ...
+    def add_package(
+        self,
+        pkg_modpath: str,
+        export_model: ExportModel,
+        results: List[Tuple[str, str, str]],
+    ) -> None: ...
+    def to_dict(self) -> Dict: ...
+    @classmethod
+    def from_dict(cls, data: Dict) -> ExportIndex: ...
+    def dumps(self) -> str: ...
+    @classmethod
+    def load(cls, fpath: str | PathLike) -> ExportIndex: ...
+    @classmethod
+    def build(
+        cls,
+        modpath_or_name: str | PathLike,
+        respect_all: bool = True,
+        options: dict | None = None,
+        jobs: int = 1,
+    ) -> ExportIndex: ...
@@ -3,14 +3,17 @@ Contains logic for formatting statically / dynamically extracted information
 into the final product.
 """
 
+import ast
 import logging
 import textwrap
-from os.path import exists, join
 
-from mkinit import static_analysis as static
+from mkinit.profiling import phase
 
 logger = logging.getLogger(__name__)
 
+# The file the lazy boilerplate reads its table from with ``lazy_sidecar``
+LAZY_INDEX_FNAME = '_mkinit_index.json'
+
 
 def _ensure_options(given_options=None):
     """
@@ -25,6 +28,29 @@ def _ensure_options(given_options=None):
             (Default: True)
         relative (bool): if True, generate relative `.` imports
             (Default: False)
+        lazy_thread_safe (bool): if True, the boilerplate generated for
+            ``lazy_import`` guards each name with a lock so concurrent
+            first accesses import it only once (Default: False)
+        lazy_telemetry (bool): if True, the boilerplate generated for
+            ``lazy_import`` records how long it took to resolve each name
+            (Default: False)
+        lazy_parallel_eager (bool): if True, the boilerplate generated for
+            ``lazy_import`` warms independent submodules on a thread pool
+            when ``EAGER_IMPORT`` is set (Default: False)
+        import_costs (str | None): path to a JSON import profile written by
+            ``--import-profile=json``. Submodules that take at least
+            ``lazy_threshold`` milliseconds to import are imported lazily
+            and the rest eagerly (Default: None)
+        lazy_threshold (float): the import time in milliseconds at which a
+            submodule in ``import_costs`` is imported lazily (Default: 10)
+        lazy_compact (bool): if True, the submodules and the attributes of
+            each submodule are passed to our ``lazy_import`` boilerplate as
+            space separated strings, which are smaller and faster to load
+            for packages with many names (Default: False)
+        lazy_sidecar (bool): if True, the table of names passed to our
+            ``lazy_import`` boilerplate is written to a ``_mkinit_index.json``
+            file next to the init, which only embeds its file name and hash.
+            The file is read on the first attribute access (Default: False)
 
     """
     if given_options is None:
@@ -38,6 +64,13 @@ def _ensure_options(given_options=None):
         'lazy_loader': False,
         'lazy_loader_typed': False,
         'lazy_boilerplate': None,
+        'lazy_thread_safe': False,
+        'lazy_telemetry': False,
+        'lazy_parallel_eager': False,
+        'import_costs': None,
+        'lazy_threshold': 10.0,
+        'lazy_compact': False,
+        'lazy_sidecar': False,
         'use_black': False,
         'source_order': False,
     }
@@ -49,35 +82,31 @@ def _ensure_options(given_options=None):
     return options
 
 
-def _insert_autogen_text(modpath, initstr, interface=False):
+def _insert_autogen_text(modpath, initstr, interface=False, init_model=None):
     """
     Creates new text for `__init__.py` containing the autogenerated code.
 
     If an `__init__.py` already exists in `modpath`, then it tries to
     intelligently insert the code without clobbering too much. See
     `_find_insert_points` for details on this process.
+
+    Args:
+        modpath (str): path to the package
+        initstr (str): the autogenerated code
+        interface (bool): if True, write into the `__init__.pyi` file
+        init_model (InitFileModel | None):
+            a previously loaded model of the file to insert into. If
+            unspecified the file is read from disk.
     """
+    if init_model is None:
+        from mkinit.models import InitFileModel
+
+        init_model = InitFileModel(modpath, interface=interface)
 
     # Get path to init file so we can overwrite it
-    init_fpath = join(modpath, '__init__.pyi' if interface else '__init__.py')
+    init_fpath = init_model.fpath
     logger.debug('inserting initstr into: {!r}'.format(init_fpath))
-
-    if exists(init_fpath):
-        with open(init_fpath, 'r') as file_:
-            lines = file_.readlines()
-    else:
-        lines = []
-
-    startline, endline, init_indent = _find_insert_points(lines)
-    initstr_ = _indent(initstr, init_indent) + '\n'
-
-    QUICKFIX_REMOVE_LEADING_NEWLINES = 1
-    if QUICKFIX_REMOVE_LEADING_NEWLINES:
-        initstr_ = initstr_.lstrip('\n')
-
-    new_lines = lines[:startline] + [initstr_] + lines[endline:]
-
-    new_text = ''.join(new_lines).rstrip() + '\n'
+    new_text = init_model.render(initstr)
     return init_fpath, new_text
 
 
@@ -102,7 +131,7 @@ def _find_insert_points(lines):
 
         * A line beginning with any special variable:
             "__submodules__", "__external__", "__protected__", "__private__",
-            "__ignore__", "__explicit__", or "__extra_all__"
+            "__ignore__", "__lazy__", "__explicit__", or "__extra_all__"
 
     If neither explicit tags or implicit patterns exist, all text is clobbered.
 
@@ -150,17 +179,12 @@ def _find_insert_points(lines):
     # print = logging.debug
     print('Searching for points to insert autogenerated code')
 
-    # co-opt the xdoctest parser to break appart lines in the init file
-    # This lets us correctly skip to the end of a multiline expression
-    # A better solution might be to use the line-number aware parser
-    # to search for AUTOGEN_INIT comments and other relevant structures.
-    source_lines = ['>>> ' + p.rstrip('\n') for p in lines]
-    try:
-        ps1_lines, _ = static._locate_ps1_linenos(source_lines)  # type: ignore
-        print('ps1_lines = {!r}'.format(ps1_lines))
-    except IndexError:
-        assert len(lines) == 0
-        ps1_lines = []
+    # Find the lines that begin a top-level statement. This lets us correctly
+    # skip to the end of a multiline expression.
+    ps1_lines = _statement_start_linenos(lines)
+    print('ps1_lines = {!r}'.format(ps1_lines))
+    # Map each statement start to the start of the next statement
+    next_ps1 = dict(zip(ps1_lines, ps1_lines[1:]))
 
     # Algorithm is similar to the old version, but we skip to the next PS1
     # line if we encounter an implicit code pattern.
@@ -180,6 +204,7 @@ def _find_insert_points(lines):
         '__private__',
         '__protected__',
         '__ignore__',
+        '__lazy__',
         '#',
         '"""',
         "'''",
@@ -211,30 +236,21 @@ def _find_insert_points(lines):
                     )
                 )
                 startline = lineno + 1
-                try:
-                    # Try and skip to the end of the expression
-                    # (if it is a multiline case)
-                    idx = ps1_lines.index(lineno)
-                    skipto = ps1_lines[idx + 1]
+                # Try and skip to the end of the expression
+                # (if it is a multiline case)
+                if lineno in next_ps1:
+                    skipto = next_ps1[lineno]
                     startline = skipto
                     print('SKIPTO = {!r}'.format(skipto))
-                except ValueError:
-                    print('NOT ON A PS1 LINE KEEP {}'.format(startline))
-                except IndexError:
+                elif ps1_lines and lineno == ps1_lines[-1]:
                     print('LAST LINE MOVING TO END {}'.format(startline))
                     startline = endline
+                else:
+                    print('NOT ON A PS1 LINE KEEP {}'.format(startline))
             else:
                 # Even if we dont respect the lines, try not to end between
                 # PS1 lines.
-                try:
-                    # Try and skip to the end of the expression
-                    # (if it is a multiline case)
-                    idx = ps1_lines.index(lineno)
-                    skipto = ps1_lines[idx + 1]
-                except ValueError:
-                    ...
-                except IndexError:
-                    ...
+                skipto = next_ps1.get(lineno, None)
 
     # print('startline = {}'.format(startline))
     # print('endline = {}'.format(endline))
@@ -242,6 +258,60 @@ def _find_insert_points(lines):
     return startline, endline, init_indent
 
 
+def _statement_start_linenos(lines):
+    r"""
+    Finds the lines that begin a top-level statement or are a top-level
+    comment, in a single parse of the file.
+
+    Args:
+        lines (List[str]): lines of a python file
+
+    Returns:
+        List[int]: sorted zero-based line indices
+
+    Raises:
+        SyntaxError: if the lines are not valid python
+
+    Example:
+        >>> from mkinit.formatting import _statement_start_linenos
+        >>> lines = textwrap.dedent(
+        ...     '''
+        ...     # comment
+        ...     x = [
+        ...     # not a statement
+        ...         1,
+        ...     ]
+        ...     @decorator
+        ...     def func():
+        ...         pass
+        ...     ''').strip().split('\n')
+        >>> _statement_start_linenos(lines)
+        [0, 1, 6]
+    """
+    source = '\n'.join(line.rstrip('\n') for line in lines)
+    pt = ast.parse(source)
+    ps1_linenos = []
+    # Top-level comments count as statements, unless they are inside of a
+    # multiline statement.
+    prev_end = 0
+    for node in pt.body:
+        start = node.lineno - 1
+        # Decorators come before the line reported for the statement
+        decorators = getattr(node, 'decorator_list', None)
+        first = decorators[0].lineno - 1 if decorators else start
+        for lineno in range(prev_end, first):
+            if lines[lineno].startswith('#'):
+                ps1_linenos.append(lineno)
+        if not ps1_linenos or ps1_linenos[-1] != start:
+            # Statements separated by semicolons share a line
+            ps1_linenos.append(start)
+        prev_end = node.end_lineno
+    for lineno in range(prev_end, len(lines)):
+        if lines[lineno].startswith('#'):
+            ps1_linenos.append(lineno)
+    return ps1_linenos
+
+
 def _indent(text, indent='    '):
     new_text = indent + text.replace('\n', '\n' + indent)
     # remove whitespace on blank lines
@@ -258,6 +328,9 @@ def _initstr(
     private=set(),
     options=None,
     module_property_names=None,
+    eager_groups=None,
+    lazy=set(),
+    sidecar=None,
 ):
     r"""
     Calls the other string makers
@@ -282,6 +355,23 @@ def _initstr(
 
         options (dict): customize output
 
+        module_property_names (List[str] | None):
+            names defined by ``__module_properties__``
+
+        eager_groups (List[List[str]] | None):
+            groups of submodules that the lazy boilerplate can warm in
+            parallel when ``lazy_parallel_eager`` is set, see
+            :func:`mkinit.static_mkinit._eager_warmup_groups`.
+
+        lazy (set): submodules to import with a ``lazy_import`` boilerplate
+            while the others are imported eagerly (supports fnmatch patterns
+            like 'plot*'). Ignored if the whole module is lazy.
+
+        sidecar (Dict | None): if specified and the ``lazy_sidecar`` option
+            is set, this is updated with the data to write to the
+            ``_mkinit_index.json`` file loaded by the lazy boilerplate, see
+            :func:`_make_lazy_index`.
+
     CommandLine:
         python -m mkinit.formatting _initstr
 
@@ -347,6 +437,33 @@ def _initstr(
         def __dir__():
             return __all__
         __all__ = ['bar', 'baz', 'func1', 'func2']
+
+    Example:
+        >>> # Hybrid mode imports submodules declared lazy with lazy_import
+        >>> modname = 'foo'
+        >>> imports = ['.bar', '.baz']
+        >>> from_imports = [('.bar', ['func1']), ('.baz', ['func2'])]
+        >>> options = {'lazy_boilerplate': 'from importlib import lazy_import'}
+        >>> initstr = _initstr(modname, imports, from_imports, options=options,
+        >>>                    lazy={'baz'})
+        >>> print(initstr.replace('\n\n', '\n'))
+        from foo import bar
+        from foo.bar import (func1,)
+        from importlib import lazy_import
+        __getattr__ = lazy_import(
+            __name__,
+            submodules={
+                'baz',
+            },
+            submod_attrs={
+                'baz': [
+                    'func2',
+                ],
+            },
+        )
+        def __dir__():
+            return __all__
+        __all__ = ['bar', 'baz', 'func1', 'func2']
     """
     options = _ensure_options(options)
 
@@ -456,6 +573,33 @@ def _initstr(
                 parts.append('')
             parts.append(new_part)
 
+    # In hybrid mode the lazy submodules are split off from the eager ones
+    lazy_submodules = []
+    lazy_from_imports = []
+    if lazy and not (options['lazy_import'] or options['lazy_loader']):
+        lazy_pats = {p for p in lazy if '*' in p}
+        lazy_set = set(lazy) - lazy_pats
+
+        def _lazy_matches(x):
+            return x in lazy_set or any(fnmatch(x, pat) for pat in lazy_pats)
+
+        lazy_submodules = [m for m in exposed_submodules if _lazy_matches(m)]
+        # Only local submodules can be imported by lazy_import
+        lazy_from_imports = [
+            (m, sub)
+            for m, sub in exposed_from_imports
+            if m.startswith('.') and _lazy_matches(m[1:])
+        ]
+        exposed_submodules = [
+            m for m in exposed_submodules if m not in lazy_submodules
+        ]
+        exposed_from_imports = [
+            item
+            for item in exposed_from_imports
+            if item not in lazy_from_imports
+        ]
+    hybrid = bool(lazy_submodules or lazy_from_imports)
+
     if options['lazy_loader']:
         default_lazy_boilerplate = textwrap.dedent(
             r"""
@@ -524,11 +668,13 @@ def _initstr(
             exposed_from_imports,
             options,
             module_property_names,
+            eager_groups=eager_groups,
+            sidecar=sidecar,
         )
         append_part(lazy_boilerplate)
         append_part(lazy_init_text)
     else:
-        if module_property_names:
+        if module_property_names and not hybrid:
             import warnings
 
             warnings.warn(
@@ -543,8 +689,20 @@ def _initstr(
             attr_part = _make_fromimport_str(exposed_from_imports, modname)
             append_part(attr_part)
 
+        if hybrid:
+            lazy_boilerplate, lazy_init_text = _make_lazy_boilerplate(
+                lazy_submodules,
+                lazy_from_imports,
+                options,
+                module_property_names,
+                eager_groups=eager_groups,
+                sidecar=sidecar,
+            )
+            append_part(lazy_boilerplate)
+            append_part(lazy_init_text)
+
     if options.get('with_all', True):
-        if options['lazy_import']:
+        if options['lazy_import'] or hybrid:
             append_part(
                 textwrap.dedent(
                     """
@@ -564,16 +722,22 @@ def _initstr(
         try:
             import black
 
-            initstr = black.format_str(
-                initstr, mode=black.Mode(string_normalization=True)
-            )
+            with phase('black'):
+                initstr = black.format_str(
+                    initstr, mode=black.Mode(string_normalization=True)
+                )
         except ImportError:
             pass
     return initstr
 
 
 def _make_lazy_boilerplate(
-    exposed_submodules, exposed_from_imports, options, module_property_names
+    exposed_submodules,
+    exposed_from_imports,
+    options,
+    module_property_names,
+    eager_groups=None,
+    sidecar=None,
 ):
     template = textwrap.dedent(
         """
@@ -590,25 +754,61 @@ def _make_lazy_boilerplate(
             submod = submod.lstrip('.')
             submod_attrs[submod] = attrs
 
+    # Custom boilerplate expects the names as collections
+    ours = options['lazy_boilerplate'] is None
+    use_sidecar = options['lazy_sidecar'] and ours
+    compact = options['lazy_compact'] and ours and not use_sidecar
+
     # Currently this is the only use of ubelt, but urepr
     # is easier to use in testing than pprint, so perhaps
     # we can remove complexity and just use ubelt elsewhere
     import ubelt as ub
 
-    # exposed_submodules = set(exposed_submodules)
-    submodules_text = ub.urepr(exposed_submodules).replace('\n', '\n    ')
-    # hack for python <3.7 tests
-    submodules_text = submodules_text.replace('[', '{').replace(']', '}')
+    if compact:
+        submodules_text = _packed_str_literal(exposed_submodules, '    ')
+        submod_attr_text = '{\n'
+        for submod, attrs in submod_attrs.items():
+            attrs_text = _packed_str_literal(attrs, '        ')
+            submod_attr_text += '        {!r}: {},\n'.format(submod, attrs_text)
+        submod_attr_text += '    }'
+    else:
+        # exposed_submodules = set(exposed_submodules)
+        submodules_text = ub.urepr(exposed_submodules).replace('\n', '\n    ')
+        # hack for python <3.7 tests
+        submodules_text = submodules_text.replace('[', '{').replace(']', '}')
 
-    submod_attr_text = ub.urepr(submod_attrs).replace('\n', '\n    ')
+        submod_attr_text = ub.urepr(submod_attrs).replace('\n', '\n    ')
 
-    lazy_init_text = template.format(
-        submodules_text=submodules_text,
-        submod_attr_text=submod_attr_text,
-    ).strip()
+    if use_sidecar:
+        index = _make_lazy_index(exposed_submodules, submod_attrs)
+        if sidecar is not None:
+            sidecar.update(index)
+        lazy_init_text = codeblock(
+            f"""
+            __getattr__ = lazy_import(
+                __name__,
+                index_fname={LAZY_INDEX_FNAME!r},
+                index_hash={index['hash']!r},
+            )
+            """
+        )
+    else:
+        lazy_init_text = template.format(
+            submodules_text=submodules_text,
+            submod_attr_text=submod_attr_text,
+        ).strip()
 
     if options['lazy_boilerplate'] is None:
-        lazy_boilerplate = _make_our_lazy_boilerplate(module_property_names)
+        lazy_boilerplate = _make_our_lazy_boilerplate(
+            module_property_names,
+            thread_safe=options['lazy_thread_safe'],
+            telemetry=options['lazy_telemetry'],
+            eager_groups=(
+                (eager_groups or []) if options['lazy_parallel_eager'] else None
+            ),
+            compact=compact,
+            sidecar=use_sidecar,
+        )
     else:
         # User specified custom lazy boilerplate
         lazy_boilerplate = options['lazy_boilerplate']
@@ -616,6 +816,87 @@ def _make_lazy_boilerplate(
     return lazy_boilerplate, lazy_init_text
 
 
+def _make_lazy_index(exposed_submodules, submod_attrs):
+    """
+    Builds the data of the ``_mkinit_index.json`` file that the lazy
+    boilerplate loads instead of a table of literals.
+
+    Args:
+        exposed_submodules (List[str]): the lazily imported submodules
+        submod_attrs (Dict[str, List[str]]): the names from each submodule
+
+    Returns:
+        Dict: the ``submodules``, the ``name_to_submod`` map from each name
+            to its submodule, and a ``hash`` of both that is embedded in the
+            init, so a stale index file can be detected.
+
+    Example:
+        >>> from mkinit.formatting import _make_lazy_index
+        >>> index = _make_lazy_index(['a'], {'a': ['f'], 'b': ['g']})
+        >>> index['name_to_submod']
+        {'f': 'a', 'g': 'b'}
+        >>> assert index['hash'] != _make_lazy_index(['a'], {})['hash']
+    """
+    import hashlib
+    import json
+
+    name_to_submod = {
+        name: submod for submod, attrs in submod_attrs.items() for name in attrs
+    }
+    table = {
+        'submodules': list(exposed_submodules),
+        'name_to_submod': name_to_submod,
+    }
+    data = json.dumps(table, separators=(',', ':')).encode('utf8')
+    return {'hash': hashlib.sha256(data).hexdigest()[:16], **table}
+
+
+def _packed_str_literal(names, indent='', width=79):
+    """
+    Formats names as a literal of a single space separated string, split
+    into adjacent literals over several lines if it is too long.
+
+    Args:
+        names (List[str]): the names
+        indent (str): the indentation of the line the literal starts on
+        width (int): the maximum line length
+
+    Returns:
+        str
+
+    Example:
+        >>> from mkinit.formatting import _packed_str_literal
+        >>> print(_packed_str_literal(['a', 'b']))
+        'a b'
+        >>> names = ['name{:02d}'.format(i) for i in range(12)]
+        >>> print(_packed_str_literal(names, width=40))
+        (
+            'name00 name01 name02 name03 '
+            'name04 name05 name06 name07 '
+            'name08 name09 name10 name11'
+        )
+    """
+    text = ' '.join(names)
+    # Leave room for a key and a trailing comma
+    if len(indent) + len(text) + 30 <= width:
+        return repr(text)
+    inner = indent + '    '
+    max_len = max(width - len(inner) - 3, 1)
+    lines = []
+    current = []
+    current_len = 0
+    for name in names:
+        if current and current_len + len(name) + 1 > max_len:
+            lines.append(' '.join(current) + ' ')
+            current = []
+            current_len = 0
+        current.append(name)
+        current_len += len(name) + 1
+    lines.append(' '.join(current))
+    body = '\n'.join(inner + repr(line) for line in lines)
+    return '(\n' + body + '\n' + indent + ')'
+
+
 def codeblock(text, prefix=''):
     import textwrap  # this is a slow import, do it
 
@@ -625,32 +906,143 @@ def codeblock(text, prefix=''):
     return text
 
 
-def _make_our_lazy_boilerplate(module_property_names=None):
+def _make_our_lazy_boilerplate(
+    module_property_names=None,
+    thread_safe=False,
+    telemetry=False,
+    eager_groups=None,
+    compact=False,
+    sidecar=False,
+):
     """
     Originally this was a non-dyanmic function, but for module properties we
     had to add in some extra tools.
 
+    Args:
+        module_property_names (List[str] | None):
+            names that are resolved by ``__module_properties__``
+
+        thread_safe (bool):
+            if True, the generated ``__getattr__`` uses double-checked
+            locking with one lock per name, so threads that access the same
+            name for the first time at once only import it once. Names that
+            are already resolved are found in ``globals()`` without taking a
+            lock.
+
+        telemetry (bool):
+            if True, the generated ``__getattr__`` records the submodule and
+            the seconds it took to resolve each name in the module level
+            ``__lazy_import_times__`` dictionary. If the ``LAZY_IMPORT_TELEMETRY``
+            environment variable is set, the times are dumped as a line of
+            JSON at exit, to stderr if it is a true value like ``1``,
+            otherwise appended to the file it names. When False none of this
+            code is generated.
+
+        eager_groups (List[List[str]] | None):
+            if specified, eager imports run each of these groups of
+            submodules in order on a thread pool, while the remaining
+            submodules are warmed on the importing thread. The number of
+            threads can be set with the ``EAGER_IMPORT_WORKERS`` environment
+            variable, and a value of 1 warms everything serially.
+
+        compact (bool):
+            if True, ``submodules`` and the values of ``submod_attrs`` are
+            space separated strings. The index from each name to its
+            submodule is built on the first call of ``__getattr__`` instead
+            of when the module is imported.
+
+        sidecar (bool):
+            if True, ``lazy_import`` takes the file name and hash of an index
+            file in the package directory (see :func:`_make_lazy_index`)
+            instead of the table of names. The file is read by the first
+            call of ``__getattr__`` and an ImportError is raised if its hash
+            does not match the one in the init.
+
     Example:
         >>> from mkinit.formatting import _make_our_lazy_boilerplate  # NOQA
         >>> module_property_names = ['foo', 'bar']
         >>> text = _make_our_lazy_boilerplate(module_property_names)
         >>> import ubelt as ub
         >>> print(ub.highlight_code(text, backend='rich'))
+
+    Example:
+        >>> from mkinit.formatting import _make_our_lazy_boilerplate  # NOQA
+        >>> text = _make_our_lazy_boilerplate(thread_safe=True)
+        >>> assert 'import threading' in text
+        >>> compile(text, '<boilerplate>', 'exec')
+        >>> text = _make_our_lazy_boilerplate(telemetry=True)
+        >>> assert '__lazy_import_times__' in text
+        >>> compile(text, '<boilerplate>', 'exec')
+        >>> text = _make_our_lazy_boilerplate(eager_groups=[['a', 'b'], ['c']])
+        >>> assert 'ThreadPoolExecutor' in text
+        >>> compile(text, '<boilerplate>', 'exec')
+        >>> text = _make_our_lazy_boilerplate(compact=True, eager_groups=[])
+        >>> assert 'attrs.split()' in text
+        >>> compile(text, '<boilerplate>', 'exec')
+        >>> text = _make_our_lazy_boilerplate(sidecar=True, eager_groups=[])
+        >>> assert 'def load_index' in text
+        >>> compile(text, '<boilerplate>', 'exec')
     """
     # NOTE: We are not using f-strings in the **generated** code so it can
     # still be parsed in older versions of python.
     # NOTE: We differentiate between submodule and submodule_attrs, as
     # the keys in submodule_attrs aren't added by default.
+    import textwrap
+
     import ubelt as ub
 
     lines = {}
-    lines['def'] = codeblock(
-        """
-        def lazy_import(module_name, submodules, submod_attrs, eager='auto'):
-        """
-    )
-    lines['body1'] = codeblock(
-        """
+    if sidecar:
+        lines['def'] = codeblock(
+            """
+            def lazy_import(module_name, index_fname, index_hash, eager='auto'):
+            """
+        )
+    else:
+        lines['def'] = codeblock(
+            """
+            def lazy_import(module_name, submodules, submod_attrs, eager='auto'):
+            """
+        )
+    if sidecar:
+        lines['body1'] = codeblock(
+            """
+            import importlib
+            import os
+            # Filled from the index file by the first call of __getattr__
+            submodules = set()
+            name_to_submod = {}
+            index_loaded = []
+
+            def load_index():
+                import json
+                fpath = os.path.join(os.path.dirname(__file__), index_fname)
+                with open(fpath, 'r') as file:
+                    index = json.load(file)
+                if index['hash'] != index_hash:
+                    raise ImportError(
+                        '{} is out of date with the __init__.py of {}, '
+                        'regenerate it with mkinit'.format(fpath, module_name))
+                submodules.update(index['submodules'])
+                name_to_submod.update(index['name_to_submod'])
+                index_loaded.append(True)
+            """,
+            ' ' * 4,
+        )
+    elif compact:
+        lines['body1'] = codeblock(
+            """
+            import importlib
+            import os
+            submodules = set(submodules.split())
+            # Filled on the first call of __getattr__
+            name_to_submod = {}
+            """,
+            ' ' * 4,
+        )
+    else:
+        lines['body1'] = codeblock(
+            """
             import importlib
             import os
             name_to_submod = {
@@ -658,8 +1050,18 @@ def _make_our_lazy_boilerplate(module_property_names=None):
                 for func in funcs
             }
             """,
-        ' ' * 4,
-    )
+            ' ' * 4,
+        )
+
+    if thread_safe:
+        lines['body_locks'] = codeblock(
+            """
+            import threading
+            name_locks = {}
+            name_locks_lock = threading.Lock()
+            """,
+            ' ' * 4,
+        )
 
     if module_property_names is not None:
         name_text = ub.urepr(set(module_property_names), nl=0)
@@ -670,6 +1072,37 @@ def _make_our_lazy_boilerplate(module_property_names=None):
             """,
             ' ' * 4,
         )
+    if telemetry:
+        lines['body_telemetry'] = codeblock(
+            """
+            from time import perf_counter
+            import_times = {}
+            globals()['__lazy_import_times__'] = import_times
+            telemetry_text = os.environ.get('LAZY_IMPORT_TELEMETRY', '')
+            if telemetry_text:
+                import atexit
+
+                def _dump_import_times():
+                    import json
+                    import sys
+                    if not import_times:
+                        return
+                    line = json.dumps({
+                        'module': module_name, 'import_times': import_times,
+                    }) + '\\n'
+                    if telemetry_text.lower() in {'true', '1', 'on', 'yes'}:
+                        sys.stderr.write(line)
+                    else:
+                        with open(telemetry_text, 'a') as file:
+                            file.write(line)
+
+                atexit.register(_dump_import_times)
+            """,
+            ' ' * 4,
+        )
+    if eager_groups is not None:
+        groups_text = ub.urepr(eager_groups, nl=1).replace('\n', '\n    ')
+        lines['body_eager_groups'] = '    eager_groups = ' + groups_text
     lines['closure_def'] = codeblock(
         """
             def __getattr__(name):
@@ -686,6 +1119,60 @@ def _make_our_lazy_boilerplate(module_property_names=None):
             ' ' * 8,
         )
 
+    if sidecar:
+        lines['closure_index'] = codeblock(
+            """
+                if not index_loaded:
+                    load_index()
+            """,
+            ' ' * 8,
+        )
+    elif compact:
+        lines['closure_index'] = codeblock(
+            """
+                if not name_to_submod:
+                    # A single update of a complete dict, so other threads
+                    # never see a partial index
+                    name_to_submod.update({
+                        func: mod for mod, funcs in submod_attrs.items()
+                        for func in funcs.split()
+                    })
+            """,
+            ' ' * 8,
+        )
+
+    if thread_safe:
+        # Resolved names are usually found by normal attribute lookup, but
+        # threads that missed them at the same time wait here and then find
+        # them in globals() instead of importing them again. The locks are
+        # reentrant so a circular import of the same name does not deadlock.
+        lines['closure_lock'] = codeblock(
+            """
+                if name not in submodules and name not in name_to_submod:
+                    raise AttributeError(
+                        f'Module {module_name!r} has no attribute {name!r}')
+                module_globals = globals()
+                if name in module_globals:
+                    return module_globals[name]
+                with name_locks_lock:
+                    lock = name_locks.get(name)
+                    if lock is None:
+                        lock = name_locks[name] = threading.RLock()
+                with lock:
+                    if name in module_globals:
+                        return module_globals[name]
+            """,
+            ' ' * 8,
+        )
+
+    if telemetry:
+        lines['closure_start'] = codeblock(
+            """
+                start = perf_counter()
+            """,
+            ' ' * 12 if thread_safe else ' ' * 8,
+        )
+
     lines['closure_body2'] = codeblock(
         """
                 if name in submodules:
@@ -701,10 +1188,29 @@ def _make_our_lazy_boilerplate(module_property_names=None):
                 else:
                     raise AttributeError(
                         f'Module {module_name!r} has no attribute {name!r}')
+            """,
+        ' ' * 12 if thread_safe else ' ' * 8,
+    )
+
+    if telemetry:
+        lines['closure_record'] = codeblock(
+            """
+                import_times[name] = {
+                    'submodule': '{}.{}'.format(
+                        module_name,
+                        name if name in submodules else name_to_submod[name]),
+                    'seconds': perf_counter() - start,
+                }
+            """,
+            ' ' * 12 if thread_safe else ' ' * 8,
+        )
+
+    lines['closure_store'] = codeblock(
+        """
                 globals()[name] = attr
                 return attr
             """,
-        ' ' * 8,
+        ' ' * 12 if thread_safe else ' ' * 8,
     )
 
     lines['resolve_eager'] = codeblock(
@@ -727,16 +1233,135 @@ def _make_our_lazy_boilerplate(module_property_names=None):
         ' ' * 4,
     )
 
-    lines['execute_eager'] = codeblock(
-        """
-            if eager_import_flag:
-                for name in submodules:
-                    __getattr__(name)
+    # Each variant has its own templates for the body of the eager block
+    eager_body = []
+    if sidecar:
+        eager_body.append(
+            codeblock(
+                """
+                if not index_loaded:
+                    load_index()
+                """
+            )
+        )
+
+    if eager_groups is None:
+        if sidecar:
+            eager_body.append(
+                codeblock(
+                    """
+                    for name in submodules:
+                        __getattr__(name)
 
-                for attrs in submod_attrs.values():
-                    for attr in attrs:
+                    for attr in name_to_submod:
                         __getattr__(attr)
-            """,
+                    """
+                )
+            )
+        elif compact:
+            eager_body.append(
+                codeblock(
+                    """
+                    for name in submodules:
+                        __getattr__(name)
+
+                    for attrs in submod_attrs.values():
+                        for attr in attrs.split():
+                            __getattr__(attr)
+                    """
+                )
+            )
+        else:
+            eager_body.append(
+                codeblock(
+                    """
+                    for name in submodules:
+                        __getattr__(name)
+
+                    for attrs in submod_attrs.values():
+                        for attr in attrs:
+                            __getattr__(attr)
+                    """
+                )
+            )
+    else:
+        if sidecar:
+            eager_body.append(
+                codeblock(
+                    """
+                    eager_names = {}
+                    for name in submodules:
+                        eager_names.setdefault(name, []).append(name)
+                    for attr, submod in name_to_submod.items():
+                        eager_names.setdefault(submod, []).append(attr)
+                    """
+                )
+            )
+        elif compact:
+            eager_body.append(
+                codeblock(
+                    """
+                    eager_names = {}
+                    for name in submodules:
+                        eager_names.setdefault(name, []).append(name)
+                    for submod, attrs in submod_attrs.items():
+                        eager_names.setdefault(submod, []).extend(attrs.split())
+                    """
+                )
+            )
+        else:
+            eager_body.append(
+                codeblock(
+                    """
+                    eager_names = {}
+                    for name in submodules:
+                        eager_names.setdefault(name, []).append(name)
+                    for submod, attrs in submod_attrs.items():
+                        eager_names.setdefault(submod, []).extend(attrs)
+                    """
+                )
+            )
+        # Independent groups are warmed on worker threads. The rest may
+        # import this package, which waits on the import lock held by this
+        # thread, so they are warmed here while the workers run.
+        eager_body.append(
+            codeblock(
+                """
+                parallel_tasks = [
+                    [name for submod in group
+                     for name in eager_names.pop(submod, [])]
+                    for group in eager_groups
+                ]
+                serial_task = [
+                    name for names in eager_names.values() for name in names
+                ]
+
+                def warm_up(names):
+                    for name in names:
+                        __getattr__(name)
+
+                max_workers = int(os.environ.get('EAGER_IMPORT_WORKERS', '8'))
+                if max_workers > 1 and parallel_tasks:
+                    from concurrent.futures import ThreadPoolExecutor
+                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                        futures = [
+                            executor.submit(warm_up, names)
+                            for names in parallel_tasks
+                        ]
+                        warm_up(serial_task)
+                        for future in futures:
+                            future.result()
+                else:
+                    for names in parallel_tasks:
+                        warm_up(names)
+                    warm_up(serial_task)
+                """
+            )
+        )
+
+    lines['execute_eager'] = codeblock(
+        'if eager_import_flag:\n'
+        + textwrap.indent('\n'.join(eager_body), ' ' * 4),
         ' ' * 4,
     )
 
@@ -1,3 +1,4 @@
 from _typeshed import Incomplete
 
 logger: Incomplete
+LAZY_INDEX_FNAME: str
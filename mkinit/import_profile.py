@@ -0,0 +1,351 @@
+"""
+Measures how much importing each submodule of a package costs.
+
+Each submodule found by :func:`mkinit.static_mkinit._find_local_submodules`
+is imported in its own ``python -X importtime`` subprocess, so modules that
+were already imported by an earlier submodule do not hide its cost. The
+parent packages are replaced by empty namespace stubs, so the cost of the
+existing ``__init__.py`` is not attributed to every submodule. If a submodule
+cannot be imported that way (e.g. it imports a name defined by the
+``__init__.py``), it is imported normally instead.
+
+The resulting table helps to decide which submodules are cheap enough to
+import eagerly and which should be imported lazily or listed in
+``__protected__``.
+
+Example:
+    >>> from mkinit.import_profile import *  # NOQA
+    >>> prof = profile_submodules('mkinit.util')
+    >>> costs = {cost.modname: cost for cost in prof.costs}
+    >>> cost = costs['mkinit.util.util_diff']
+    >>> assert cost.error is None and cost.isolated
+    >>> assert cost.cumulative_us >= cost.self_us > 0
+    >>> print(prof.format_table())  # xdoctest: +IGNORE_WANT
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+__all__ = [
+    'ImportCost',
+    'ImportProfile',
+    'parse_importtime',
+    'profile_import',
+    'profile_submodules',
+    'load_import_costs',
+]
+
+# Uses __import__ because importlib.import_module is not timed by importtime
+_IMPORT_SCRIPT = """
+import sys
+import types
+for name, path in {parents!r}:
+    module = types.ModuleType(name)
+    module.__path__ = [path]
+    sys.modules[name] = module
+__import__({modname!r})
+"""
+
+
+class ImportCost:
+    """
+    The cost of importing one module in a fresh interpreter.
+
+    Attributes:
+        modname (str): the imported module
+
+        self_us (int): microseconds spent in the module's own code
+
+        cumulative_us (int): microseconds including the modules it imported
+
+        modules (List[str]): the other modules that were imported with it
+
+        isolated (bool): False if the parent packages had to be imported
+            for real, in which case their cost is included
+
+        error (str | None): the end of stderr if the import failed
+    """
+
+    def __init__(
+        self,
+        modname,
+        self_us=0,
+        cumulative_us=0,
+        modules=None,
+        isolated=True,
+        error=None,
+    ):
+        self.modname = modname
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.modules = [] if modules is None else modules
+        self.isolated = isolated
+        self.error = error
+
+    def __repr__(self):
+        return '{}({!r}, cumulative_us={})'.format(
+            self.__class__.__name__, self.modname, self.cumulative_us
+        )
+
+    def to_dict(self):
+        """
+        Returns:
+            Dict: JSON serializable data
+        """
+        return {
+            'modname': self.modname,
+            'self_us': self.self_us,
+            'cumulative_us': self.cumulative_us,
+            'num_modules': len(self.modules),
+            'modules': list(self.modules),
+            'isolated': self.isolated,
+            'error': self.error,
+        }
+
+
+class ImportProfile:
+    """
+    The import costs of the submodules of a package, most expensive first.
+
+    Attributes:
+        modname (str): the package
+
+        costs (List[ImportCost]): the cost of each submodule
+    """
+
+    def __init__(self, modname, costs):
+        self.modname = modname
+        self.costs = sorted(
+            costs,
+            key=lambda c: (c.error is not None, -c.cumulative_us, c.modname),
+        )
+
+    def __repr__(self):
+        return '{}({!r}, num_costs={})'.format(
+            self.__class__.__name__, self.modname, len(self.costs)
+        )
+
+    def to_dict(self):
+        """
+        Returns:
+            Dict: JSON serializable data
+        """
+        return {
+            'modname': self.modname,
+            'costs': [cost.to_dict() for cost in self.costs],
+        }
+
+    def dumps(self):
+        """
+        Returns:
+            str: the profile as JSON
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def format_table(self):
+        """
+        Returns:
+            str: a human readable report
+        """
+        lines = [
+            'Import cost of the submodules of {}'.format(self.modname),
+            '{:>10} {:>10} {:>8}  {}'.format(
+                'cumul_ms', 'self_ms', 'modules', 'submodule'
+            ),
+        ]
+        for cost in self.costs:
+            if cost.error is not None:
+                lines.append(
+                    '{:>10} {:>10} {:>8}  {} (failed)'.format(
+                        '-', '-', '-', cost.modname
+                    )
+                )
+                continue
+            lines.append(
+                '{:>10.2f} {:>10.2f} {:>8}  {}{}'.format(
+                    cost.cumulative_us / 1000,
+                    cost.self_us / 1000,
+                    len(cost.modules),
+                    cost.modname,
+                    '' if cost.isolated else ' (with parents)',
+                )
+            )
+        return '\n'.join(lines)
+
+
+def parse_importtime(text):
+    """
+    Parses the stderr of ``python -X importtime``.
+
+    Args:
+        text (str): the output to parse
+
+    Returns:
+        List[Tuple[int, str, int, int]]: the nesting depth, name, self and
+            cumulative microseconds of each import, in the order they
+            finished, so nested imports come before the import of their
+            parent.
+
+    Example:
+        >>> from mkinit.import_profile import *  # NOQA
+        >>> text = chr(10).join([
+        >>>     'import time: self [us] | cumulative | imported package',
+        >>>     'import time:       200 |        200 |   json.decoder',
+        >>>     'import time:       100 |        300 | json',
+        >>>     'Traceback (most recent call last):',
+        >>> ])
+        >>> parse_importtime(text)
+        [(1, 'json.decoder', 200, 200), (0, 'json', 100, 300)]
+    """
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:') :].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            # The header line
+            continue
+        name_part = parts[2][1:]
+        name = name_part.lstrip(' ')
+        depth = (len(name_part) - len(name)) // 2
+        rows.append((depth, name, self_us, cumulative_us))
+    return rows
+
+
+def profile_import(modname, sys_path=(), parents=None, python=None):
+    """
+    Imports a module in a subprocess and measures its cost.
+
+    Args:
+        modname (str): the module to import
+
+        sys_path (Iterable[str]): directories prepended to ``PYTHONPATH``
+
+        parents (List[Tuple[str, str]] | None): the name and directory of
+            each parent package to replace with an empty stub, outermost
+            first.
+
+        python (str | None): the interpreter, defaults to ``sys.executable``
+
+    Returns:
+        ImportCost
+    """
+    if python is None:
+        python = sys.executable
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join(
+        list(sys_path) + [p for p in [env.get('PYTHONPATH')] if p]
+    )
+    script = _IMPORT_SCRIPT.format(parents=list(parents or []), modname=modname)
+    proc = subprocess.run(
+        [python, '-X', 'importtime', '-c', script],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    cost = ImportCost(modname, isolated=bool(parents))
+    if proc.returncode != 0:
+        cost.error = '\n'.join(proc.stderr.splitlines()[-5:])
+        return cost
+    rows = parse_importtime(proc.stderr)
+    for idx in range(len(rows) - 1, -1, -1):
+        depth, name, self_us, cumulative_us = rows[idx]
+        if depth == 0 and name == modname:
+            cost.self_us = self_us
+            cost.cumulative_us = cumulative_us
+            # Nested imports precede the module, deeper than it
+            start = idx
+            while start > 0 and rows[start - 1][0] > 0:
+                start -= 1
+            cost.modules = [row[1] for row in rows[start:idx]]
+            break
+    return cost
+
+
+def profile_submodules(modpath_or_name, python=None):
+    """
+    Measures the import cost of each submodule of a package.
+
+    Args:
+        modpath_or_name (str | PathLike): the package
+
+        python (str | None): the interpreter, defaults to ``sys.executable``
+
+    Returns:
+        ImportProfile
+    """
+    from os.path import join
+
+    from mkinit.static_mkinit import _find_local_submodules, _rectify_to_modpath
+    from mkinit.util import util_import
+
+    modpath = _rectify_to_modpath(modpath_or_name)
+    modname = util_import.modpath_to_modname(modpath, check=False)
+    root_dpath, rel_path = util_import.split_modpath(modpath, check=False)
+    rel_parts = rel_path.replace('\\', '/').split('/')
+    if rel_parts[-1] == '__init__.py':
+        rel_parts = rel_parts[:-1]
+    parents = [
+        (
+            '.'.join(rel_parts[: idx + 1]),
+            join(root_dpath, *rel_parts[: idx + 1]),
+        )
+        for idx in range(len(rel_parts))
+    ]
+
+    costs = []
+    for rel_modname, _ in _find_local_submodules(modpath):
+        sub_modname = modname + '.' + rel_modname
+        cost = profile_import(
+            sub_modname, sys_path=[root_dpath], parents=parents, python=python
+        )
+        if cost.error is not None:
+            cost = profile_import(
+                sub_modname, sys_path=[root_dpath], python=python
+            )
+        costs.append(cost)
+    return ImportProfile(modname, costs)
+
+
+def load_import_costs(fpath):
+    """
+    Reads the import costs written by :func:`ImportProfile.dumps` (i.e. by
+    ``--import-profile=json``).
+
+    Args:
+        fpath (str | PathLike): a JSON file with a profile or a list of them
+
+    Returns:
+        Dict[str, int]: the cumulative microseconds of each module that could
+            be imported
+
+    Example:
+        >>> from mkinit.import_profile import *  # NOQA
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/import_costs').ensuredir()
+        >>> prof = ImportProfile('pkg', [
+        >>>     ImportCost('pkg.a', 10, 20000),
+        >>>     ImportCost('pkg.b', error='ImportError'),
+        >>> ])
+        >>> fpath = dpath / 'costs.json'
+        >>> fpath.write_text(prof.dumps())
+        >>> load_import_costs(fpath)
+        {'pkg.a': 20000}
+    """
+    with open(fpath, 'r') as file:
+        data = json.load(file)
+    profiles = data if isinstance(data, list) else [data]
+    return {
+        cost['modname']: cost['cumulative_us']
+        for prof in profiles
+        for cost in prof['costs']
+        if cost['error'] is None
+    }
@@ -0,0 +1,42 @@
+from os import PathLike
+from typing import Dict, Iterable, List, Tuple
+
+class ImportCost:
+    modname: str
+    self_us: int
+    cumulative_us: int
+    modules: List[str]
+    isolated: bool
+    error: str | None
+
+    def __init__(
+        self,
+        modname: str,
+        self_us: int = 0,
+        cumulative_us: int = 0,
+        modules: List[str] | None = None,
+        isolated: bool = True,
+        error: str | None = None,
+    ) -> None: ...
+    def to_dict(self) -> Dict: ...
+
+class ImportProfile:
+    modname: str
+    costs: List[ImportCost]
+
+    def __init__(self, modname: str, costs: List[ImportCost]) -> None: ...
+    def to_dict(self) -> Dict: ...
+    def dumps(self) -> str: ...
+    def format_table(self) -> str: ...
+
+def parse_importtime(text: str) -> List[Tuple[int, str, int, int]]: ...
+def profile_import(
+    modname: str,
+    sys_path: Iterable[str] = ...,
+    parents: List[Tuple[str, str]] | None = None,
+    python: str | None = None,
+) -> ImportCost: ...
+def load_import_costs(fpath: str | PathLike) -> Dict[str, int]: ...
+def profile_submodules(
+    modpath_or_name: str | PathLike, python: str | None = None
+) -> ImportProfile: ...
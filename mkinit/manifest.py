@@ -0,0 +1,288 @@
+"""
+Manifest of the inputs and outputs of previous runs, used to skip packages
+that do not need to be regenerated.
+
+For each package the manifest records:
+
+    * a key derived from the formatting options, ``respect_all``, explicitly
+      given submodules, the mkinit version, and the version of the rules
+      used to extract names from modules (see :mod:`mkinit.cache`).
+
+    * the names in the package directory, so added or removed submodules are
+      detected.
+
+    * the stat information and sha256 of every file that was parsed to
+      generate the package (i.e. its submodules and external modules).
+
+    * the sha256 of every file that was generated.
+
+A package is skipped if its key and directory listing match and none of its
+inputs changed. The user section of the ``__init__.py`` is also an input, but
+because it is part of the generated file, it is covered by requiring the file
+on disk to match the recorded output. This also means a package is never
+skipped if its ``__init__.py`` is out of date, so the manifest can be updated
+in dry / diff mode as well.
+
+Inputs are first compared by mtime and size and only hashed if those differ
+(e.g. in a fresh checkout), so checking an unchanged package only costs a few
+``stat`` calls and one read of the generated file.
+
+Paths are stored relative to the manifest so it remains valid if the
+repository is moved or checked out elsewhere.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from os.path import abspath, basename, dirname, isabs, join, normpath, relpath
+
+from mkinit.cache import _EXTRACT_SCHEMA_VERSION, RACY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FNAME = '.mkinit-manifest.json'
+
+# Increment if the structure of the manifest changes
+MANIFEST_VERSION = 1
+
+
+def _hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class Manifest:
+    """
+    Records the inputs and outputs of each generated package.
+
+    Args:
+        fpath (str | PathLike): path to the manifest file
+
+    Attributes:
+        num_skipped (int): number of packages that were up to date
+
+    Example:
+        >>> from mkinit.manifest import *  # NOQA
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/manifest').delete().ensuredir()
+        >>> pkg = (dpath / 'pkg').ensuredir()
+        >>> (pkg / 'mod.py').write_text('def foo(): pass')
+        >>> (pkg / '__init__.py').write_text('from .mod import foo')
+        >>> self = Manifest(dpath / MANIFEST_FNAME)
+        >>> key = self.package_key({'relative': True})
+        >>> assert self.check(pkg, key) is None
+        >>> results = [(pkg / '__init__.py', '', 'from .mod import foo')]
+        >>> self.update(pkg, key, [pkg / 'mod.py'], results)
+        >>> self.save()
+        >>> self = Manifest(dpath / MANIFEST_FNAME)
+        >>> assert self.check(pkg, key) is not None
+        >>> assert self.check(pkg, self.package_key({})) is None
+        >>> (pkg / 'mod.py').write_text('def bar(): pass')
+        >>> assert self.check(pkg, key) is None
+    """
+
+    def __init__(self, fpath):
+        self.fpath = abspath(os.fspath(fpath))
+        self.dpath = dirname(self.fpath)
+        self.num_skipped = 0
+        self._dirty = False
+        self._packages = self._load()
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.fpath)
+
+    def _load(self):
+        try:
+            with open(self.fpath, 'r') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as ex:
+            logger.warning('Ignoring unreadable manifest: {!r}'.format(ex))
+            return {}
+        if data.get('version', None) != MANIFEST_VERSION:
+            return {}
+        return data.get('packages', {})
+
+    def _relpath(self, path):
+        path = abspath(os.fspath(path))
+        try:
+            return relpath(path, self.dpath).replace(os.sep, '/')
+        except ValueError:  # nocover
+            # On windows paths on different drives have no relative path
+            return path
+
+    def _abspath(self, path):
+        if isabs(path):
+            return path
+        return normpath(join(self.dpath, path))
+
+    @staticmethod
+    def package_key(options, respect_all=True, submodules=None):
+        """
+        Hashes everything other than files that influences generated text.
+
+        Args:
+            options (dict): formatting options
+            respect_all (bool): the respect_all flag
+            submodules (List[str] | Dict | None): explicitly given submodules
+
+        Returns:
+            str
+        """
+        import mkinit
+
+        data = {
+            'options': options,
+            'respect_all': bool(respect_all),
+            'submodules': submodules,
+            'version': mkinit.__version__,
+            'extract_schema': _EXTRACT_SCHEMA_VERSION,
+        }
+        text = json.dumps(data, sort_keys=True, default=repr)
+        return _hash_bytes(text.encode('utf8'))
+
+    @staticmethod
+    def _listing(modpath):
+        try:
+            names = sorted(os.listdir(modpath))
+        except OSError:
+            return None
+        return _hash_bytes('\n'.join(names).encode('utf8'))
+
+    def _input_unchanged(self, fpath, record):
+        try:
+            stat = os.stat(fpath)
+        except OSError:
+            return False
+        if (
+            not record['racy']
+            and record['mtime_ns'] == stat.st_mtime_ns
+            and record['size'] == stat.st_size
+        ):
+            return True
+        try:
+            with open(fpath, 'rb') as file:
+                data = file.read()
+        except OSError:  # nocover
+            return False
+        if _hash_bytes(data) != record['hash']:
+            return False
+        # The content is the same, so remember the new stat to make the next
+        # check cheap.
+        record.update(self._input_record(fpath, stat, record['hash']))
+        self._dirty = True
+        return True
+
+    def _input_record(self, fpath, stat=None, content_hash=None):
+        if stat is None:
+            stat = os.stat(fpath)
+        if content_hash is None:
+            with open(fpath, 'rb') as file:
+                content_hash = _hash_bytes(file.read())
+        return {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'racy': (time.time() - stat.st_mtime) < RACY_SECONDS,
+            'hash': content_hash,
+        }
+
+    def check(self, modpath, key, init_model=None):
+        """
+        Checks if a package is up to date.
+
+        Args:
+            modpath (str | PathLike): path to the package directory
+            key (str): the result of :func:`Manifest.package_key`
+            init_model (InitFileModel | None): a model of the package's
+                ``__init__.py``, which reads the outputs so they can be
+                shared with the generation of the package if it is stale
+
+        Returns:
+            List[Tuple[str, str, str]] | None:
+                None if the package must be regenerated. Otherwise the path,
+                old text, and new text of each output (in the format returned
+                by ``_generate_package``) where the old and new text are the
+                current text on disk.
+        """
+        entry = self._packages.get(self._relpath(modpath), None)
+        if entry is None or entry['key'] != key:
+            return None
+        if entry['listing'] != self._listing(modpath):
+            return None
+        for rel_fpath, record in entry['inputs'].items():
+            if not self._input_unchanged(self._abspath(rel_fpath), record):
+                return None
+        if init_model is None:
+            from mkinit.models import InitFileModel
+
+            init_model = InitFileModel(modpath)
+        results = []
+        for rel_fpath, output_hash in entry['outputs']:
+            fpath = self._abspath(rel_fpath)
+            if dirname(fpath) != normpath(abspath(modpath)):
+                # Outputs are always next to the init
+                return None
+            try:
+                # Text mode so the hash matches regardless of line endings
+                text = init_model.sibling_text(basename(fpath))
+            except (OSError, UnicodeDecodeError):
+                text = None
+            if text is None:
+                return None
+            if _hash_bytes(text.encode('utf8')) != output_hash:
+                return None
+            results.append((fpath, text, text))
+        self.num_skipped += 1
+        return results
+
+    def update(self, modpath, key, inputs, results):
+        """
+        Records the inputs and outputs of a generated package.
+
+        Args:
+            modpath (str | PathLike): path to the package directory
+            key (str): the result of :func:`Manifest.package_key`
+            inputs (List[str | PathLike]): the files parsed during generation
+            results (List[Tuple[str, str, str]]):
+                the path, old text and new text of each generated file
+        """
+        input_records = {}
+        for fpath in inputs:
+            try:
+                input_records[self._relpath(fpath)] = self._input_record(fpath)
+            except OSError:
+                # Never skip a package if we cannot check its inputs
+                self._packages.pop(self._relpath(modpath), None)
+                self._dirty = True
+                return
+        outputs = [
+            (self._relpath(fpath), _hash_bytes(new_text.encode('utf8')))
+            for fpath, old_text, new_text in results
+        ]
+        self._packages[self._relpath(modpath)] = {
+            'key': key,
+            'listing': self._listing(modpath),
+            'inputs': input_records,
+            'outputs': outputs,
+        }
+        self._dirty = True
+
+    def save(self):
+        """
+        Writes the manifest if it changed.
+        """
+        if not self._dirty:
+            return
+        data = {
+            'version': MANIFEST_VERSION,
+            'packages': self._packages,
+        }
+        os.makedirs(self.dpath, exist_ok=True)
+        fd, tmp_fpath = tempfile.mkstemp(dir=self.dpath, suffix='.tmp')
+        with os.fdopen(fd, 'w') as file:
+            json.dump(data, file, indent=1, sort_keys=True)
+        os.replace(tmp_fpath, self.fpath)
+        self._dirty = False
@@ -0,0 +1,37 @@
+from os import PathLike
+from typing import Dict, List, Tuple
+
+from _typeshed import Incomplete
+
+from mkinit.models import InitFileModel
+
+logger: Incomplete
+MANIFEST_FNAME: str
+MANIFEST_VERSION: int
+
+class Manifest:
+    fpath: str
+    dpath: str
+    num_skipped: int
+
+    def __init__(self, fpath: str | PathLike) -> None: ...
+    @staticmethod
+    def package_key(
+        options: dict,
+        respect_all: bool = True,
+        submodules: List[str] | Dict | None = None,
+    ) -> str: ...
+    def check(
+        self,
+        modpath: str | PathLike,
+        key: str,
+        init_model: InitFileModel | None = None,
+    ) -> List[Tuple[str, str, str]] | None: ...
+    def update(
+        self,
+        modpath: str | PathLike,
+        key: str,
+        inputs: List[str | PathLike],
+        results: List[Tuple[str, str, str]],
+    ) -> None: ...
+    def save(self) -> None: ...
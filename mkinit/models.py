@@ -0,0 +1,592 @@
+"""
+Intermediate representations of the files mkinit reads.
+
+These objects let the static pipeline parse each file exactly once per run and
+share the result between every step that needs it.
+"""
+
+import ast
+import copy
+import warnings
+from os.path import basename, exists, join
+
+from mkinit import static_analysis as static
+from mkinit.profiling import phase
+from mkinit.top_level_ast import TopLevelVisitor
+
+__all__ = [
+    'ExportModel',
+    'InitFileModel',
+    'ModuleSummary',
+]
+
+
+# Maps each user declaration variable to the deprecated aliases it replaces
+USER_DECL_MAIN_TO_ALIASES = {
+    '__submodules__': ['__SUBMODULES__'],
+    '__explicit__': ['__extra_all__'],
+    '__external__': [],
+    '__protected__': [],
+    '__private__': [],
+    '__ignore__': [],
+    '__lazy__': [],
+}
+
+
+def _scan_user_declarations(nodes):
+    """
+    Finds mkinit declaration variables, ``__all__``, and the methods of a
+    ``__module_properties__`` class.
+
+    Uses the scope rules of :func:`mkinit.static_analysis.parse_static_value`:
+    only statements that run in module scope are considered (including
+    top-level ``if`` and ``try`` blocks, but not ``__main__`` blocks or
+    function and class bodies), and the last static assignment of each
+    variable wins.
+
+    Args:
+        nodes (List[ast.stmt]): top-level statements of a parsed module
+
+    Returns:
+        Tuple[List[str] | None, Dict[str, Any]]:
+            the value of ``__all__`` and the user declarations
+
+    Example:
+        >>> from mkinit.models import _scan_user_declarations
+        >>> import ast
+        >>> source = chr(10).join([
+        >>>     '__all__ = ["a"]',
+        >>>     '__private__ = ["x"]',
+        >>>     'class Spam:',
+        >>>     '    __all__ = ["b"]',
+        >>>     'if __name__ == "__main__":',
+        >>>     '    __all__ = ["c"]',
+        >>>     '    __private__ = ["y"]',
+        >>> ])
+        >>> _scan_user_declarations(ast.parse(source).body)
+        (['a'], {'__private__': ['x']})
+    """
+    name_to_main = {}
+    for main, aliases in USER_DECL_MAIN_TO_ALIASES.items():
+        name_to_main[main] = main
+        for alias in aliases:
+            name_to_main[alias] = main
+
+    all_names = None
+    found_all = False
+    # Maps each declaration to the line of its assignment and its value
+    found = {}
+    module_property_names = None
+    for node in static._iter_module_scope_reversed(nodes):
+        if isinstance(node, ast.ClassDef):
+            if (
+                node.name == '__module_properties__'
+                and module_property_names is None
+            ):
+                # If we detect a special class named __module_properties__
+                # we will inject its properties into our module namespace.
+                module_property_names = [
+                    item.name
+                    for item in node.body
+                    if isinstance(item, ast.FunctionDef)
+                ]
+            continue
+        if isinstance(node, ast.Assign):
+            target_ids = [getattr(t, 'id', None) for t in node.targets]
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            # Handle annotated assignments like `VAR: Type = value`
+            target_ids = [getattr(node.target, 'id', None)]
+        else:
+            continue
+        for target_id in target_ids:
+            if target_id == '__all__':
+                if found_all:
+                    continue
+                try:
+                    all_names = list(
+                        static._parse_static_node_value(node.value)
+                    )
+                except TypeError as ex:
+                    # Fallback to the previous static assignment
+                    warnings.warn(repr(ex))
+                else:
+                    found_all = True
+            elif target_id in name_to_main:
+                main_id = name_to_main[target_id]
+                if main_id in found:
+                    continue
+                if main_id != target_id:
+                    # TODO: come up with a schedule to deprecate old
+                    # aliases.
+                    warnings.warn(
+                        f'Use {main_id} instead, {target_id} is deprecated as '
+                        'a mkinit attribute and may no longer be respected in '
+                        'future versions.',
+                        DeprecationWarning,
+                    )
+                try:
+                    value = static._parse_static_node_value(node.value)
+                except TypeError as ex:
+                    warnings.warn(repr(ex))
+                else:
+                    found[main_id] = (node.lineno, value)
+
+    # Keep the declarations in source order
+    user_decl = {
+        key: value
+        for key, (_, value) in sorted(found.items(), key=lambda t: t[1][0])
+    }
+    if module_property_names is not None:
+        user_decl['module_property_names'] = module_property_names
+    return all_names, user_decl
+
+
+class ModuleSummary:
+    """
+    Everything mkinit needs to know about a module, produced by one parse and
+    one pass over the top-level statements.
+
+    Attributes:
+        all_names (List[str] | None):
+            the static value of ``__all__`` if the module defines one.
+
+        attrnames (List[str]):
+            top-level attribute names in source order
+
+        user_decl (Dict[str, Any]):
+            the mkinit declaration variables (e.g. ``__submodules__``) and
+            ``module_property_names`` if ``__module_properties__`` is defined.
+
+    Example:
+        >>> from mkinit.models import *  # NOQA
+        >>> source = '\n'.join([
+        >>>     '__submodules__ = ["foo"]',
+        >>>     'def func(): pass',
+        >>>     '_private = 1',
+        >>>     'class Spam: pass',
+        >>> ])
+        >>> self = ModuleSummary.from_source(source)
+        >>> print(self.attrnames)
+        ['__submodules__', 'func', '_private', 'Spam']
+        >>> print(self.user_decl)
+        {'__submodules__': ['foo']}
+        >>> print(self.exported_names())
+        ['func', 'Spam']
+        >>> self = ModuleSummary.from_source('__all__ = ["func"]\ndef func(): pass')
+        >>> print(self.exported_names())
+        ['func']
+    """
+
+    def __init__(self, all_names=None, attrnames=None, user_decl=None):
+        self.all_names = all_names
+        self.attrnames = [] if attrnames is None else attrnames
+        self.user_decl = {} if user_decl is None else user_decl
+
+    def __repr__(self):
+        return '{}(all_names={!r}, attrnames={!r}, user_decl={!r})'.format(
+            self.__class__.__name__,
+            self.all_names,
+            self.attrnames,
+            self.user_decl,
+        )
+
+    @classmethod
+    def from_source(cls, source, fpath=None):
+        """
+        Args:
+            source (str): python source code
+            fpath (str | PathLike | None): used in error messages
+
+        Returns:
+            ModuleSummary
+
+        Raises:
+            SyntaxError: if the source cannot be parsed
+        """
+        try:
+            pt = ast.parse(source)
+        except SyntaxError as ex:
+            if fpath is None:
+                raise
+            msg = 'modpath={} has bad syntax: {}'.format(fpath, ex)
+            raise SyntaxError(msg)
+        return cls.from_nodes(pt.body)
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        """
+        Args:
+            nodes (List[ast.stmt]): top-level statements of a parsed module
+
+        Returns:
+            ModuleSummary
+        """
+        top_level = TopLevelVisitor()
+        for node in nodes:
+            top_level.visit(node)
+        all_names, user_decl = _scan_user_declarations(nodes)
+        self = cls(
+            all_names=all_names,
+            attrnames=list(top_level.attrnames),
+            user_decl=user_decl,
+        )
+        return self
+
+    @classmethod
+    def from_fpath(cls, fpath):
+        """
+        Args:
+            fpath (str | PathLike): path to a python file
+
+        Returns:
+            ModuleSummary
+        """
+        with open(fpath, 'r', encoding='utf8') as file:
+            source = file.read()
+        return cls.from_source(source, fpath=fpath)
+
+    def exported_names(self, respect_all=True):
+        """
+        The names ``from module import *`` would expose.
+
+        Args:
+            respect_all (bool):
+                if False, ignore ``__all__`` and use all public top-level
+                attributes.
+
+        Returns:
+            List[str]
+        """
+        if respect_all and self.all_names is not None:
+            return list(self.all_names)
+
+        import builtins
+
+        # list of names we wont export by default
+        invalid_callnames = set(dir(builtins))
+        valid_attrs = []
+        for attr in self.attrnames:
+            if attr.startswith('_'):
+                continue
+            if attr in invalid_callnames:  # nocover
+                continue
+            valid_attrs.append(attr)
+        return valid_attrs
+
+
+class InitFileModel:
+    """
+    The existing ``__init__`` file of a package.
+
+    The file is read once and everything mkinit derives from it is computed
+    lazily and cached, so it can be passed through the whole pipeline instead
+    of having each step re-read and re-parse the file.
+
+    Args:
+        modpath (str | PathLike): path to the package directory
+        interface (bool): if True, model the ``__init__.pyi`` file instead
+
+    Example:
+        >>> from mkinit.models import *  # NOQA
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/init_model').delete().ensuredir()
+        >>> (dpath / '__init__.py').write_text(ub.codeblock(
+        >>>     '''
+        >>>     __protected__ = ['foo']
+        >>>     custom = 1
+        >>>     # <AUTOGEN_INIT>
+        >>>     from .foo import bar
+        >>>     # </AUTOGEN_INIT>
+        >>>     '''))
+        >>> self = InitFileModel(dpath)
+        >>> print(self.insert_points)
+        (3, 4, '')
+        >>> print(self.user_decl)
+        {'__protected__': ['foo']}
+        >>> print(self.user_attrs)
+        ['custom']
+        >>> print(self.render('from .foo import baz'))
+        __protected__ = ['foo']
+        custom = 1
+        # <AUTOGEN_INIT>
+        from .foo import baz
+        # </AUTOGEN_INIT>
+        <BLANKLINE>
+    """
+
+    def __init__(self, modpath, interface=False):
+        self.modpath = modpath
+        self.fpath = join(
+            modpath, '__init__.pyi' if interface else '__init__.py'
+        )
+        self._cache = {}
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.fpath)
+
+    def _cached(self, key, func):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = func()
+            return value
+
+    @property
+    def lines(self):
+        """
+        List[str]: the lines of the file (empty if it does not exist)
+        """
+
+        def _read():
+            if exists(self.fpath):
+                with open(self.fpath, 'r') as file_:
+                    return file_.readlines()
+            return []
+
+        return self._cached('lines', _read)
+
+    @property
+    def text(self):
+        """
+        str: the current text of the file (empty if it does not exist)
+        """
+        return self._cached('text', lambda: ''.join(self.lines))
+
+    def sibling_text(self, fname):
+        """
+        Reads a file in the package directory once, e.g. the other outputs
+        of the package.
+
+        Args:
+            fname (str): the name of the file, e.g. ``_mkinit_index.json``
+
+        Returns:
+            str | None: the text of the file, or None if it does not exist
+                or cannot be read. The modeled file itself is not read again.
+        """
+        if fname == basename(self.fpath):
+            return self.text if exists(self.fpath) else None
+
+        def _read():
+            try:
+                with open(
+                    join(self.modpath, fname), 'r', encoding='utf8'
+                ) as file:
+                    return file.read()
+            except (OSError, UnicodeDecodeError):
+                return None
+
+        return self._cached(('sibling', fname), _read)
+
+    @property
+    def insert_points(self):
+        """
+        Tuple[int, int, str]: see :func:`mkinit.formatting._find_insert_points`
+        """
+        from mkinit.formatting import _find_insert_points
+
+        return self._cached(
+            'insert_points', lambda: _find_insert_points(self.lines)
+        )
+
+    @property
+    def user_text(self):
+        """
+        str: the text outside of the autogenerated region
+        """
+
+        def _user_text():
+            startline, endline, _ = self.insert_points
+            return ''.join(self.lines[:startline] + self.lines[endline:])
+
+        return self._cached('user_text', _user_text)
+
+    @property
+    def _tree(self):
+        def _parse():
+            with phase('parse', self.fpath):
+                return ast.parse(self.text)
+
+        return self._cached('tree', _parse)
+
+    @property
+    def summary(self):
+        """
+        ModuleSummary: summary of the entire file
+        """
+        return self._cached(
+            'summary', lambda: ModuleSummary.from_nodes(self._tree.body)
+        )
+
+    @property
+    def user_summary(self):
+        """
+        ModuleSummary: summary of the text outside of the autogenerated region
+        """
+
+        def _user_summary():
+            startline, endline, _ = self.insert_points
+            user_nodes = []
+            for node in self._tree.body:
+                first = node.lineno - 1
+                last = node.end_lineno - 1
+                if first < startline <= last or first < endline <= last:
+                    # The autogenerated region is nested inside this
+                    # statement, so we have to parse the user text on its own
+                    return ModuleSummary.from_source(self.user_text)
+                if not (startline <= first < endline):
+                    user_nodes.append(node)
+            return ModuleSummary.from_nodes(user_nodes)
+
+        return self._cached('user_summary', _user_summary)
+
+    @property
+    def user_decl(self):
+        """
+        Dict[str, Any]: the user declarations (a fresh copy on each access)
+        """
+        return copy.deepcopy(self.summary.user_decl)
+
+    @property
+    def user_attrs(self):
+        """
+        List[str]: public names defined by the user outside of the
+        autogenerated region
+        """
+        return self.user_summary.exported_names()
+
+    @property
+    def module_property_names(self):
+        """
+        List[str] | None: methods of the ``__module_properties__`` class
+        """
+        return self.summary.user_decl.get('module_property_names', None)
+
+    def render(self, initstr):
+        """
+        Inserts autogenerated text into the file.
+
+        Args:
+            initstr (str): the autogenerated code
+
+        Returns:
+            str: the new text of the file
+        """
+        from mkinit.formatting import _indent
+
+        lines = self.lines
+        startline, endline, init_indent = self.insert_points
+        initstr_ = _indent(initstr, init_indent) + '\n'
+
+        QUICKFIX_REMOVE_LEADING_NEWLINES = 1
+        if QUICKFIX_REMOVE_LEADING_NEWLINES:
+            initstr_ = initstr_.lstrip('\n')
+
+        new_lines = lines[:startline] + [initstr_] + lines[endline:]
+
+        new_text = ''.join(new_lines).rstrip() + '\n'
+        return new_text
+
+
+class ExportModel:
+    """
+    The names a package exports, as found by a single analysis of the
+    package. Several outputs can be rendered from it, e.g. the runtime
+    ``__init__.py`` and the ``__init__.pyi`` interface of a typed lazy
+    package.
+
+    Attributes:
+        modname (str): the name of the package
+
+        imports (List[str]): the submodule imports, e.g. ``.sub``
+
+        from_imports (List[Tuple[str, List[str]]]): each submodule and the
+            attributes exposed from it
+
+        explicit (List[str]): names to explicitly include in ``__all__``
+
+        protected (List[str]): modules whose attributes are not exposed
+
+        private (List[str]): modules and attributes to exclude
+
+        module_property_names (List[str] | None): names defined by
+            ``__module_properties__``
+
+        eager_groups (List[List[str]] | None): groups of submodules the lazy
+            boilerplate can warm in parallel
+
+        lazy (List[str]): submodules to import lazily in hybrid mode
+
+    Example:
+        >>> from mkinit.models import *  # NOQA
+        >>> self = ExportModel('pkg', ['.sub'], [('.sub', ['func'])])
+        >>> print(self.render({'relative': True}))
+        from . import sub
+        <BLANKLINE>
+        from .sub import (func,)
+        <BLANKLINE>
+        __all__ = ['func', 'sub']
+        >>> text = self.render({'relative': True, 'lazy_loader': True})
+        >>> assert 'lazy_loader.attach' in text
+    """
+
+    def __init__(
+        self,
+        modname,
+        imports,
+        from_imports,
+        explicit=None,
+        protected=None,
+        private=None,
+        module_property_names=None,
+        eager_groups=None,
+        lazy=None,
+    ):
+        self.modname = modname
+        self.imports = imports
+        self.from_imports = from_imports
+        self.explicit = [] if explicit is None else explicit
+        self.protected = [] if protected is None else protected
+        self.private = [] if private is None else private
+        self.module_property_names = module_property_names
+        self.eager_groups = eager_groups
+        self.lazy = [] if lazy is None else lazy
+
+    def __repr__(self):
+        return '{}({!r}, num_imports={})'.format(
+            self.__class__.__name__, self.modname, len(self.imports)
+        )
+
+    def render(self, options=None, interface=False, sidecar=None):
+        """
+        Renders the autogenerated text.
+
+        Args:
+            options (dict | None): formatting options, see
+                :func:`mkinit.formatting._ensure_options`
+
+            interface (bool): if True, render a ``.pyi`` interface, which
+                always uses plain imports that static type checkers can
+                follow.
+
+            sidecar (Dict | None): updated with the data of the index file
+                the text loads if the ``lazy_sidecar`` option is set.
+
+        Returns:
+            str
+        """
+        from mkinit.formatting import _initstr
+
+        return _initstr(
+            self.modname,
+            self.imports,
+            self.from_imports,
+            explicit=self.explicit,
+            protected=self.protected,
+            private=self.private,
+            options=options,
+            module_property_names=self.module_property_names,
+            eager_groups=None if interface else self.eager_groups,
+            lazy=() if interface else self.lazy,
+            sidecar=None if interface else sidecar,
+        )
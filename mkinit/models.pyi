@@ -0,0 +1,81 @@
+from os import PathLike
+from typing import Any, Dict, List, Tuple
+
+USER_DECL_MAIN_TO_ALIASES: Dict[str, List[str]]
+
+class ModuleSummary:
+    all_names: List[str] | None
+    attrnames: List[str]
+    user_decl: Dict[str, Any]
+
+    def __init__(
+        self,
+        all_names: List[str] | None = None,
+        attrnames: List[str] | None = None,
+        user_decl: Dict[str, Any] | None = None,
+    ) -> None: ...
+    @classmethod
+    def from_source(
+        cls, source: str, fpath: str | PathLike | None = None
+    ) -> ModuleSummary: ...
+    @classmethod
+    def from_fpath(cls, fpath: str | PathLike) -> ModuleSummary: ...
+    def exported_names(self, respect_all: bool = True) -> List[str]: ...
+
+class InitFileModel:
+    modpath: str | PathLike
+    fpath: str
+
+    def __init__(
+        self, modpath: str | PathLike, interface: bool = False
+    ) -> None: ...
+    @property
+    def lines(self) -> List[str]: ...
+    @property
+    def text(self) -> str: ...
+    def sibling_text(self, fname: str) -> str | None: ...
+    @property
+    def insert_points(self) -> Tuple[int, int, str]: ...
+    @property
+    def user_text(self) -> str: ...
+    @property
+    def summary(self) -> ModuleSummary: ...
+    @property
+    def user_summary(self) -> ModuleSummary: ...
+    @property
+    def user_decl(self) -> Dict[str, Any]: ...
+    @property
+    def user_attrs(self) -> List[str]: ...
+    @property
+    def module_property_names(self) -> List[str] | None: ...
+    def render(self, initstr: str) -> str: ...
+
+class ExportModel:
+    modname: str
+    imports: List[str]
+    from_imports: List[Tuple[str, List[str]]]
+    explicit: List[str]
+    protected: List[str]
+    private: List[str]
+    module_property_names: List[str] | None
+    eager_groups: List[List[str]] | None
+    lazy: List[str]
+
+    def __init__(
+        self,
+        modname: str,
+        imports: List[str],
+        from_imports: List[Tuple[str, List[str]]],
+        explicit: List[str] | None = None,
+        protected: List[str] | None = None,
+        private: List[str] | None = None,
+        module_property_names: List[str] | None = None,
+        eager_groups: List[List[str]] | None = None,
+        lazy: List[str] | None = None,
+    ) -> None: ...
+    def render(
+        self,
+        options: Dict[str, Any] | None = None,
+        interface: bool = False,
+        sidecar: Dict[str, Any] | None = None,
+    ) -> str: ...
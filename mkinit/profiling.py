@@ -0,0 +1,243 @@
+"""
+Wall time breakdown of the phases of a run.
+
+The static pipeline marks its expensive steps with :func:`phase`. Outside of
+a profiled run this is a no-op. Inside a :class:`Profile` context, each
+phase records its number of calls and its total and self wall time. Self time
+excludes time spent in nested phases, e.g. ``black`` inside ``format``.
+Phases that process a single file also attribute their time to that file, so
+the slowest files can be reported.
+
+The phases are:
+
+    * ``discover`` - finding the packages and submodules on disk
+    * ``resolve`` - resolving module names to paths
+    * ``parse`` - reading and parsing modules (including cache lookups)
+    * ``format`` - generating the import text
+    * ``black`` - formatting the import text with black
+    * ``diff`` - computing diffs for display
+    * ``write`` - writing files
+
+When ``autogen_init`` runs with several jobs, the phases of the worker
+processes are merged into the profile of the main process, so the sum of the
+phase times can exceed the wall time of the run.
+
+Example:
+    >>> from mkinit.profiling import *  # NOQA
+    >>> import mkinit
+    >>> with Profile() as prof:
+    >>>     text = mkinit.static_init('mkinit')
+    >>> data = prof.to_dict()
+    >>> assert data['phases']['parse']['calls'] > 0
+    >>> assert data['phases']['format']['calls'] == 1
+    >>> assert len(data['slowest_files']) > 0
+    >>> print(prof.format_table())  # xdoctest: +IGNORE_WANT
+"""
+
+import contextlib
+import time
+
+__all__ = ['Profile', 'phase', 'get_profile']
+
+PHASES = ['discover', 'resolve', 'parse', 'format', 'black', 'diff', 'write']
+
+# The profile that phases are currently recorded into, if any
+_ACTIVE_PROFILE = None
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+def get_profile():
+    """
+    Returns:
+        Profile | None: the profile phases are currently recorded into
+    """
+    return _ACTIVE_PROFILE
+
+
+def phase(name, fpath=None):
+    """
+    Marks a block of code as part of a phase of the active profile.
+
+    Args:
+        name (str): the name of the phase
+        fpath (str | PathLike | None): the file being processed, if any
+
+    Returns:
+        ContextManager
+
+    Example:
+        >>> from mkinit.profiling import *  # NOQA
+        >>> with phase('parse'):
+        >>>     pass
+        >>> with Profile() as prof:
+        >>>     with phase('format'):
+        >>>         with phase('black'):
+        >>>             pass
+        >>> assert prof.phases['format']['calls'] == 1
+        >>> assert prof.phases['black']['calls'] == 1
+    """
+    if _ACTIVE_PROFILE is None:
+        return _NULL_CONTEXT
+    return _PhaseTimer(_ACTIVE_PROFILE, name, fpath)
+
+
+class _PhaseTimer:
+    __slots__ = ('profile', 'name', 'fpath', 'start', 'child_seconds')
+
+    def __init__(self, profile, name, fpath):
+        self.profile = profile
+        self.name = name
+        self.fpath = fpath
+        self.child_seconds = 0.0
+
+    def __enter__(self):
+        self.profile._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        stack = self.profile._stack
+        stack.pop()
+        if stack:
+            stack[-1].child_seconds += seconds
+        self.profile._record(
+            self.name, seconds, seconds - self.child_seconds, self.fpath
+        )
+        return False
+
+
+class Profile:
+    """
+    Records the phases of the code that runs while it is active.
+
+    Profiles are not thread safe. Nesting a profile inside another
+    temporarily replaces the outer one.
+
+    Attributes:
+        phases (Dict[str, Dict[str, float]]): maps each phase to its number
+            of ``calls``, total ``seconds`` and ``self_seconds``.
+
+        files (Dict[str, float]): maps each processed file to the total
+            seconds spent on it.
+
+        wall_seconds (float): total time the profile was active
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.files = {}
+        self.wall_seconds = 0.0
+        self._stack = []
+        self._prev = None
+        self._start = None
+
+    def __repr__(self):
+        return '{}(wall_seconds={:.4f})'.format(
+            self.__class__.__name__, self.wall_seconds
+        )
+
+    def __enter__(self):
+        global _ACTIVE_PROFILE
+        self._prev = _ACTIVE_PROFILE
+        _ACTIVE_PROFILE = self
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        global _ACTIVE_PROFILE
+        self.wall_seconds += time.perf_counter() - self._start
+        _ACTIVE_PROFILE = self._prev
+        self._prev = None
+        return False
+
+    def _record(self, name, seconds, self_seconds, fpath=None, calls=1):
+        try:
+            row = self.phases[name]
+        except KeyError:
+            row = self.phases[name] = {
+                'calls': 0,
+                'seconds': 0.0,
+                'self_seconds': 0.0,
+            }
+        row['calls'] += calls
+        row['seconds'] += seconds
+        row['self_seconds'] += self_seconds
+        if fpath is not None:
+            fpath = str(fpath)
+            self.files[fpath] = self.files.get(fpath, 0.0) + self_seconds
+
+    def merge(self, data):
+        """
+        Adds the phases and files of another profile.
+
+        Args:
+            data (Dict): the result of :func:`Profile.to_dict` with
+                ``top=None``.
+        """
+        for name, row in data['phases'].items():
+            self._record(
+                name, row['seconds'], row['self_seconds'], calls=row['calls']
+            )
+        for fpath, seconds in data['slowest_files']:
+            self.files[fpath] = self.files.get(fpath, 0.0) + seconds
+
+    def slowest_files(self, top=10):
+        """
+        Args:
+            top (int | None): the number of files to return, or all if None
+
+        Returns:
+            List[Tuple[str, float]]: the slowest files and their seconds
+        """
+        items = sorted(self.files.items(), key=lambda t: (-t[1], t[0]))
+        return items if top is None else items[:top]
+
+    def to_dict(self, top=10):
+        """
+        Args:
+            top (int | None): the number of slowest files to include
+
+        Returns:
+            Dict: JSON serializable data
+        """
+        order = {name: idx for idx, name in enumerate(PHASES)}
+        phases = {
+            name: dict(self.phases[name])
+            for name in sorted(
+                self.phases, key=lambda n: (order.get(n, len(order)), n)
+            )
+        }
+        return {
+            'wall_seconds': self.wall_seconds,
+            'phases': phases,
+            'slowest_files': [list(t) for t in self.slowest_files(top)],
+        }
+
+    def format_table(self, top=10):
+        """
+        Args:
+            top (int | None): the number of slowest files to include
+
+        Returns:
+            str: a human readable report
+        """
+        data = self.to_dict(top=top)
+        lines = [
+            'Profile (wall time {:.4f}s)'.format(data['wall_seconds']),
+            '{:<10} {:>8} {:>10} {:>10}'.format(
+                'phase', 'calls', 'total_s', 'self_s'
+            ),
+        ]
+        for name, row in data['phases'].items():
+            lines.append(
+                '{:<10} {:>8} {:>10.4f} {:>10.4f}'.format(
+                    name, row['calls'], row['seconds'], row['self_seconds']
+                )
+            )
+        if data['slowest_files']:
+            lines.append('Slowest files:')
+            for fpath, seconds in data['slowest_files']:
+                lines.append('{:>10.4f}s  {}'.format(seconds, fpath))
+        return '\n'.join(lines)
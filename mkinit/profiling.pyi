@@ -0,0 +1,22 @@
+from os import PathLike
+from typing import ContextManager, Dict, List, Tuple
+
+PHASES: List[str]
+
+def get_profile() -> Profile | None: ...
+def phase(name: str, fpath: str | PathLike | None = None) -> ContextManager: ...
+
+class Profile:
+    phases: Dict[str, Dict[str, float]]
+    files: Dict[str, float]
+    wall_seconds: float
+
+    def __init__(self) -> None: ...
+    def __enter__(self) -> Profile: ...
+    def __exit__(self, *exc) -> bool: ...
+    def merge(self, data: Dict) -> None: ...
+    def slowest_files(
+        self, top: int | None = 10
+    ) -> List[Tuple[str, float]]: ...
+    def to_dict(self, top: int | None = 10) -> Dict: ...
+    def format_table(self, top: int | None = 10) -> str: ...
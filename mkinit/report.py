@@ -0,0 +1,225 @@
+"""
+Structured statistics about a run of :func:`mkinit.static_mkinit.autogen_init`.
+
+Pass ``report=True`` to ``autogen_init`` (or ``--report PATH`` on the command
+line) to get a :class:`RunReport` that lists every package that was
+generated or skipped, what was read and written, and whether any output
+changed. Build tools can use :attr:`RunReport.changed` to decide if steps that
+depend on the generated files need to run again.
+
+Example:
+    >>> from mkinit.report import *  # NOQA
+    >>> from mkinit.static_mkinit import autogen_init
+    >>> report = autogen_init('mkinit', dry=True, report=True)
+    >>> pkg_report = report.packages[0]
+    >>> assert pkg_report.files_parsed + pkg_report.cache_hits > 0
+    >>> assert pkg_report.bytes_read > 0
+    >>> assert report.bytes_written == 0
+    >>> data = report.to_dict()
+    >>> assert data['packages'][0]['modpath'] == pkg_report.modpath
+"""
+
+import json
+import os
+from os.path import abspath
+
+__all__ = ['PackageReport', 'RunReport']
+
+
+class PackageReport:
+    """
+    What happened while generating a single package.
+
+    Attributes:
+        modpath (str): path to the package directory
+
+        skipped (bool): True if the manifest showed the package was up to
+            date, in which case nothing was parsed.
+
+        seconds (float): time spent generating the package
+
+        inputs (Set[str]): the modules whose exported names were used
+
+        files_parsed (int): number of modules that were read and parsed
+
+        cache_hits (int): number of modules whose names came from the
+            persistent parse cache or were already known (e.g. by a watcher)
+
+        bytes_read (int): bytes read from modules and the existing
+            ``__init__`` files
+
+        bytes_written (int): bytes written to generated files
+
+        outputs (List[Dict]): the ``fpath`` of each generated file, whether
+            its text ``changed`` and whether it was ``written``.
+
+        export_model (ExportModel | None): the analysis of the package, if it
+            was generated. This is not included in :func:`to_dict`.
+    """
+
+    def __init__(self, modpath, skipped=False):
+        self.modpath = modpath
+        self.skipped = skipped
+        self.seconds = 0.0
+        self.inputs = set()
+        self.files_parsed = 0
+        self.cache_hits = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.outputs = []
+        self.export_model = None
+
+    def __repr__(self):
+        return '{}({!r}, changed={})'.format(
+            self.__class__.__name__, self.modpath, self.changed
+        )
+
+    @property
+    def changed(self):
+        """
+        bool: True if the text of any generated file changed
+        """
+        return any(output['changed'] for output in self.outputs)
+
+    def add_outputs(self, results, written):
+        """
+        Records the generated files of the package.
+
+        Args:
+            results (List[Tuple[str, str, str]]): the path, old text and new
+                text of each generated file
+
+            written (Container[str]): absolute paths of the files that were
+                written to disk
+        """
+        for fpath, old_text, new_text in results:
+            fpath = abspath(os.fspath(fpath))
+            was_written = fpath in written
+            self.outputs.append(
+                {
+                    'fpath': fpath,
+                    'changed': old_text != new_text,
+                    'written': was_written,
+                }
+            )
+            if was_written:
+                self.bytes_written += len(new_text.encode('utf8'))
+
+    def to_dict(self):
+        """
+        Returns:
+            Dict: JSON serializable data
+        """
+        return {
+            'modpath': str(self.modpath),
+            'skipped': self.skipped,
+            'changed': self.changed,
+            'seconds': self.seconds,
+            'inputs': sorted(self.inputs),
+            'files_parsed': self.files_parsed,
+            'cache_hits': self.cache_hits,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'outputs': [dict(output) for output in self.outputs],
+        }
+
+
+class RunReport:
+    """
+    What happened during a run, with a :class:`PackageReport` for every
+    package in the order their results were emitted.
+
+    Attributes:
+        dry (bool): if the run was a dry run
+
+        seconds (float): wall time of the whole run
+
+        packages (List[PackageReport]): the report of each package
+
+        profile (Profile | None): the profile of the run, if it was profiled
+    """
+
+    def __init__(self, dry=False):
+        self.dry = dry
+        self.seconds = 0.0
+        self.packages = []
+        self.profile = None
+
+    def __repr__(self):
+        return '{}(num_packages={}, changed={})'.format(
+            self.__class__.__name__, len(self.packages), self.changed
+        )
+
+    @property
+    def changed(self):
+        """
+        bool: True if the text of any generated file changed
+        """
+        return any(pkg.changed for pkg in self.packages)
+
+    @property
+    def changed_fpaths(self):
+        """
+        List[str]: the generated files whose text changed
+        """
+        return [
+            output['fpath']
+            for pkg in self.packages
+            for output in pkg.outputs
+            if output['changed']
+        ]
+
+    @property
+    def files_parsed(self):
+        """
+        int: total number of modules that were parsed
+        """
+        return sum(pkg.files_parsed for pkg in self.packages)
+
+    @property
+    def cache_hits(self):
+        """
+        int: total number of modules served from the parse cache
+        """
+        return sum(pkg.cache_hits for pkg in self.packages)
+
+    @property
+    def bytes_read(self):
+        """
+        int: total bytes read
+        """
+        return sum(pkg.bytes_read for pkg in self.packages)
+
+    @property
+    def bytes_written(self):
+        """
+        int: total bytes written
+        """
+        return sum(pkg.bytes_written for pkg in self.packages)
+
+    def to_dict(self):
+        """
+        Returns:
+            Dict: JSON serializable data
+        """
+        data = {
+            'dry': self.dry,
+            'changed': self.changed,
+            'seconds': self.seconds,
+            'files_parsed': self.files_parsed,
+            'cache_hits': self.cache_hits,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'changed_fpaths': self.changed_fpaths,
+            'packages': [pkg.to_dict() for pkg in self.packages],
+        }
+        if self.profile is not None:
+            data['profile'] = self.profile.to_dict()
+        return data
+
+    def dumps(self):
+        """
+        Returns:
+            str: the report as JSON
+        """
+        return json.dumps(self.to_dict(), indent=2)
@@ -0,0 +1,46 @@
+from typing import Container, Dict, List, Set, Tuple
+
+from mkinit.models import ExportModel
+from mkinit.profiling import Profile
+
+class PackageReport:
+    modpath: str
+    skipped: bool
+    seconds: float
+    inputs: Set[str]
+    files_parsed: int
+    cache_hits: int
+    bytes_read: int
+    bytes_written: int
+    outputs: List[Dict]
+    export_model: ExportModel | None
+
+    def __init__(self, modpath: str, skipped: bool = False) -> None: ...
+    @property
+    def changed(self) -> bool: ...
+    def add_outputs(
+        self, results: List[Tuple[str, str, str]], written: Container[str]
+    ) -> None: ...
+    def to_dict(self) -> Dict: ...
+
+class RunReport:
+    dry: bool
+    seconds: float
+    packages: List[PackageReport]
+    profile: Profile | None
+
+    def __init__(self, dry: bool = False) -> None: ...
+    @property
+    def changed(self) -> bool: ...
+    @property
+    def changed_fpaths(self) -> List[str]: ...
+    @property
+    def files_parsed(self) -> int: ...
+    @property
+    def cache_hits(self) -> int: ...
+    @property
+    def bytes_read(self) -> int: ...
+    @property
+    def bytes_written(self) -> int: ...
+    def to_dict(self) -> Dict: ...
+    def dumps(self) -> str: ...
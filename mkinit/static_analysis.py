@@ -8,6 +8,7 @@ import sys
 from collections import OrderedDict
 from os.path import exists, isfile, join, splitext
 
+from mkinit.top_level_ast import is_main_block
 from mkinit.util import util_import
 
 IS_PY_GE_308 = sys.version_info[0] >= 3 and sys.version_info[1] >= 8
@@ -56,10 +57,41 @@ def _parse_static_node_value(node):
     return value
 
 
+_TRY_NODES = (ast.Try, ast.TryStar) if hasattr(ast, 'TryStar') else (ast.Try,)
+
+
+def _iter_module_scope_reversed(body):
+    """
+    Yields the statements that execute in module scope, last to first.
+
+    Descends into ``if`` and ``try`` blocks (skipping ``__main__`` blocks)
+    but not into function or class bodies.
+    """
+    for node in reversed(body):
+        if isinstance(node, ast.If):
+            if is_main_block(node):
+                continue
+            yield from _iter_module_scope_reversed(node.orelse)
+            yield from _iter_module_scope_reversed(node.body)
+        elif isinstance(node, _TRY_NODES):
+            yield from _iter_module_scope_reversed(node.finalbody)
+            yield from _iter_module_scope_reversed(node.orelse)
+            for handler in reversed(node.handlers):
+                yield from _iter_module_scope_reversed(handler.body)
+            yield from _iter_module_scope_reversed(node.body)
+        else:
+            yield node
+
+
 def parse_static_value(key, source=None, fpath=None):
     """
     Statically parse a constant variable's value from python code.
 
+    Only module-level assignments (including those in top-level ``if`` and
+    ``try`` blocks) are considered. The statements are scanned from last to
+    first, so the scan stops at the assignment that determines the final
+    value.
+
     TODO: This does not belong here. Move this to an external static analysis
     library.
 
@@ -85,45 +117,60 @@ def parse_static_value(key, source=None, fpath=None):
         >>> assert parse_static_value(key, source=source) == {1: 2, 3: 4}
         >>> #parse_static_value('bar', source=source)
         >>> #parse_static_value('bar', source='foo=1; bar = [1, foo]')
+
+    Example:
+        >>> # Assignments in functions and classes are not module attributes
+        >>> from xdoctest import utils
+        >>> source = utils.codeblock(
+        ...    '''
+        ...    __all__ = ['a']
+        ...    try:
+        ...        __all__ = ['b']
+        ...    except ImportError:
+        ...        pass
+        ...    def func():
+        ...        __all__ = ['c']
+        ...    class Spam:
+        ...        __all__ = ['d']
+        ...    if __name__ == '__main__':
+        ...        __all__ = ['e']
+        ...    ''')
+        >>> parse_static_value('__all__', source=source)
+        ['b']
     """
     if source is None:  # pragma: no branch
         assert fpath is not None
         with open(fpath, 'rb') as file_:
             source = file_.read().decode('utf-8')
 
+    if key not in source:
+        # Avoid parsing files that cannot define the variable
+        raise NameError('No static variable named {!r}'.format(key))
+
     pt = ast.parse(source)
 
-    class AssignentVisitor(ast.NodeVisitor):
-        def visit_Assign(self, node):
-            for target in node.targets:
-                target_id = getattr(target, 'id', None)
-                if target_id == key:
-                    try:
-                        self.value = _parse_static_node_value(node.value)
-                    except TypeError as ex:
-                        import warnings
-
-                        warnings.warn(repr(ex))
-
-        def visit_AnnAssign(self, node):
-            """Handle annotated assignments like `VAR: Type = value`"""
-            target_id = getattr(node.target, 'id', None)
-            if target_id == key:
-                if node.value is not None:
-                    try:
-                        self.value = _parse_static_node_value(node.value)
-                    except TypeError as ex:
-                        import warnings
-
-                        warnings.warn(repr(ex))
-
-    sentinal = object()
-    visitor = AssignentVisitor()
-    visitor.value = sentinal
-    visitor.visit(pt)
-    if visitor.value is sentinal:
-        raise NameError('No static variable named {!r}'.format(key))
-    return visitor.value
+    for node in _iter_module_scope_reversed(pt.body):
+        if isinstance(node, ast.Assign):
+            is_match = any(
+                getattr(target, 'id', None) == key for target in node.targets
+            )
+        elif isinstance(node, ast.AnnAssign):
+            # Handle annotated assignments like `VAR: Type = value`
+            is_match = (
+                getattr(node.target, 'id', None) == key
+                and node.value is not None
+            )
+        else:
+            is_match = False
+        if is_match:
+            try:
+                return _parse_static_node_value(node.value)
+            except TypeError as ex:
+                import warnings
+
+                # Fallback to the previous static assignment
+                warnings.warn(repr(ex))
+    raise NameError('No static variable named {!r}'.format(key))
 
 
 def package_modpaths(
@@ -1,769 +1,1619 @@
-"""
-Static version of :mod:`mkinit.dynamic_autogen`
-"""
-
-import fnmatch
-import logging
-import os
-import pathlib
-import warnings
-from os.path import abspath, basename, dirname, exists, join
-
-from mkinit import static_analysis as static
-from mkinit.formatting import _ensure_options, _initstr, _insert_autogen_text
-from mkinit.top_level_ast import TopLevelVisitor
-from mkinit.util import util_import
-from mkinit.util.util_diff import difftext
-
-logger = logging.getLogger(__name__)
-
-
-__all__ = [
-    'autogen_init',
-    'static_init',
-]
-
-
-def autogen_init(
-    modpath_or_name,
-    submodules=None,
-    respect_all=True,
-    options=None,
-    dry=False,
-    diff=False,
-    recursive=False,
-):
-    """
-    Autogenerates imports for a package __init__.py file.
-
-    Args:
-        modpath_or_name (PathLike | str):
-            path to or name of a package module.  The path should reference the
-            dirname not the __init__.py file.  If specified by name, must be
-            findable from the PYTHONPATH.
-
-        submodules (List[str] | None):
-            if specified, then only these specific submodules are used in
-            package generation. Otherwise, all non underscore prefixed modules
-            are used. This may be deprecated in the future in favor of using
-            the user declaration variables.
-
-        respect_all (bool):
-            if False the `__all__` attribute is ignored while parsing.
-            Defaults to True.
-
-        options (dict | None):
-            formatting options; customizes how output is formatted.
-            See `formatting._ensure_options` for defaults.
-
-        dry (bool):
-            if True, the autogenerated string is not written.
-            Defaults to False.
-
-        recursive (bool):
-            if True, we will autogenerate init files for all subpackages.
-            Defaults to Fasle.
-
-    Note:
-        This will partially override the __init__ file. By default everything
-        up to the last comment / __future__ import is preserved, and everything
-        after is overriden.  For more fine grained control, you can specify
-        XML-like ``# <AUTOGEN_INIT>`` and ``# </AUTOGEN_INIT>`` comments around
-        the volitle area. If specified only the area between these tags will be
-        overwritten.
-
-        To autogenerate a module on demand, its useful to keep a doctr comment
-        in the __init__ file like this
-
-        .. code:: bash
-
-            python -m mkinit <your_module>
-
-    Example:
-        >>> init_fpath, new_text = autogen_init('mkinit', submodules=None,
-        >>>                                     respect_all=True,
-        >>>                                     dry=True)
-        >>> assert 'autogen_init' in new_text
-    """
-    logger.info(
-        'Autogenerating __init__ for modpath_or_name={}'.format(modpath_or_name)
-    )
-    options = _ensure_options(options)
-    modpath = _rectify_to_modpath(modpath_or_name)
-
-    if recursive:
-        if submodules is not None:
-            raise AssertionError('cannot specify submodules in recursive mode')
-        all_init_fpaths = list(
-            static.package_modpaths(modpath, with_pkg=True, with_mod=False)
-        )
-        all_init_fpaths = sorted(all_init_fpaths, key=lambda x: x.count(os.sep))
-        for fpath in reversed(all_init_fpaths):
-            if diff:
-                # TODO: use a real diff patch format
-                print('--- ' + str(fpath))
-                print('+++ ' + str(fpath))
-            autogen_init(
-                fpath,
-                submodules=None,
-                respect_all=respect_all,
-                options=options,
-                dry=dry,
-                diff=diff,
-                recursive=False,
-            )
-        return
-
-    if options['lazy_loader_typed'] and options['lazy_loader']:
-        autogen_init(
-            modpath,
-            submodules=None,
-            respect_all=respect_all,
-            options={**options, 'lazy_loader': False},
-            dry=dry,
-            diff=diff,
-            recursive=False,
-        )
-
-    initstr = static_init(
-        modpath, submodules=submodules, respect_all=respect_all, options=options
-    )
-    init_fpath, new_text = _insert_autogen_text(
-        modpath,
-        initstr,
-        interface=options['lazy_loader_typed'] and not options['lazy_loader'],
-    )
-    if dry:
-        logger.info('(DRY) would write updated file: %r' % init_fpath)
-        if diff:
-            # Display difference
-            try:
-                with open(init_fpath, 'r') as file:
-                    old_text = file.read()
-            except Exception:
-                old_text = ''
-            display_text = difftext(
-                old_text, new_text, colored=True, context_lines=3
-            )
-            print(display_text)
-        else:
-            print(new_text)
-        return init_fpath, new_text
-    else:
-        logger.info('writing updated file: %r' % init_fpath)
-        # print(new_text)
-        with open(init_fpath, 'w') as file_:
-            file_.write(new_text)
-
-
-def _rectify_to_modpath(modpath_or_name):
-    if exists(modpath_or_name):
-        modpath = abspath(modpath_or_name)
-    else:
-        modpath = util_import.modname_to_modpath(modpath_or_name)
-        if modpath is None:
-            raise ValueError('Invalid module {}'.format(modpath_or_name))
-    if basename(modpath) == '__init__.py':
-        modpath = dirname(modpath)
-    return modpath
-
-
-def static_init(
-    modpath_or_name, submodules=None, respect_all=True, options=None
-):
-    """
-    Returns the autogenerated initialization string.  This can either be
-    executed with `exec` or directly copied into the __init__.py file.
-
-    Note:
-        This only returns the generated part, it does not put it the context of
-        existing code. For that functionality see  :func:`autogen_init` using
-        the dry=True argument to get a return value instead of modifying
-        inplace.
-
-    Args:
-        options (dict | None):
-            formatting options; customizes how output is formatted.
-            See `formatting._ensure_options` for defaults.
-
-    """
-    modpath = _rectify_to_modpath(modpath_or_name)
-
-    options = _ensure_options(options)
-
-    user_decl = parse_user_declarations(modpath)
-    logger.debug('user_decl = {}'.format(user_decl))
-    if submodules is not None:
-        user_decl['__submodules__'] = submodules
-
-    submodules = user_decl.get('__submodules__', None)
-    explicit = user_decl.get('__explicit__', [])
-    private = user_decl.get('__private__', [])
-    protected = user_decl.get('__protected__', [])
-    external = user_decl.get('__external__', [])
-    ignore = user_decl.get('__ignore__', [])
-
-    #
-    module_property_names = user_decl.get('module_property_names', None)
-
-    PARSE_USER_TEXT_FOR_OTHER_NAMES = True
-    if PARSE_USER_TEXT_FOR_OTHER_NAMES:
-        from mkinit.formatting import _find_insert_points  # NOQA
-
-        init_fpath = join(modpath, '__init__.py')
-        if exists(init_fpath):
-            with open(init_fpath, 'r') as file_:
-                lines = file_.readlines()
-        else:
-            lines = []
-        startline, endline, init_indent = _find_insert_points(lines)
-        user_text = ''.join(lines[:startline] + lines[endline:])
-
-        try:
-            user_attrs = _extract_attributes(source=user_text)
-        except Exception:
-            logger.error('Unable to parse user attributes')
-            raise
-
-        logger.debug(
-            'Updating explicit with variable names parsed from existing text: {}'.format(
-                user_attrs
-            )
-        )
-        explicit.extend(user_attrs)
-
-    modname, imports, from_imports = _static_parse_imports(
-        modpath,
-        submodules=submodules,
-        respect_all=respect_all,
-        external=external,
-        ignore=ignore,
-        source_order=options['source_order'],
-    )
-
-    logger.debug('Found {} imports'.format(len(imports)))
-    logger.debug('Found {} from_imports'.format(len(from_imports)))
-    logger.debug('modname={}'.format(modname))
-
-    initstr = _initstr(
-        modname,
-        imports,
-        from_imports,
-        options=options,
-        explicit=explicit,
-        protected=protected,
-        private=private,
-        module_property_names=module_property_names,
-    )
-    return initstr
-
-
-def parse_user_declarations(modpath):
-    """
-    Statically determine special file-specific user options and declarations
-    """
-    # the __init__ file may have a variable describing the correct imports
-    # should imports specify the name of this variable or should it always be
-    # __submodules__?
-    user_decl = {}
-
-    init_fpath = join(modpath, '__init__.py')
-    if exists(init_fpath):
-        if 1:
-            user_decl = _parse_user_declarations2(init_fpath)
-        else:
-            # TODO: can remove this code if _parse_user_declarations2 works out
-            with open(init_fpath, 'r') as file:
-                source = file.read()
-            try:
-                # Include only these submodules
-                user_decl['__submodules__'] = static.parse_static_value(
-                    '__submodules__', source
-                )
-            except NameError:
-                try:
-                    user_decl['__submodules__'] = static.parse_static_value(
-                        '__SUBMODULES__', source
-                    )
-                except NameError:
-                    pass
-                else:
-                    warnings.warn(
-                        'Use __submodules__, __SUBMODULES__ is depricated',
-                        DeprecationWarning,
-                    )
-
-            try:
-                user_decl['__explicit__'] = static.parse_static_value(
-                    '__extra_all__', source
-                )
-            except NameError:
-                pass
-
-            try:
-                user_decl['__external__'] = static.parse_static_value(
-                    '__external__', source
-                )
-            except NameError:
-                pass
-
-            try:
-                # Add custom explicitly defined names to this, and they will be
-                # automatically added to the __all__ variable.
-                user_decl['__explicit__'] = static.parse_static_value(
-                    '__explicit__', source
-                )
-            except NameError:
-                pass
-
-            try:
-                # Protected items are exposed, but their attributes are not
-                user_decl['__protected__'] = static.parse_static_value(
-                    '__protected__', source
-                )
-            except NameError:
-                pass
-
-            try:
-                # Private items and their attributes are not exposed
-                user_decl['__private__'] = static.parse_static_value(
-                    '__private__', source
-                )
-            except NameError:
-                pass
-
-            try:
-                # Protected modules are exposed, but their attributes are not
-                user_decl['__protected__'] = static.parse_static_value(
-                    '__protected__', source
-                )
-            except NameError:
-                pass
-
-            try:
-                # Private modules and their attributes are not exposed
-                user_decl['__private__'] = static.parse_static_value(
-                    '__private__', source
-                )
-            except NameError:
-                pass
-
-            try:
-                # Ignored modules and their attributes are not exposedmodules
-                user_decl['__ignore__'] = static.parse_static_value(
-                    '__ignore__', source
-                )
-            except NameError:
-                pass
-
-    return user_decl
-
-
-def _parse_user_declarations2(init_fpath):
-    """
-    New experimental implementation of parse_user_declarations
-
-    Example:
-        >>> from mkinit.static_mkinit import _parse_user_declarations2  # NOQA
-        >>> import ubelt as ub
-        >>> dpath = ub.Path.appdir('mkinit/doctests/test_module_props').ensuredir()
-        >>> init_fpath = dpath / '__init__.py'
-        >>> init_text = ub.codeblock(
-        >>>     '''
-        >>>     __private__ = ['foo', 'bar']
-        >>>     __extra_all__ = ['aliased value']
-        >>>     __explicit__ = ['should overwrite']
-        >>>     __SUBMODULES__ = ['aliased value that does not overwrite']
-        >>>     ...
-        >>>     class __module_properties__:
-        >>>         my_attr = 3
-        >>>         def my_method(self):
-        >>>              return 'my method'
-        >>>         @staticmethod
-        >>>         def my_staticmethod(self):
-        >>>              return 'my staticmethod'
-        >>>         @classmethod
-        >>>         def my_classmethod(cls):
-        >>>              return 'my classmethod'
-        >>>         @property
-        >>>         def my_property(self):
-        >>>              return 'my property'
-        >>>     ''')
-        >>> init_fpath.write_text(init_text)
-        >>> user_decl = _parse_user_declarations2(init_fpath)
-        >>> assert '__SUBMODULES__' not in user_decl
-        >>> assert user_decl['__submodules__'] == ['aliased value that does not overwrite']
-        >>> assert user_decl['__explicit__'] == ['should overwrite']
-        >>> assert user_decl['module_property_names']
-    """
-    import ast
-
-    init_fpath = pathlib.Path(init_fpath)
-
-    user_decl_main_to_aliases = {
-        '__submodules__': ['__SUBMODULES__'],
-        '__explicit__': ['__extra_all__'],
-        '__protected__': [],
-        '__private__': [],
-        '__ignore__': [],
-    }
-
-    user_decl_name_to_main = {}
-    for main, aliases in user_decl_main_to_aliases.items():
-        user_decl_name_to_main[main] = main
-        for a in aliases:
-            user_decl_name_to_main[a] = main
-
-    class UserDeclarationVisiter(ast.NodeVisitor):
-        def __init__(self):
-            super().__init__()
-            self.user_decl = {}
-            self._current_classname = None
-            self._classmethods = {}
-
-        def visit_ClassDef(self, node):
-            self._current_classname = node.name
-            self._classmethods[node.name] = []
-
-            self.generic_visit(node)
-            self._current_classname = None
-
-            if node.name == '__module_properties__':
-                # If we detect a special class named __module_properties__ we
-                # will inject its properties into our module namespace.
-                self.user_decl['module_property_names'] = self._classmethods[
-                    node.name
-                ]
-
-        def visit_FunctionDef(self, node):
-            if self._current_classname is not None:
-                self._classmethods[self._current_classname].append(node.name)
-
-        def visit_Assign(self, node):
-            for target in node.targets:
-                target_id = getattr(target, 'id', None)
-                if target_id in user_decl_name_to_main:
-                    main_id = user_decl_name_to_main[target_id]
-                    if main_id != target_id:
-                        # TODO: come up with a schedule to deprecate old
-                        # aliases.
-                        warnings.warn(
-                            f'Use {main_id} instead, {target_id} is deprecated as a '
-                            'mkinit attribute and may no longer be respected in '
-                            'future versions.',
-                            DeprecationWarning,
-                        )
-
-                    try:
-                        self.user_decl[main_id] = (
-                            static._parse_static_node_value(node.value)  # type: ignore
-                        )
-                    except TypeError as ex:
-                        warnings.warn(repr(ex))
-
-    source = init_fpath.read_text()
-    pt = ast.parse(source)
-
-    visitor = UserDeclarationVisiter()
-    visitor.visit(pt)
-
-    user_decl = visitor.user_decl
-    return user_decl
-
-
-def _find_local_submodules(pkgpath):
-    """
-    Yields all children submodules in a package (non-recursively)
-
-    Args:
-        pkgpath (str): path to a package with an __init__.py file
-
-    Example:
-        >>> pkgpath = util_import.modname_to_modpath('mkinit')
-        >>> import_paths = dict(_find_local_submodules(pkgpath))
-        >>> print('import_paths = {!r}'.format(import_paths))
-    """
-    # Find all the children modules in this package (non recursive)
-    pkgname = util_import.modpath_to_modname(pkgpath, check=False)
-    if pkgname is None:
-        raise Exception('cannot import {!r}'.format(pkgpath))
-    # TODO:
-    # DOES THIS NEED A REWRITE TO HANDLE THE CASE WHEN __init__ does not exist?
-
-    try:
-        # Hack to grab the root package
-        a, b = util_import.split_modpath(pkgpath, check=False)
-        root_pkgpath = join(a, b.replace('\\', '/').split('/')[0])
-    except ValueError:
-        # Assume that the path is the root package if split_modpath fails
-        root_pkgpath = pkgpath
-
-    for sub_modpath in static.package_modpaths(
-        pkgpath, with_pkg=True, recursive=False, check=False
-    ):
-        sub_modname = util_import.modpath_to_modname(
-            sub_modpath, check=False, relativeto=root_pkgpath
-        )
-        rel_modname = sub_modname[len(pkgname) + 1 :]
-        if not rel_modname or rel_modname.startswith('_'):
-            # Skip private modules
-            pass
-        else:
-            yield rel_modname, sub_modpath
-
-
-def _extract_attributes(modpath=None, source=None, respect_all=True):
-    """
-    This is the function that basically simulates import *
-
-    Example:
-        >>> modpath = util_import.modname_to_modpath('mkinit', hide_init=False)
-        >>> _extract_attributes(modpath)
-        >>> modpath = util_import.modname_to_modpath('mkinit.util.util_diff', hide_init=False)
-        >>> _extract_attributes(modpath)
-    """
-    if source is None:
-        try:
-            assert modpath is not None
-            with open(modpath, 'r', encoding='utf8') as file:
-                source = file.read()
-        except Exception as ex:  # nocover
-            raise IOError(
-                'Error reading {}, caused by {}'.format(modpath, repr(ex))
-            )
-    valid_attrs = None
-    if respect_all:  # pragma: nobranch
-        try:
-            valid_attrs = static.parse_static_value('__all__', source)
-        except NameError:
-            pass
-    if valid_attrs is None:
-        import builtins
-
-        # The __all__ variable is not specified or we dont care
-        try:
-            top_level = TopLevelVisitor.parse(source)
-        except SyntaxError as ex:
-            msg = 'modpath={} has bad syntax: {}'.format(modpath, ex)
-            raise SyntaxError(msg)
-        attrnames = top_level.attrnames
-        # list of names we wont export by default
-        invalid_callnames = dir(builtins)
-        valid_attrs = []
-        for attr in attrnames:
-            if attr.startswith('_'):
-                continue
-            if attr in invalid_callnames:  # nocover
-                continue
-            valid_attrs.append(attr)
-    return valid_attrs
-
-
-def _static_parse_imports(
-    modpath,
-    submodules=None,
-    external=None,
-    respect_all=True,
-    ignore=None,
-    source_order=False,
-):
-    """
-    Search local submodules for names that should be exposed in the top-level
-    namespace.
-
-    Args:
-        modpath (PathLike): base path to a package (with an __init__)
-
-        submodules (List[str]): Submodules to look at in the base package.
-            This is implicitly generated if not specified.
-
-        respect_all (bool):
-            if False, does not respect the __all__ attributes of submodules.
-            Defaults to True.
-
-    Returns:
-        Tuple: (modname, imports, from_imports)
-
-    CommandLine:
-        python -m mkinit.static_autogen _static_parse_imports
-
-    Example:
-        >>> modpath = util_import.modname_to_modpath('mkinit')
-        >>> external = ['textwrap']
-        >>> tup = _static_parse_imports(modpath, external=external)
-        >>> modname, submodules, from_imports = tup
-        >>> print('modname = {!r}'.format(modname))
-        >>> print('submodules = {!r}'.format(submodules))
-        >>> print('from_imports = {!r}'.format(from_imports))
-        >>> # assert 'autogen_init' in submodules
-
-    Example:
-        >>> from mkinit.static_mkinit import *  # NOQA
-        >>> modpath = util_import.modname_to_modpath('mkinit')
-        >>> external = ['textwrap']
-        >>> submodules = {'foo': ['bar', 'baz', 'biz']}
-        >>> tup = _static_parse_imports(modpath, submodules=submodules, external=external)
-        >>> modname, submodules, from_imports = tup
-        >>> print('modname = {!r}'.format(modname))
-        >>> print('submodules = {!r}'.format(submodules))
-        >>> print('from_imports = {!r}'.format(from_imports))
-        >>> # assert 'autogen_init' in submodules
-    """
-    def _ordered(attrs):
-        """Sort alphabetically unless source order is requested"""
-        return list(attrs) if source_order else sorted(attrs)
-
-    logger.debug('Parse static submodules: {}'.format(modpath))
-    # FIXME: handle the case where the __init__.py file doesn't exist yet
-    modname = util_import.modpath_to_modname(modpath, check=False)
-    if submodules is None:
-        # Equivalent to case submodules = {'*': ['*']}
-        # TODO: refactor to reduce code size and collapse cases
-        # TODO: could pull in pattern matching generalization from xdev and
-        # allow regex or glob-type matches.
-        logger.debug('Parsing implicit submodules!')
-        import_paths = dict(_find_local_submodules(modpath))
-        submodules = {k: None for k in sorted(import_paths.keys())}
-        # logger.debug('Found {} import paths'.format(len(import_paths)))
-        # logger.debug('Found {} submodules'.format(len(submodules)))
-    else:
-        logger.debug('Given explicit submodules')
-        if modname is None:
-            raise AssertionError('modname is None')
-
-        if isinstance(submodules, list):
-            # Make a dict mapping module names to None
-            submodules = {m: None for m in submodules}
-
-        # Determine which submodules were given as a pattern
-        implicit_submodules = {k: v for k, v in submodules.items() if '*' in k}
-        if implicit_submodules:
-            submodule_patterns = submodules.copy()
-            explicit_keys = set(submodule_patterns) - set(implicit_submodules)
-            explicit_submodules = {k: submodules[k] for k in explicit_keys}
-            implicit_candidates = {
-                k: v
-                for k, v in dict(_find_local_submodules(modpath)).items()
-                if k not in explicit_keys
-            }
-            matched_submodules = {}
-            for pat_key, pat_val in implicit_submodules.items():
-                matched_submodules.update(
-                    {
-                        k: pat_val
-                        for k, v in implicit_candidates.items()
-                        if fnmatch.fnmatch(k, pat_key)
-                    }
-                )
-            submodules = explicit_submodules.copy()
-            submodules.update(matched_submodules)
-
-        import_paths = {
-            m: util_import.modname_to_modpath(
-                modname + '.' + m, hide_init=False
-            )
-            for m in submodules.keys()
-        }
-        # FIX for relative nested import_paths
-        for m in import_paths.keys():
-            oldval = import_paths[m]
-            if oldval is None:
-                candidates = [
-                    join(modpath, m),
-                    join(modpath, m) + '.py',
-                ]
-                for newval in candidates:
-                    if exists(newval):
-                        import_paths[m] = newval
-                        break
-    imports = ['.' + m for m in submodules.keys()]
-
-    def _lookup_extractable_attrs(rel_modname):
-        sub_modpath = import_paths[rel_modname]
-        if sub_modpath is None:
-            raise Exception(
-                'Failed to submodule lookup {!r}'.format(rel_modname)
-            )
-        try:
-            extracted_attrs = _extract_attributes(
-                sub_modpath, respect_all=respect_all
-            )
-        except SyntaxError as ex:
-            warnings.warn(
-                'Failed to parse module {!r}, ex = {!r}'.format(rel_modname, ex)
-            )
-            extracted_attrs = None
-        return extracted_attrs
-
-    from_imports = []
-    for rel_modname, attr_list in submodules.items():
-        if attr_list is None:
-            # Equivalent to case where attr_list = ['*']
-            # TODO: refactor to reduce code size and collapse cases
-            valid_attrs = _lookup_extractable_attrs(rel_modname)
-            if valid_attrs is not None:
-                if ignore:
-                    ignore = set(ignore)
-                    valid_attrs = [v for v in valid_attrs if v not in ignore]
-                from_imports.append(('.' + rel_modname, _ordered(valid_attrs)))
-        else:
-            # Determine which attrs were given as a pattern
-            implicit_attrs = {a for a in attr_list if '*' in a}
-            if implicit_attrs:
-                # pattern matching on implicit attrs
-                explicit_attrs = set(attr_list) - implicit_attrs
-                matched_attrs = set()
-                extracted_attrs = _lookup_extractable_attrs(rel_modname)
-                if extracted_attrs is not None:
-                    for pat in implicit_attrs:
-                        matched_attrs.update(
-                            {
-                                cand
-                                for cand in extracted_attrs
-                                if fnmatch.fnmatch(cand, pat)
-                            }
-                        )
-                resolved_attrs = set()
-                resolved_attrs.update(explicit_attrs)
-                resolved_attrs.update(matched_attrs)
-                if source_order and extracted_attrs is not None:
-                    # Order by the position each name appears in the source,
-                    # appending any explicit names not found in the module.
-                    in_source = [
-                        a for a in extracted_attrs if a in resolved_attrs
-                    ]
-                    leftover = [
-                        a for a in attr_list if a in resolved_attrs
-                        and a not in extracted_attrs
-                    ]
-                    attr_list = in_source + leftover
-                else:
-                    attr_list = sorted(resolved_attrs)
-
-            valid_attrs = attr_list
-            if ignore:
-                ignore = set(ignore)
-                valid_attrs = [v for v in valid_attrs if v not in ignore]
-            from_imports.append(('.' + rel_modname, valid_attrs))
-
-    if external:
-        for ext_modname in external:
-            ext_modpath = util_import.modname_to_modpath(
-                ext_modname, hide_init=False
-            )
-            if ext_modpath is None:
-                raise Exception(
-                    'Failed to external lookup {!r}'.format(ext_modpath)
-                )
-            try:
-                valid_attrs = _extract_attributes(
-                    ext_modpath, respect_all=respect_all
-                )
-            except SyntaxError as ex:
-                warnings.warn(
-                    'Failed to parse {!r}, ex = {!r}'.format(ext_modname, ex)
-                )
-            else:
-                from_imports.append((ext_modname, _ordered(valid_attrs)))
-
-    return modname, imports, from_imports
+"""
+Static version of :mod:`mkinit.dynamic_autogen`
+"""
+
+import fnmatch
+import logging
+import os
+import sys
+import time
+import warnings
+from os.path import abspath, basename, dirname, exists, join
+
+from mkinit import static_analysis as static
+from mkinit.cache import get_parse_cache
+from mkinit.formatting import (
+    LAZY_INDEX_FNAME,
+    _ensure_options,
+    _insert_autogen_text,
+)
+from mkinit.models import ExportModel, InitFileModel, ModuleSummary
+from mkinit.profiling import Profile, phase
+from mkinit.report import PackageReport, RunReport
+from mkinit.util import util_import
+from mkinit.util.util_diff import difftext
+from mkinit.write_plan import WritePlanner
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'autogen_init',
+    'static_init',
+]
+
+
+def autogen_init(
+    modpath_or_name,
+    submodules=None,
+    respect_all=True,
+    options=None,
+    dry=False,
+    diff=False,
+    recursive=False,
+    jobs=1,
+    manifest=None,
+    profile=None,
+    report=False,
+    check=False,
+    check_all=False,
+    export_index=None,
+):
+    """
+    Autogenerates imports for a package __init__.py file.
+
+    Args:
+        modpath_or_name (PathLike | str):
+            path to or name of a package module.  The path should reference the
+            dirname not the __init__.py file.  If specified by name, must be
+            findable from the PYTHONPATH.
+
+        submodules (List[str] | None):
+            if specified, then only these specific submodules are used in
+            package generation. Otherwise, all non underscore prefixed modules
+            are used. This may be deprecated in the future in favor of using
+            the user declaration variables.
+
+        respect_all (bool):
+            if False the `__all__` attribute is ignored while parsing.
+            Defaults to True.
+
+        options (dict | None):
+            formatting options; customizes how output is formatted.
+            See `formatting._ensure_options` for defaults.
+
+        dry (bool):
+            if True, the autogenerated string is not written.
+            Defaults to False.
+
+        diff (bool | str):
+            if truthy, show the difference between the existing and the
+            generated text instead of the generated text (this only has an
+            effect in dry mode). Can be 'ndiff' (the default if True) for
+            the format with intraline hints, or 'unified' for a faster
+            unified diff. Defaults to False.
+
+        recursive (bool):
+            if True, we will autogenerate init files for all subpackages.
+            Defaults to Fasle.
+
+        jobs (int):
+            number of worker processes used to generate subpackages in
+            recursive mode. A package is only generated after all of its
+            subpackages are. If 0 or less, uses one worker per CPU.
+            Defaults to 1.
+
+        manifest (str | PathLike | bool | Manifest | None):
+            path to a manifest recording the inputs and outputs of each
+            generated package (see :mod:`mkinit.manifest`). Packages whose
+            inputs are unchanged since the manifest was written are skipped.
+            If True, uses ``.mkinit-manifest.json`` in the directory that
+            contains the package. In ``check`` mode the manifest is only
+            read. Defaults to None (no manifest).
+
+        profile (bool | Profile | None):
+            if True, the time spent in each phase of the run is recorded (see
+            :mod:`mkinit.profiling`) and the :class:`Profile` is returned
+            instead of the usual return value. If a :class:`Profile` is given,
+            it is populated and the usual value is returned.
+            Defaults to None.
+
+        report (bool):
+            if True, returns a :class:`mkinit.report.RunReport` describing
+            every package that was generated or skipped, the bytes read and
+            written, the files parsed, parse cache hits, and which outputs
+            changed. If ``profile`` is also given, the profile is available
+            as its ``profile`` attribute. Defaults to False.
+
+        check (bool):
+            if True, nothing is written or displayed and the files that are
+            out of date are returned. Stops at the first out of date file
+            unless ``check_all`` is True. Defaults to False.
+
+        check_all (bool):
+            if True, ``check`` finds every out of date file.
+            Defaults to False.
+
+        export_index (bool | ExportIndex | None):
+            if True, an :class:`mkinit.export_index.ExportIndex` of the names
+            exported by every generated package and the modules they import
+            from is returned instead of the usual value or the profile. If an
+            ``ExportIndex`` is given, it is populated and the usual value is
+            returned. The manifest is not used to skip packages, so the index
+            is complete. Defaults to None.
+
+    Returns:
+        Tuple[str, str] | List[str] | Profile | RunReport | ExportIndex | None:
+            the path and new text of the ``__init__.py`` in non-recursive dry
+            mode, the out of date files if ``check`` is True, the profile if
+            ``profile`` is True, the report if ``report`` is True, or the
+            index if ``export_index`` is True.
+
+    Note:
+        This will partially override the __init__ file. By default everything
+        up to the last comment / __future__ import is preserved, and everything
+        after is overriden.  For more fine grained control, you can specify
+        XML-like ``# <AUTOGEN_INIT>`` and ``# </AUTOGEN_INIT>`` comments around
+        the volitle area. If specified only the area between these tags will be
+        overwritten.
+
+        To autogenerate a module on demand, its useful to keep a doctr comment
+        in the __init__ file like this
+
+        .. code:: bash
+
+            python -m mkinit <your_module>
+
+    Example:
+        >>> init_fpath, new_text = autogen_init('mkinit', submodules=None,
+        >>>                                     respect_all=True,
+        >>>                                     dry=True)
+        >>> assert 'autogen_init' in new_text
+
+    Example:
+        >>> prof = autogen_init('mkinit', dry=True, profile=True)
+        >>> assert prof.phases['parse']['calls'] > 0
+
+    Example:
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/check').delete().ensuredir()
+        >>> pkg = (dpath / 'checked_pkg').ensuredir()
+        >>> (pkg / '__init__.py').write_text('')
+        >>> (pkg / 'mod.py').write_text('def foo(): pass')
+        >>> assert autogen_init(pkg, check=True) == [str(pkg / '__init__.py')]
+        >>> autogen_init(pkg)
+        >>> assert autogen_init(pkg, check=True) == []
+    """
+    kwargs = dict(
+        submodules=submodules,
+        respect_all=respect_all,
+        options=options,
+        dry=dry,
+        diff=diff,
+        recursive=recursive,
+        jobs=jobs,
+        manifest=manifest,
+        run_report=RunReport(dry=dry or diff or check) if report else None,
+        check=check,
+        check_all=check_all,
+        export_index=export_index,
+    )
+    if export_index is True:
+        from mkinit.export_index import ExportIndex
+
+        kwargs['export_index'] = ExportIndex()
+    start = time.perf_counter()
+    if not profile:
+        prof = None
+        ret = _autogen_init(modpath_or_name, **kwargs)
+    else:
+        prof = Profile() if profile is True else profile
+        with prof:
+            ret = _autogen_init(modpath_or_name, **kwargs)
+    if report:
+        run_report = kwargs['run_report']
+        run_report.seconds = time.perf_counter() - start
+        run_report.profile = prof
+        return run_report
+    if export_index is True:
+        return kwargs['export_index']
+    return prof if profile is True else ret
+
+
+def _autogen_init(
+    modpath_or_name,
+    submodules=None,
+    respect_all=True,
+    options=None,
+    dry=False,
+    diff=False,
+    recursive=False,
+    jobs=1,
+    manifest=None,
+    run_report=None,
+    check=False,
+    check_all=False,
+    export_index=None,
+):
+    logger.info(
+        'Autogenerating __init__ for modpath_or_name={}'.format(modpath_or_name)
+    )
+    if check:
+        # Only compare, without writing or rendering anything
+        dry, diff = True, False
+    options = _ensure_options(options)
+    modpath = _rectify_to_modpath(modpath_or_name)
+    manifest = _rectify_manifest(manifest, modpath)
+    if manifest is not None:
+        manifest_key = manifest.package_key(
+            options, respect_all=respect_all, submodules=submodules
+        )
+    # The index needs the analysis of every package, even unchanged ones
+    use_manifest = manifest is not None and export_index is None
+    if export_index is not None and export_index.modname is None:
+        export_index.modname = util_import.modpath_to_modname(
+            modpath, check=False
+        )
+
+    if recursive:
+        if submodules is not None:
+            raise AssertionError('cannot specify submodules in recursive mode')
+        with phase('discover'):
+            all_init_fpaths = list(
+                static.package_modpaths(modpath, with_pkg=True, with_mod=False)
+            )
+        all_init_fpaths = sorted(all_init_fpaths, key=lambda x: x.count(os.sep))
+        pkg_modpaths = [dirname(fpath) for fpath in reversed(all_init_fpaths)]
+        # Each existing init is read once and shared by every step
+        init_models = {
+            pkg_modpath: InitFileModel(pkg_modpath)
+            for pkg_modpath in pkg_modpaths
+        }
+
+        # Results may finish out of order when running in parallel, so buffer
+        # them to keep the output in the same order as a serial run.
+        finished = {}
+        num_emitted = 0
+        todo_modpaths = pkg_modpaths
+        if use_manifest:
+            # A parent must be regenerated if any of its children are, because
+            # their __init__ files are inputs of the parent.
+            todo_modpaths = []
+            stale_parents = set()
+            for pkg_modpath in pkg_modpaths:
+                results = None
+                if pkg_modpath not in stale_parents:
+                    results = manifest.check(
+                        pkg_modpath,
+                        manifest_key,
+                        init_model=init_models[pkg_modpath],
+                    )
+                if results is None:
+                    todo_modpaths.append(pkg_modpath)
+                    stale_parents.add(dirname(pkg_modpath))
+                else:
+                    logger.info('skipping up to date package: %r' % pkg_modpath)
+                    pkg_report = PackageReport(pkg_modpath, skipped=True)
+                    pkg_report.add_outputs(results, written=())
+                    finished[pkg_modpath] = results, pkg_report
+
+        # Packages often share external modules, so process each one once
+        external_exports = _batch_resolve_externals(
+            todo_modpaths, respect_all=respect_all, init_models=init_models
+        )
+
+        # Parents read the new __init__ files of their children from the
+        # plan, so all writes can happen together once everything succeeded.
+        planner = WritePlanner()
+        generated = []
+        out_of_date = []
+        bottom_up = _iter_bottom_up(
+            todo_modpaths,
+            respect_all=respect_all,
+            options=options,
+            jobs=jobs,
+            external_exports=external_exports,
+            overlay=planner.pending,
+            init_models=init_models,
+        )
+
+        def _emit_finished():
+            # Emits the packages that are next in order and are finished
+            nonlocal num_emitted
+            while (
+                num_emitted < len(pkg_modpaths)
+                and pkg_modpaths[num_emitted] in finished
+            ):
+                results, pkg_report = finished.pop(pkg_modpaths[num_emitted])
+                if run_report is not None:
+                    run_report.packages.append(pkg_report)
+                if diff and diff != 'unified':
+                    # Unified diffs have their own headers
+                    fpath = join(pkg_modpaths[num_emitted], '__init__.py')
+                    print('--- ' + str(fpath))
+                    print('+++ ' + str(fpath))
+                if dry:
+                    _emit_results(results, dry=dry, diff=diff)
+                num_emitted += 1
+
+        for pkg_modpath, results, pkg_report in bottom_up:
+            for init_fpath, old_text, new_text in results:
+                planner.add(init_fpath, new_text, old_text=old_text)
+            generated.append((pkg_modpath, results, pkg_report))
+            if check:
+                out_of_date += _out_of_date_fpaths(results)
+                if out_of_date and not check_all:
+                    break
+                # Nothing is displayed in check mode
+                continue
+            finished[pkg_modpath] = results, pkg_report
+            _emit_finished()
+        # Stops scheduling packages if we returned early
+        bottom_up.close()
+        if not check:
+            # Skipped packages are not followed by a generated one if every
+            # package was skipped
+            _emit_finished()
+        if not dry:
+            planner.flush()
+            logger.info(
+                'wrote {} files, {} were unchanged'.format(
+                    len(planner.written), len(planner.unchanged)
+                )
+            )
+        written = set(planner.written)
+        for pkg_modpath, results, pkg_report in generated:
+            pkg_report.add_outputs(results, written=written)
+            if export_index is not None:
+                export_index.add_package(
+                    pkg_modpath, pkg_report.export_model, results
+                )
+            if manifest is not None and not check:
+                # Inputs are recorded after the writes they may depend on
+                manifest.update(
+                    pkg_modpath, manifest_key, pkg_report.inputs, results
+                )
+        if check and run_report is not None:
+            # Nothing was emitted, so report generated and skipped packages
+            pkg_reports = {p: r for p, _, r in generated}
+            pkg_reports.update({p: r for p, (_, r) in finished.items()})
+            run_report.packages += [
+                pkg_reports[p] for p in pkg_modpaths if p in pkg_reports
+            ]
+        if manifest is not None and not check:
+            manifest.save()
+        if check:
+            return out_of_date
+        return
+
+    results = None
+    init_model = InitFileModel(modpath)
+    if use_manifest:
+        results = manifest.check(modpath, manifest_key, init_model=init_model)
+    if results is None:
+        results, pkg_report = _generate_package_tracked(
+            modpath,
+            submodules=submodules,
+            respect_all=respect_all,
+            options=options,
+            init_model=init_model,
+        )
+        if export_index is not None:
+            export_index.add_package(modpath, pkg_report.export_model, results)
+        written = [] if check else _emit_results(results, dry=dry, diff=diff)
+        pkg_report.add_outputs(results, written=written)
+        if manifest is not None and not check:
+            manifest.update(modpath, manifest_key, pkg_report.inputs, results)
+            manifest.save()
+    else:
+        logger.info('skipping up to date package: %r' % modpath)
+        pkg_report = PackageReport(modpath, skipped=True)
+        pkg_report.add_outputs(results, written=())
+        if dry and not check:
+            _emit_results(results, dry=dry, diff=diff)
+    if run_report is not None:
+        run_report.packages.append(pkg_report)
+    if check:
+        return _out_of_date_fpaths(results)
+    if dry:
+        init_fpath, old_text, new_text = results[-1]
+        return init_fpath, new_text
+
+
+def _generate_package(
+    modpath,
+    submodules=None,
+    respect_all=True,
+    options=None,
+    external_exports=None,
+    context=None,
+    init_model=None,
+    extracted=None,
+):
+    """
+    Generates the new text for a single package without writing anything.
+
+    Args:
+        context (_GenerateContext | None):
+            records what was read and provides the text of files that are
+            planned to be written.
+
+        init_model (InitFileModel | None):
+            a previously loaded model of the package's ``__init__.py``.
+            If unspecified the file is read from disk.
+
+        extracted (Dict[str, List[str] | None] | None):
+            maps absolute paths of modules to their already known exported
+            names, which are used instead of parsing them again. Ignored if
+            ``context`` is given.
+
+    Returns:
+        List[Tuple[str, str, str]]:
+            the path, old text, and new text of each file that would be
+            written. This is the ``__init__.py`` file, preceded by the
+            ``__init__.pyi`` file when generating typed lazy_loader stubs and
+            by the ``_mkinit_index.json`` file it loads with ``lazy_sidecar``.
+    """
+    options = _ensure_options(options)
+    if context is None and extracted is not None:
+        context = _GenerateContext(extracted=extracted)
+
+    # Read the existing init file once and share it with every step
+    if init_model is None:
+        init_model = InitFileModel(modpath)
+
+    # Analyze the package once, even if both the interface and the runtime
+    # init are rendered from it
+    export_model = _analyze_exports(
+        modpath,
+        submodules=submodules,
+        respect_all=respect_all,
+        options=options,
+        init_model=init_model,
+        external_exports=external_exports,
+        context=context,
+    )
+    if context is not None and context.report is not None:
+        context.report.export_model = export_model
+
+    targets = []
+    if options['lazy_loader_typed']:
+        targets.append((InitFileModel(modpath, interface=True), True))
+    if options['lazy_loader'] or not options['lazy_loader_typed']:
+        targets.append((init_model, False))
+
+    results = []
+    for target_model, interface in targets:
+        render_options = options
+        if interface:
+            render_options = {**options, 'lazy_loader': False}
+        sidecar = {}
+        with phase('format'):
+            initstr = export_model.render(
+                render_options, interface=interface, sidecar=sidecar
+            )
+        init_fpath, new_text = _insert_autogen_text(
+            modpath, initstr, interface=interface, init_model=target_model
+        )
+        if sidecar:
+            # Written before the init that loads it
+            results.append(_sidecar_result(init_model, sidecar))
+        results.append((init_fpath, target_model.text, new_text))
+    return results
+
+
+def _sidecar_result(init_model, sidecar):
+    """
+    Args:
+        init_model (InitFileModel): the model of the init that loads the file
+        sidecar (Dict): the content of the file
+
+    Returns:
+        Tuple[str, str, str]: the path, old text, and new text of the
+            ``_mkinit_index.json`` file next to an init
+    """
+    import json
+
+    fpath = join(dirname(init_model.fpath), LAZY_INDEX_FNAME)
+    old_text = init_model.sibling_text(LAZY_INDEX_FNAME) or ''
+    new_text = json.dumps(sidecar, indent=1) + '\n'
+    return fpath, old_text, new_text
+
+
+class _GenerateContext:
+    """
+    The state of the generation of one package, which is passed down to the
+    functions that read files.
+
+    Attributes:
+        report (PackageReport | None):
+            records the files that were read, if tracking is enabled
+
+        overlay (Dict[str, str] | None):
+            maps absolute paths of modules to text that is used instead of
+            their content on disk (i.e. files that will be written later).
+
+        extracted (Dict[str, List[str] | None] | None):
+            maps absolute paths of modules to their known exported names.
+            Modules that map to None are parsed as usual.
+    """
+
+    def __init__(self, report=None, overlay=None, extracted=None):
+        self.report = report
+        self.overlay = overlay
+        self.extracted = extracted
+
+    def add_input(self, fpath):
+        if self.report is not None:
+            self.report.inputs.add(abspath(os.fspath(fpath)))
+
+    def overlay_source(self, fpath):
+        """
+        Returns:
+            str | None: the planned text of a file, if any
+        """
+        if not self.overlay:
+            return None
+        return self.overlay.get(abspath(fpath), None)
+
+    def extracted_names(self, fpath):
+        """
+        Returns:
+            List[str] | None: the known exported names of a file, if any
+        """
+        if not self.extracted:
+            return None
+        names = self.extracted.get(abspath(fpath), None)
+        if names is None:
+            return None
+        return list(names)
+
+
+def _generate_package_tracked(
+    modpath,
+    submodules=None,
+    respect_all=True,
+    options=None,
+    external_exports=None,
+    overlay=None,
+    init_model=None,
+    extracted=None,
+):
+    """
+    Like :func:`_generate_package`, but also returns a report of the modules
+    that were parsed to generate the package and the time it took.
+
+    Args:
+        overlay (Dict[str, str] | None):
+            maps absolute paths of modules to text that is used instead of
+            their content on disk (i.e. files that will be written later).
+
+        extracted (Dict[str, List[str] | None] | None):
+            maps absolute paths of modules to their already known exported
+            names, see :func:`_generate_package`.
+
+    Returns:
+        Tuple[List[Tuple[str, str, str]], PackageReport]:
+            the results and the report (without outputs)
+    """
+    pkg_report = PackageReport(modpath)
+    context = _GenerateContext(
+        report=pkg_report, overlay=overlay, extracted=extracted
+    )
+    start = time.perf_counter()
+    results = _generate_package(
+        modpath,
+        submodules=submodules,
+        respect_all=respect_all,
+        options=options,
+        external_exports=external_exports,
+        context=context,
+        init_model=init_model,
+    )
+    pkg_report.seconds = time.perf_counter() - start
+    for _, old_text, _ in results:
+        # The existing text was read to find the insert points
+        pkg_report.bytes_read += len(old_text.encode('utf8'))
+    return results, pkg_report
+
+
+def _rectify_manifest(manifest, modpath):
+    from mkinit.manifest import MANIFEST_FNAME, Manifest
+
+    if manifest is None or manifest is False:
+        return None
+    if isinstance(manifest, Manifest):
+        return manifest
+    if manifest is True:
+        manifest = join(dirname(modpath), MANIFEST_FNAME)
+    return Manifest(manifest)
+
+
+def _out_of_date_fpaths(results):
+    """
+    Returns:
+        List[str]: the files in the results of :func:`_generate_package`
+            whose text would change
+    """
+    return [
+        str(fpath)
+        for fpath, old_text, new_text in results
+        if old_text != new_text
+    ]
+
+
+def _emit_results(results, dry=False, diff=False):
+    """
+    Writes or displays the results of :func:`_generate_package`.
+
+    Files are only written if their text changed (see
+    :class:`mkinit.write_plan.WritePlanner`).
+
+    Returns:
+        List[str]: the files that were written
+    """
+    if not dry:
+        planner = WritePlanner()
+        for init_fpath, old_text, new_text in results:
+            planner.add(init_fpath, new_text, old_text=old_text)
+        return planner.flush()
+    for init_fpath, old_text, new_text in results:
+        if dry:
+            logger.info('(DRY) would write updated file: %r' % init_fpath)
+            if diff == 'unified':
+                with phase('diff', init_fpath):
+                    display_text = difftext(
+                        old_text,
+                        new_text,
+                        context_lines=3,
+                        colored=sys.stdout.isatty(),
+                        backend='unified',
+                        fromfile=str(init_fpath),
+                        tofile=str(init_fpath),
+                    )
+                if display_text:
+                    print(display_text)
+            elif diff:
+                # Display difference
+                with phase('diff', init_fpath):
+                    display_text = difftext(
+                        old_text, new_text, colored=True, context_lines=3
+                    )
+                print(display_text)
+            else:
+                print(new_text)
+    return []
+
+
+def _init_worker(parse_cache):
+    from mkinit.cache import set_parse_cache
+
+    set_parse_cache(parse_cache)
+
+
+def _generate_package_worker(pkg_modpath, profile=False, **kwargs):
+    """
+    Runs :func:`_generate_package_tracked` in a worker process.
+
+    Returns:
+        Tuple[List, PackageReport, Dict | None]: the results, the report, and
+            the profile data of the worker if ``profile`` is True.
+    """
+    if not profile:
+        results, pkg_report = _generate_package_tracked(pkg_modpath, **kwargs)
+        return results, pkg_report, None
+    with Profile() as prof:
+        results, pkg_report = _generate_package_tracked(pkg_modpath, **kwargs)
+    return results, pkg_report, prof.to_dict(top=None)
+
+
+def _iter_bottom_up(
+    pkg_modpaths,
+    respect_all=True,
+    options=None,
+    jobs=1,
+    external_exports=None,
+    overlay=None,
+    init_models=None,
+):
+    """
+    Generates a set of packages such that each package is only started after
+    all of its subpackages are finished.
+
+    Args:
+        pkg_modpaths (List[str]):
+            package directories ordered such that children come before
+            their parents.
+
+        jobs (int): number of worker processes. If 1, packages are
+            generated serially in this process. If 0 or less, uses one
+            worker per CPU.
+
+        external_exports (Dict[str, Tuple] | None):
+            see :func:`_batch_resolve_externals`
+
+        overlay (Dict[str, str] | None):
+            see :func:`_generate_package_tracked`. The consumer may add the
+            new text of a package before requesting the next item, and its
+            parent will see it.
+
+        init_models (Dict[str, InitFileModel] | None):
+            previously loaded models of the existing inits of the packages.
+            Only used when generating in this process.
+
+    Yields:
+        Tuple[str, List, PackageReport]: each package directory, the results
+            of :func:`_generate_package`, and the report of
+            :func:`_generate_package_tracked`, in the order they finish. A parent is
+            not scheduled until the consumer requests the next item after
+            its last child, so it is safe to write the child results before
+            then.
+    """
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs == 1 or len(pkg_modpaths) <= 1:
+        for pkg_modpath in pkg_modpaths:
+            results, pkg_report = _generate_package_tracked(
+                pkg_modpath,
+                respect_all=respect_all,
+                options=options,
+                external_exports=external_exports,
+                overlay=overlay,
+                init_model=(init_models or {}).get(pkg_modpath, None),
+            )
+            yield pkg_modpath, results, pkg_report
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    from mkinit.cache import get_parse_cache
+    from mkinit.profiling import get_profile
+
+    prof = get_profile()
+    order = {m: idx for idx, m in enumerate(pkg_modpaths)}
+    parent_of = {}
+    num_pending_children = {m: 0 for m in pkg_modpaths}
+    for pkg_modpath in pkg_modpaths:
+        parent = dirname(pkg_modpath)
+        if parent in num_pending_children:
+            parent_of[pkg_modpath] = parent
+            num_pending_children[parent] += 1
+
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(pkg_modpaths)),
+        initializer=_init_worker,
+        initargs=(get_parse_cache(),),
+    ) as executor:
+        running = {}
+
+        def _submit(pkg_modpath):
+            child_overlay = None
+            if overlay:
+                # Only send the new __init__ files of direct children
+                child_overlay = {
+                    fpath: text
+                    for fpath, text in overlay.items()
+                    if dirname(dirname(fpath)) == pkg_modpath
+                }
+            future = executor.submit(
+                _generate_package_worker,
+                pkg_modpath,
+                profile=prof is not None,
+                respect_all=respect_all,
+                options=options,
+                external_exports=external_exports,
+                overlay=child_overlay,
+            )
+            running[future] = pkg_modpath
+
+        for pkg_modpath in pkg_modpaths:
+            if num_pending_children[pkg_modpath] == 0:
+                _submit(pkg_modpath)
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: order[running[f]]):
+                pkg_modpath = running.pop(future)
+                results, pkg_report, prof_data = future.result()
+                if prof_data is not None:
+                    prof.merge(prof_data)
+                yield pkg_modpath, results, pkg_report
+                parent = parent_of.get(pkg_modpath, None)
+                if parent is not None:
+                    num_pending_children[parent] -= 1
+                    if num_pending_children[parent] == 0:
+                        _submit(parent)
+
+
+def _rectify_to_modpath(modpath_or_name):
+    if exists(modpath_or_name):
+        modpath = abspath(modpath_or_name)
+    else:
+        modpath = util_import.modname_to_modpath(modpath_or_name)
+        if modpath is None:
+            raise ValueError('Invalid module {}'.format(modpath_or_name))
+    if basename(modpath) == '__init__.py':
+        modpath = dirname(modpath)
+    return modpath
+
+
+def static_init(
+    modpath_or_name,
+    submodules=None,
+    respect_all=True,
+    options=None,
+    init_model=None,
+    external_exports=None,
+):
+    """
+    Returns the autogenerated initialization string.  This can either be
+    executed with `exec` or directly copied into the __init__.py file.
+
+    Note:
+        This only returns the generated part, it does not put it the context of
+        existing code. For that functionality see  :func:`autogen_init` using
+        the dry=True argument to get a return value instead of modifying
+        inplace.
+
+    Args:
+        options (dict | None):
+            formatting options; customizes how output is formatted.
+            See `formatting._ensure_options` for defaults.
+
+        init_model (InitFileModel | None):
+            a previously loaded model of the package's ``__init__.py``.
+            If unspecified the file is read from disk.
+
+        external_exports (Dict[str, Tuple] | None):
+            previously resolved ``__external__`` modules, see
+            :func:`_batch_resolve_externals`.
+
+    """
+    options = _ensure_options(options)
+    export_model = _analyze_exports(
+        modpath_or_name,
+        submodules=submodules,
+        respect_all=respect_all,
+        options=options,
+        init_model=init_model,
+        external_exports=external_exports,
+    )
+    with phase('format'):
+        initstr = export_model.render(options)
+    return initstr
+
+
+def _analyze_exports(
+    modpath_or_name,
+    submodules=None,
+    respect_all=True,
+    options=None,
+    init_model=None,
+    external_exports=None,
+    context=None,
+):
+    """
+    Determines what a package exports without rendering any text.
+
+    Args:
+        See :func:`static_init`.
+
+        context (_GenerateContext | None): see :func:`_generate_package`
+
+    Returns:
+        ExportModel: the exports, which can be rendered as the runtime
+            ``__init__.py`` text and as the ``__init__.pyi`` interface.
+    """
+    modpath = _rectify_to_modpath(modpath_or_name)
+
+    options = _ensure_options(options)
+
+    if init_model is None:
+        init_model = InitFileModel(modpath)
+
+    user_decl = init_model.user_decl
+    logger.debug('user_decl = {}'.format(user_decl))
+    if submodules is not None:
+        user_decl['__submodules__'] = submodules
+
+    submodules = user_decl.get('__submodules__', None)
+    explicit = user_decl.get('__explicit__', [])
+    private = user_decl.get('__private__', [])
+    protected = user_decl.get('__protected__', [])
+    external = user_decl.get('__external__', [])
+    ignore = user_decl.get('__ignore__', [])
+    lazy = list(user_decl.get('__lazy__', []))
+
+    #
+    module_property_names = init_model.module_property_names
+
+    PARSE_USER_TEXT_FOR_OTHER_NAMES = True
+    if PARSE_USER_TEXT_FOR_OTHER_NAMES:
+        try:
+            user_attrs = init_model.user_attrs
+        except Exception:
+            logger.error('Unable to parse user attributes')
+            raise
+
+        logger.debug(
+            'Updating explicit with variable names parsed from existing text: {}'.format(
+                user_attrs
+            )
+        )
+        explicit.extend(user_attrs)
+
+    modname, imports, from_imports = _static_parse_imports(
+        modpath,
+        submodules=submodules,
+        respect_all=respect_all,
+        external=external,
+        ignore=ignore,
+        source_order=options['source_order'],
+        external_exports=external_exports,
+        context=context,
+    )
+
+    logger.debug('Found {} imports'.format(len(imports)))
+    logger.debug('Found {} from_imports'.format(len(from_imports)))
+    logger.debug('modname={}'.format(modname))
+
+    if options['import_costs'] is not None:
+        lazy += _costly_submodules(
+            modname,
+            imports,
+            options['import_costs'],
+            options['lazy_threshold'],
+            context=context,
+        )
+
+    eager_groups = None
+    if options['lazy_parallel_eager'] and options['lazy_import']:
+        eager_groups = _eager_warmup_groups(
+            modpath, modname, [m.lstrip('.') for m in imports]
+        )
+
+    return ExportModel(
+        modname,
+        imports,
+        from_imports,
+        explicit=explicit,
+        protected=protected,
+        private=private,
+        module_property_names=module_property_names,
+        eager_groups=eager_groups,
+        lazy=lazy,
+    )
+
+
+def _costly_submodules(
+    modname, imports, costs_fpath, threshold_ms, context=None
+):
+    """
+    Finds the submodules that take at least ``threshold_ms`` milliseconds to
+    import according to an import profile.
+
+    Args:
+        modname (str): name of the package
+        imports (List[str]): relative submodule imports, e.g. ``.sub``
+        costs_fpath (str | PathLike): see :func:`mkinit.import_profile.load_import_costs`
+        threshold_ms (float): the import time at which a submodule is costly
+        context (_GenerateContext | None): see :func:`_generate_package`
+
+    Returns:
+        List[str]: the costly submodules
+    """
+    from mkinit.import_profile import load_import_costs
+
+    if context is not None:
+        context.add_input(costs_fpath)
+    costs = load_import_costs(costs_fpath)
+    costly = []
+    for submod in imports:
+        cost = costs.get(modname + submod)
+        if cost is not None and cost >= threshold_ms * 1000:
+            costly.append(submod.lstrip('.'))
+    return costly
+
+
+def _eager_warmup_groups(modpath, modname, submodnames):
+    """
+    Groups the submodules of a package so that the generated ``lazy_import``
+    can warm each group on its own thread while the package's ``__init__`` is
+    still running.
+
+    Submodules that import each other, directly or through a shared sibling,
+    end up in the same group, ordered so that dependencies come first. A
+    submodule that imports the package itself or one of its parents (e.g.
+    ``from . import x`` or ``import pkg.x``) would wait on the import lock
+    held by the thread running the ``__init__``. Such a submodule and the
+    rest of its group are left out, so they are warmed on the importing
+    thread.
+
+    Args:
+        modpath (str): path to the package directory
+
+        modname (str): name of the package
+
+        submodnames (List[str]): submodules relative to the package
+
+    Returns:
+        List[List[str]]: the groups that are safe to warm in parallel
+
+    Example:
+        >>> from mkinit.static_mkinit import _eager_warmup_groups
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/eager_groups').delete()
+        >>> pkg = (dpath / 'pkg').ensuredir()
+        >>> (pkg / 'a.py').write_text('from .c import helper')
+        >>> (pkg / 'b.py').write_text('import os')
+        >>> (pkg / 'c.py').write_text('helper = 1')
+        >>> (pkg / 'd.py').write_text('from . import c')
+        >>> (pkg / 'e.py').write_text('from pkg.f import g')
+        >>> (pkg / 'f.py').write_text('g = 1')
+        >>> names = ['a', 'b', 'c', 'd', 'e', 'f']
+        >>> _eager_warmup_groups(pkg, 'pkg', names)
+        [['b'], ['f', 'e']]
+    """
+    import ast
+
+    submodnames = list(submodnames)
+    known = set(submodnames)
+    prefix = modname + '.'
+
+    def _waits_on_package(name):
+        return name == modname or modname.startswith(name + '.')
+
+    def _module_files(submodname):
+        base = join(modpath, *submodname.split('.'))
+        if exists(base + '.py'):
+            yield base + '.py', modname + '.' + submodname, False
+            return
+        for root, _, fnames in os.walk(base):
+            rel_parts = os.path.relpath(root, modpath).split(os.sep)
+            pkg_name = '.'.join([modname] + rel_parts)
+            for fname in sorted(fnames):
+                if fname == '__init__.py':
+                    yield join(root, fname), pkg_name, True
+                elif fname.endswith('.py'):
+                    yield join(root, fname), pkg_name + '.' + fname[:-3], False
+
+    def _imports(fpath, file_modname, is_pkg):
+        """
+        Yields the modules an import waits on and the modules it names
+        """
+        with phase('parse', fpath):
+            with open(fpath, 'r', encoding='utf8') as file:
+                tree = ast.parse(file.read())
+        pkg_parts = file_modname.split('.')
+        if not is_pkg:
+            pkg_parts = pkg_parts[:-1]
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    # Without a fromlist the top level package is returned
+                    yield alias.name.split('.')[0], alias.name
+                    yield alias.name, alias.name
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    parts = pkg_parts[: len(pkg_parts) - node.level + 1]
+                    if node.module:
+                        parts = parts + [node.module]
+                    base = '.'.join(parts)
+                else:
+                    base = node.module
+                for alias in node.names:
+                    yield base, base + '.' + alias.name
+
+    unsafe = set()
+    deps = {}
+    for submodname in submodnames:
+        submod_deps = deps[submodname] = []
+        try:
+            for fpath, file_modname, is_pkg in _module_files(submodname):
+                for waited, named in _imports(fpath, file_modname, is_pkg):
+                    if _waits_on_package(waited):
+                        unsafe.add(submodname)
+                    if named.startswith(prefix):
+                        dep = named[len(prefix) :].split('.')[0]
+                        if dep in known and dep != submodname:
+                            submod_deps.append(dep)
+        except (OSError, SyntaxError, ValueError):
+            unsafe.add(submodname)
+
+    # Union sibling imports into connected components
+    parent = {name: name for name in submodnames}
+
+    def _find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for submodname, submod_deps in deps.items():
+        for dep in submod_deps:
+            parent[_find(dep)] = _find(submodname)
+
+    components = {}
+    for submodname in submodnames:
+        components.setdefault(_find(submodname), []).append(submodname)
+
+    groups = []
+    for members in components.values():
+        if unsafe.intersection(members):
+            continue
+        # Order each group so dependencies are imported first
+        ordered = []
+        seen = set()
+
+        def _visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            for dep in deps[name]:
+                _visit(dep)
+            ordered.append(name)
+
+        for name in members:
+            _visit(name)
+        groups.append(ordered)
+    return groups
+
+
+def parse_user_declarations(modpath):
+    """
+    Statically determine special file-specific user options and declarations
+    """
+    # the __init__ file may have a variable describing the correct imports
+    # should imports specify the name of this variable or should it always be
+    # __submodules__?
+    return InitFileModel(modpath).user_decl
+
+
+def _parse_user_declarations2(init_fpath):
+    """
+    Parses the user declarations of an ``__init__.py`` file via
+    :class:`mkinit.models.ModuleSummary`.
+
+    Example:
+        >>> from mkinit.static_mkinit import _parse_user_declarations2  # NOQA
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/test_module_props').ensuredir()
+        >>> init_fpath = dpath / '__init__.py'
+        >>> init_text = ub.codeblock(
+        >>>     '''
+        >>>     __private__ = ['foo', 'bar']
+        >>>     __extra_all__ = ['aliased value']
+        >>>     __explicit__ = ['should overwrite']
+        >>>     __SUBMODULES__ = ['aliased value that does not overwrite']
+        >>>     ...
+        >>>     class __module_properties__:
+        >>>         my_attr = 3
+        >>>         def my_method(self):
+        >>>              return 'my method'
+        >>>         @staticmethod
+        >>>         def my_staticmethod(self):
+        >>>              return 'my staticmethod'
+        >>>         @classmethod
+        >>>         def my_classmethod(cls):
+        >>>              return 'my classmethod'
+        >>>         @property
+        >>>         def my_property(self):
+        >>>              return 'my property'
+        >>>     ''')
+        >>> init_fpath.write_text(init_text)
+        >>> user_decl = _parse_user_declarations2(init_fpath)
+        >>> assert '__SUBMODULES__' not in user_decl
+        >>> assert user_decl['__submodules__'] == ['aliased value that does not overwrite']
+        >>> assert user_decl['__explicit__'] == ['should overwrite']
+        >>> assert user_decl['module_property_names']
+    """
+    summary = ModuleSummary.from_fpath(init_fpath)
+    return summary.user_decl
+
+
+def _find_local_submodules(pkgpath):
+    """
+    Yields all children submodules in a package (non-recursively)
+
+    Args:
+        pkgpath (str): path to a package with an __init__.py file
+
+    Example:
+        >>> pkgpath = util_import.modname_to_modpath('mkinit')
+        >>> import_paths = dict(_find_local_submodules(pkgpath))
+        >>> print('import_paths = {!r}'.format(import_paths))
+    """
+    # Find all the children modules in this package (non recursive)
+    pkgname = util_import.modpath_to_modname(pkgpath, check=False)
+    if pkgname is None:
+        raise Exception('cannot import {!r}'.format(pkgpath))
+    # TODO:
+    # DOES THIS NEED A REWRITE TO HANDLE THE CASE WHEN __init__ does not exist?
+
+    try:
+        # Hack to grab the root package
+        a, b = util_import.split_modpath(pkgpath, check=False)
+        root_pkgpath = join(a, b.replace('\\', '/').split('/')[0])
+    except ValueError:
+        # Assume that the path is the root package if split_modpath fails
+        root_pkgpath = pkgpath
+
+    for sub_modpath in static.package_modpaths(
+        pkgpath, with_pkg=True, recursive=False, check=False
+    ):
+        sub_modname = util_import.modpath_to_modname(
+            sub_modpath, check=False, relativeto=root_pkgpath
+        )
+        rel_modname = sub_modname[len(pkgname) + 1 :]
+        if not rel_modname or rel_modname.startswith('_'):
+            # Skip private modules
+            pass
+        else:
+            yield rel_modname, sub_modpath
+
+
+def _extract_attributes(
+    modpath=None, source=None, respect_all=True, context=None
+):
+    """
+    This is the function that basically simulates import *
+
+    When ``source`` is not given, results are looked up in the persistent
+    parse cache (see :mod:`mkinit.cache`) if it is enabled, and the file is
+    recorded in the report of the ``context`` (see :func:`_generate_package`).
+
+    Example:
+        >>> modpath = util_import.modname_to_modpath('mkinit', hide_init=False)
+        >>> _extract_attributes(modpath)
+        >>> modpath = util_import.modname_to_modpath('mkinit.util.util_diff', hide_init=False)
+        >>> _extract_attributes(modpath)
+    """
+    with phase('parse', modpath):
+        if source is None:
+            assert modpath is not None
+            return _extract_file_attributes(modpath, respect_all, context)
+        summary = ModuleSummary.from_source(source, fpath=modpath)
+        return summary.exported_names(respect_all=respect_all)
+
+
+def _extract_file_attributes(modpath, respect_all=True, context=None):
+    """
+    Reads a module (or its entry in the parse cache) and extracts its
+    attributes, recording what was read in the report of the context.
+    """
+    tracked = None
+    if context is not None:
+        tracked = context.report
+        context.add_input(modpath)
+        source = context.overlay_source(modpath)
+        if source is not None:
+            if tracked is not None:
+                tracked.files_parsed += 1
+            summary = ModuleSummary.from_source(source, fpath=modpath)
+            return summary.exported_names(respect_all=respect_all)
+        names = context.extracted_names(modpath)
+        if names is not None:
+            if tracked is not None:
+                tracked.cache_hits += 1
+            return names
+    parse_cache = get_parse_cache()
+    if parse_cache is not None:
+        counts = (parse_cache.hits, parse_cache.misses, parse_cache.bytes_read)
+        try:
+            attrs = parse_cache.extract_attributes(
+                modpath,
+                respect_all,
+                lambda source: ModuleSummary.from_source(
+                    source, fpath=modpath
+                ).exported_names(respect_all=respect_all),
+            )
+        except OSError as ex:  # nocover
+            raise IOError(
+                'Error reading {}, caused by {}'.format(modpath, repr(ex))
+            )
+        if tracked is not None:
+            tracked.cache_hits += parse_cache.hits - counts[0]
+            tracked.files_parsed += parse_cache.misses - counts[1]
+            tracked.bytes_read += parse_cache.bytes_read - counts[2]
+        return attrs
+    try:
+        with open(modpath, 'r', encoding='utf8') as file:
+            source = file.read()
+            num_bytes = os.fstat(file.fileno()).st_size
+    except Exception as ex:  # nocover
+        raise IOError(
+            'Error reading {}, caused by {}'.format(modpath, repr(ex))
+        )
+    if tracked is not None:
+        tracked.files_parsed += 1
+        tracked.bytes_read += num_bytes
+    summary = ModuleSummary.from_source(source, fpath=modpath)
+    return summary.exported_names(respect_all=respect_all)
+
+
+def _static_parse_imports(
+    modpath,
+    submodules=None,
+    external=None,
+    respect_all=True,
+    ignore=None,
+    source_order=False,
+    external_exports=None,
+    context=None,
+):
+    """
+    Search local submodules for names that should be exposed in the top-level
+    namespace.
+
+    Args:
+        modpath (PathLike): base path to a package (with an __init__)
+
+        submodules (List[str]): Submodules to look at in the base package.
+            This is implicitly generated if not specified.
+
+        respect_all (bool):
+            if False, does not respect the __all__ attributes of submodules.
+            Defaults to True.
+
+        external_exports (Dict[str, Tuple] | None):
+            previously resolved external modules from
+            :func:`_batch_resolve_externals`. Any external module not in
+            this dictionary is resolved on demand.
+
+        context (_GenerateContext | None): see :func:`_generate_package`
+
+    Returns:
+        Tuple: (modname, imports, from_imports)
+
+    CommandLine:
+        python -m mkinit.static_autogen _static_parse_imports
+
+    Example:
+        >>> modpath = util_import.modname_to_modpath('mkinit')
+        >>> external = ['textwrap']
+        >>> tup = _static_parse_imports(modpath, external=external)
+        >>> modname, submodules, from_imports = tup
+        >>> print('modname = {!r}'.format(modname))
+        >>> print('submodules = {!r}'.format(submodules))
+        >>> print('from_imports = {!r}'.format(from_imports))
+        >>> # assert 'autogen_init' in submodules
+
+    Example:
+        >>> from mkinit.static_mkinit import *  # NOQA
+        >>> modpath = util_import.modname_to_modpath('mkinit')
+        >>> external = ['textwrap']
+        >>> submodules = {'foo': ['bar', 'baz', 'biz']}
+        >>> tup = _static_parse_imports(modpath, submodules=submodules, external=external)
+        >>> modname, submodules, from_imports = tup
+        >>> print('modname = {!r}'.format(modname))
+        >>> print('submodules = {!r}'.format(submodules))
+        >>> print('from_imports = {!r}'.format(from_imports))
+        >>> # assert 'autogen_init' in submodules
+    """
+    def _ordered(attrs):
+        """Sort alphabetically unless source order is requested"""
+        return list(attrs) if source_order else sorted(attrs)
+
+    logger.debug('Parse static submodules: {}'.format(modpath))
+    # FIXME: handle the case where the __init__.py file doesn't exist yet
+    modname = util_import.modpath_to_modname(modpath, check=False)
+    if submodules is None:
+        # Equivalent to case submodules = {'*': ['*']}
+        # TODO: refactor to reduce code size and collapse cases
+        # TODO: could pull in pattern matching generalization from xdev and
+        # allow regex or glob-type matches.
+        logger.debug('Parsing implicit submodules!')
+        with phase('discover'):
+            import_paths = dict(_find_local_submodules(modpath))
+        submodules = {k: None for k in sorted(import_paths.keys())}
+        # logger.debug('Found {} import paths'.format(len(import_paths)))
+        # logger.debug('Found {} submodules'.format(len(submodules)))
+    else:
+        logger.debug('Given explicit submodules')
+        if modname is None:
+            raise AssertionError('modname is None')
+
+        if isinstance(submodules, list):
+            # Make a dict mapping module names to None
+            submodules = {m: None for m in submodules}
+
+        # Determine which submodules were given as a pattern
+        implicit_submodules = {k: v for k, v in submodules.items() if '*' in k}
+        if implicit_submodules:
+            submodule_patterns = submodules.copy()
+            explicit_keys = set(submodule_patterns) - set(implicit_submodules)
+            explicit_submodules = {k: submodules[k] for k in explicit_keys}
+            with phase('discover'):
+                local_submodules = dict(_find_local_submodules(modpath))
+            implicit_candidates = {
+                k: v
+                for k, v in local_submodules.items()
+                if k not in explicit_keys
+            }
+            matched_submodules = {}
+            for pat_key, pat_val in implicit_submodules.items():
+                matched_submodules.update(
+                    {
+                        k: pat_val
+                        for k, v in implicit_candidates.items()
+                        if fnmatch.fnmatch(k, pat_key)
+                    }
+                )
+            submodules = explicit_submodules.copy()
+            submodules.update(matched_submodules)
+
+        import_paths = {
+            m: util_import.modname_to_modpath(
+                modname + '.' + m, hide_init=False
+            )
+            for m in submodules.keys()
+        }
+        # FIX for relative nested import_paths
+        for m in import_paths.keys():
+            oldval = import_paths[m]
+            if oldval is None:
+                candidates = [
+                    join(modpath, m),
+                    join(modpath, m) + '.py',
+                ]
+                for newval in candidates:
+                    if exists(newval):
+                        import_paths[m] = newval
+                        break
+    imports = ['.' + m for m in submodules.keys()]
+
+    def _lookup_extractable_attrs(rel_modname):
+        sub_modpath = import_paths[rel_modname]
+        if sub_modpath is None:
+            raise Exception(
+                'Failed to submodule lookup {!r}'.format(rel_modname)
+            )
+        try:
+            extracted_attrs = _extract_attributes(
+                sub_modpath, respect_all=respect_all, context=context
+            )
+        except SyntaxError as ex:
+            warnings.warn(
+                'Failed to parse module {!r}, ex = {!r}'.format(rel_modname, ex)
+            )
+            extracted_attrs = None
+        return extracted_attrs
+
+    from_imports = []
+    for rel_modname, attr_list in submodules.items():
+        if attr_list is None:
+            # Equivalent to case where attr_list = ['*']
+            # TODO: refactor to reduce code size and collapse cases
+            valid_attrs = _lookup_extractable_attrs(rel_modname)
+            if valid_attrs is not None:
+                if ignore:
+                    ignore = set(ignore)
+                    valid_attrs = [v for v in valid_attrs if v not in ignore]
+                from_imports.append(('.' + rel_modname, _ordered(valid_attrs)))
+        else:
+            # Determine which attrs were given as a pattern
+            implicit_attrs = {a for a in attr_list if '*' in a}
+            if implicit_attrs:
+                # pattern matching on implicit attrs
+                explicit_attrs = set(attr_list) - implicit_attrs
+                matched_attrs = set()
+                extracted_attrs = _lookup_extractable_attrs(rel_modname)
+                if extracted_attrs is not None:
+                    for pat in implicit_attrs:
+                        matched_attrs.update(
+                            {
+                                cand
+                                for cand in extracted_attrs
+                                if fnmatch.fnmatch(cand, pat)
+                            }
+                        )
+                resolved_attrs = set()
+                resolved_attrs.update(explicit_attrs)
+                resolved_attrs.update(matched_attrs)
+                if source_order and extracted_attrs is not None:
+                    # Order by the position each name appears in the source,
+                    # appending any explicit names not found in the module.
+                    in_source = [
+                        a for a in extracted_attrs if a in resolved_attrs
+                    ]
+                    leftover = [
+                        a for a in attr_list if a in resolved_attrs
+                        and a not in extracted_attrs
+                    ]
+                    attr_list = in_source + leftover
+                else:
+                    attr_list = sorted(resolved_attrs)
+
+            valid_attrs = attr_list
+            if ignore:
+                ignore = set(ignore)
+                valid_attrs = [v for v in valid_attrs if v not in ignore]
+            from_imports.append(('.' + rel_modname, valid_attrs))
+
+    if external:
+        for ext_modname in external:
+            if external_exports is not None and ext_modname in external_exports:
+                ext_modpath, valid_attrs, error = external_exports[ext_modname]
+            else:
+                ext_modpath, valid_attrs, error = _resolve_external(
+                    ext_modname, respect_all=respect_all, context=context
+                )
+            if ext_modpath is None:
+                raise Exception(
+                    'Failed to external lookup {!r}'.format(ext_modname)
+                )
+            if context is not None:
+                context.add_input(ext_modpath)
+            if error is not None:
+                warnings.warn(
+                    'Failed to parse {!r}, ex = {!r}'.format(ext_modname, error)
+                )
+            else:
+                from_imports.append((ext_modname, _ordered(valid_attrs)))
+
+    return modname, imports, from_imports
+
+
+def _resolve_external(ext_modname, respect_all=True, context=None):
+    """
+    Finds and parses an external module.
+
+    Args:
+        context (_GenerateContext | None): see :func:`_generate_package`
+
+    Returns:
+        Tuple[str | None, List[str] | None, SyntaxError | None]:
+            the path to the module (None if it was not found), its exported
+            names, and the error raised if it could not be parsed.
+    """
+    ext_modpath = util_import.modname_to_modpath(ext_modname, hide_init=False)
+    if ext_modpath is None:
+        return None, None, None
+    try:
+        valid_attrs = _extract_attributes(
+            ext_modpath, respect_all=respect_all, context=context
+        )
+    except SyntaxError as ex:
+        return ext_modpath, None, ex
+    return ext_modpath, valid_attrs, None
+
+
+def _batch_resolve_externals(pkg_modpaths, respect_all=True, init_models=None):
+    """
+    Resolves and parses the ``__external__`` modules of many packages up
+    front, so modules shared by several packages are only processed once.
+
+    Args:
+        pkg_modpaths (List[str]): package directories
+
+        init_models (Dict[str, InitFileModel] | None):
+            previously loaded models of the existing inits of the packages,
+            which are reused when they are generated.
+
+    Returns:
+        Dict[str, Tuple]: maps each external module name to the result of
+            :func:`_resolve_external`.
+
+    Example:
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/batch_external').delete().ensuredir()
+        >>> pkg1 = (dpath / 'pkg1').ensuredir()
+        >>> pkg2 = (dpath / 'pkg2').ensuredir()
+        >>> (pkg1 / '__init__.py').write_text("__external__ = ['mkinit.util.util_diff']")
+        >>> (pkg2 / '__init__.py').write_text("__external__ = ['mkinit.util.util_diff']")
+        >>> external_exports = _batch_resolve_externals([pkg1, pkg2])
+        >>> print(list(external_exports))
+        ['mkinit.util.util_diff']
+        >>> ext_modpath, attrs, error = external_exports['mkinit.util.util_diff']
+        >>> assert 'difftext' in attrs
+    """
+    ext_modnames = {}
+    for pkg_modpath in pkg_modpaths:
+        init_model = None
+        if init_models is not None:
+            init_model = init_models.get(pkg_modpath, None)
+        if init_model is None:
+            init_model = InitFileModel(pkg_modpath)
+        try:
+            external = init_model.user_decl.get('__external__', None)
+        except (OSError, SyntaxError):
+            # The error is reported when the package is generated
+            continue
+        if isinstance(external, (list, tuple)):
+            ext_modnames.update(dict.fromkeys(external))
+    external_exports = {
+        ext_modname: _resolve_external(ext_modname, respect_all=respect_all)
+        for ext_modname in ext_modnames
+    }
+    return external_exports
@@ -1,8 +1,14 @@
 from os import PathLike
-from typing import List
+from typing import Dict, List, Tuple
 
 from _typeshed import Incomplete
 
+from mkinit.export_index import ExportIndex
+from mkinit.manifest import Manifest
+from mkinit.models import InitFileModel
+from mkinit.profiling import Profile
+from mkinit.report import RunReport
+
 logger: Incomplete
 
 def autogen_init(
@@ -11,13 +17,22 @@ def autogen_init(
     respect_all: bool = True,
     options: dict | None = None,
     dry: bool = False,
-    diff: bool = ...,
+    diff: bool | str = ...,
     recursive: bool = False,
-): ...
+    jobs: int = 1,
+    manifest: str | PathLike | bool | Manifest | None = None,
+    profile: bool | Profile | None = None,
+    report: bool = False,
+    check: bool = False,
+    check_all: bool = False,
+    export_index: bool | ExportIndex | None = None,
+) -> Tuple[str, str] | List[str] | Profile | RunReport | ExportIndex | None: ...
 def static_init(
     modpath_or_name,
     submodules: Incomplete | None = ...,
     respect_all: bool = ...,
     options: Incomplete | None = ...,
+    init_model: InitFileModel | None = None,
+    external_exports: Dict[str, Tuple] | None = None,
 ): ...
 def parse_user_declarations(modpath): ...
@@ -200,30 +200,9 @@ class TopLevelVisitor(ast.NodeVisitor):
             rather appear as extra If nodes within the orelse section of the
             previous one.
         """
-        if isinstance(node.test, ast.Compare):  # pragma: nobranch
-            try:
-                if IS_PY_GE_312:
-                    if all(
-                        [
-                            isinstance(node.test.ops[0], ast.Eq),
-                            node.test.left.id == '__name__',
-                            node.test.comparators[0].value == '__main__',
-                        ]
-                    ):
-                        # Ignore main block
-                        return
-                else:
-                    if all(
-                        [
-                            isinstance(node.test.ops[0], ast.Eq),
-                            node.test.left.id == '__name__',
-                            node.test.comparators[0].s == '__main__',
-                        ]
-                    ):
-                        # Ignore main block
-                        return
-            except Exception:  # nocover
-                pass
+        if is_main_block(node):
+            # Ignore main block
+            return
 
         # TODO: handled deleted attributes?
         # Find definitions from conditionals that always accept or
@@ -313,6 +292,46 @@ class TopLevelVisitor(ast.NodeVisitor):
         self.generic_visit(node)
 
 
+def is_main_block(node):
+    """
+    Check if a node is an ``if __name__ == '__main__'`` block
+
+    Args:
+        node (ast.AST): the node to check
+
+    Returns:
+        bool
+
+    Example:
+        >>> import ast
+        >>> node = ast.parse('if __name__ == "__main__": pass').body[0]
+        >>> assert is_main_block(node)
+        >>> node = ast.parse('if __name__ == "foo": pass').body[0]
+        >>> assert not is_main_block(node)
+    """
+    if not isinstance(node, ast.If) or not isinstance(node.test, ast.Compare):
+        return False
+    try:
+        if IS_PY_GE_312:
+            return all(
+                [
+                    isinstance(node.test.ops[0], ast.Eq),
+                    node.test.left.id == '__name__',
+                    node.test.comparators[0].value == '__main__',
+                ]
+            )
+        else:
+            return all(
+                [
+                    isinstance(node.test.ops[0], ast.Eq),
+                    node.test.left.id == '__name__',
+                    node.test.comparators[0].s == '__main__',
+                ]
+            )
+    except Exception:  # nocover
+        return False
+
+
 def unpack_if_nodes(if_node):
     """
     Extract chain of `<if><elif>*<else>?` statements
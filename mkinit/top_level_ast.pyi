@@ -24,6 +24,7 @@ class TopLevelVisitor(ast.NodeVisitor):
 
     def visit_Delete(self, node) -> None: ...
 
+def is_main_block(node: ast.AST) -> bool: ...
 def unpack_if_nodes(if_node): ...
 def static_truthiness(node): ...
 def get_conditional_attrnames(body): ...
@@ -18,9 +18,26 @@ import sys
 # complient with https://no-color.org/
 NO_COLOR = bool(os.environ.get('NO_COLOR'))
 
+# ANSI codes used to color unified diffs
+_ANSI_RESET = '\x1b[0m'
+_ANSI_DIFF_CODES = {
+    '---': '\x1b[1m',
+    '+++': '\x1b[1m',
+    '@@': '\x1b[36m',
+    '+': '\x1b[32m',
+    '-': '\x1b[31m',
+}
+
 
 def difftext(
-    text1, text2, context_lines=0, ignore_whitespace=False, colored=False
+    text1,
+    text2,
+    context_lines=0,
+    ignore_whitespace=False,
+    colored=False,
+    backend='ndiff',
+    fromfile='',
+    tofile='',
 ):
     r"""
     Uses difflib to return a difference string between two similar texts
@@ -32,6 +49,16 @@ def difftext(
         ignore_whitespace (bool):
         colored (bool): if true highlight the diff
 
+        backend (str):
+            Either 'ndiff', which shows changed lines with hints about
+            intraline changes, or 'unified', which produces a unified diff
+            (see :func:`unified_diff_lines`). The unified backend is much
+            faster on large files and colors with plain ANSI codes instead of
+            pygments. Defaults to 'ndiff'.
+
+        fromfile (str): name of the old file in unified diff headers
+        tofile (str): name of the new file in unified diff headers
+
     Returns:
         str: formatted difference text message
 
@@ -58,7 +85,36 @@ def difftext(
         >>> result = difftext(text1, text2, context_lines, colored=True)
         >>> # verify results
         >>> print(result)
+
+    Example:
+        >>> text1 = 'one\ntwo\nthree\nfour'
+        >>> text2 = 'one\ntwo\nfive\nfour'
+        >>> result = difftext(text1, text2, 1, backend='unified',
+        >>>                   fromfile='a.py', tofile='b.py')
+        >>> print(result)
+        --- a.py
+        +++ b.py
+        @@ -2,3 +2,3 @@
+         two
+        -three
+        +five
+         four
     """
+    if backend == 'unified':
+        lines = unified_diff_lines(
+            text1,
+            text2,
+            context_lines=context_lines,
+            ignore_whitespace=ignore_whitespace,
+            fromfile=fromfile,
+            tofile=tofile,
+        )
+        if colored and not NO_COLOR:
+            lines = map(_ansi_color_diff_line, lines)
+        return '\n'.join(lines)
+    if backend != 'ndiff':
+        raise KeyError('Unknown diff backend {!r}'.format(backend))
+
     import difflib
 
     text1_lines = text1.splitlines()
@@ -80,15 +136,7 @@ def difftext(
         ismarked_list = [
             len(line) > 0 and line[0] in '+-?' for line in all_diff_lines
         ]
-        # flag lines that are within context_lines away from a diff line
-        isvalid_list = ismarked_list[:]
-        for i in range(1, context_lines + 1):
-            isvalid_list[:-i] = list(
-                map(any, zip(isvalid_list[:-i], ismarked_list[i:]))
-            )
-            isvalid_list[i:] = list(
-                map(any, zip(isvalid_list[i:], ismarked_list[:-i]))
-            )
+        isvalid_list = _within_context(ismarked_list, context_lines)
 
         USE_BREAK_LINE = True
         if USE_BREAK_LINE:
@@ -114,6 +162,95 @@ def difftext(
     return text
 
 
+def _within_context(ismarked_list, context_lines):
+    """
+    Flags the items that are at most ``context_lines`` away from a marked
+    item, using one forward and one backward pass.
+
+    Example:
+        >>> marked = [0, 0, 0, 1, 0, 0, 0, 0, 1]
+        >>> print(_within_context(marked, 1))
+        [False, False, True, True, True, False, False, True, True]
+    """
+    num = len(ismarked_list)
+    isvalid_list = [False] * num
+    last = None
+    for idx, marked in enumerate(ismarked_list):
+        if marked:
+            last = idx
+        if last is not None and idx - last <= context_lines:
+            isvalid_list[idx] = True
+    last = None
+    for idx in range(num - 1, -1, -1):
+        if ismarked_list[idx]:
+            last = idx
+        if last is not None and last - idx <= context_lines:
+            isvalid_list[idx] = True
+    return isvalid_list
+
+
+def unified_diff_lines(
+    text1,
+    text2,
+    context_lines=3,
+    ignore_whitespace=False,
+    fromfile='',
+    tofile='',
+):
+    r"""
+    Lazily generates the lines of a unified diff between two texts.
+
+    Unlike ``ndiff``, this does not compute intraline hints, and the context
+    of each hunk is found while matching, so lines are produced hunk by hunk.
+
+    Args:
+        text1 (str): old text
+        text2 (str): new text
+        context_lines (int | None): lines of unchanged context around each
+            change. If None, all lines are shown.
+        ignore_whitespace (bool): if True, ignore trailing whitespace
+        fromfile (str): name of the old file in the header
+        tofile (str): name of the new file in the header
+
+    Yields:
+        str: lines of the diff without trailing newlines
+
+    Example:
+        >>> lines = list(unified_diff_lines('a\nb\nc', 'a\nB\nc', 0))
+        >>> print('\n'.join(lines))
+        ---
+        +++
+        @@ -2 +2 @@
+        -b
+        +B
+        >>> assert list(unified_diff_lines('same', 'same')) == []
+    """
+    import difflib
+
+    text1_lines = text1.splitlines()
+    text2_lines = text2.splitlines()
+    if ignore_whitespace:
+        text1_lines = [t.rstrip() for t in text1_lines]
+        text2_lines = [t.rstrip() for t in text2_lines]
+    if context_lines is None:
+        context_lines = max(len(text1_lines), len(text2_lines))
+    yield from difflib.unified_diff(
+        text1_lines,
+        text2_lines,
+        fromfile=fromfile,
+        tofile=tofile,
+        n=context_lines,
+        lineterm='',
+    )
+
+
+def _ansi_color_diff_line(line):
+    for prefix, code in _ANSI_DIFF_CODES.items():
+        if line.startswith(prefix):
+            return code + line + _ANSI_RESET
+    return line
+
+
 def highlight_code(text, lexer_name='python', **kwargs):
     """
     Highlights a block of text using ANSI tags based on language syntax.
@@ -1,3 +1,5 @@
+from typing import Generator
+
 from _typeshed import Incomplete
 
 NO_COLOR: Incomplete
@@ -8,5 +10,16 @@ def difftext(
     context_lines: int = 0,
     ignore_whitespace: bool = False,
     colored: bool = False,
+    backend: str = 'ndiff',
+    fromfile: str = '',
+    tofile: str = '',
 ) -> str: ...
+def unified_diff_lines(
+    text1: str,
+    text2: str,
+    context_lines: int | None = 3,
+    ignore_whitespace: bool = False,
+    fromfile: str = '',
+    tofile: str = '',
+) -> Generator[str, None, None]: ...
 def highlight_code(text: str, lexer_name: str = 'python', **kwargs) -> str: ...
@@ -5,6 +5,7 @@ dev/maintain/port_ubelt_code.py in the mkinit repo.
 
 import os
 import sys
+import time
 from os.path import (
     abspath,
     basename,
@@ -20,6 +21,8 @@ from os.path import (
     splitext,
 )
 
+from mkinit.profiling import phase
+
 IS_PY_GE_308 = (sys.version_info[0] >= 3) and (sys.version_info[1] >= 8)
 
 
@@ -405,6 +408,291 @@ def _syspath_modname_to_modpath(modname, sys_path=None, exclude=None):
     return found_modpath
 
 
+# Directories modified this recently (in seconds) may be modified again
+# without changing their mtime, so their listings are not trusted.
+_RACY_SECONDS = 2.0
+
+
+class ModnameResolver:
+    """
+    A memoized equivalent of :func:`_syspath_modname_to_modpath`.
+
+    Instead of probing the filesystem for every candidate path, the resolver
+    reads each directory it needs once with :func:`os.scandir` and answers
+    lookups from those listings. Editable install mappings (``__editable__``
+    finders, ``.pth`` and ``.egg-link`` files) are parsed once per directory.
+
+    Each result is memoized along with the mtime of every directory that was
+    consulted to find it. A memoized result is reused while those mtimes are
+    unchanged, and the search path itself (and the cwd) is part of the memo
+    key, so changes to ``sys.path`` or to any consulted directory invalidate
+    it.
+
+    Both the memoized results and the directory listings are kept in least
+    recently used order and the oldest ones are forgotten once there are more
+    than ``max_results`` or ``max_dirs`` of them, so a long running process
+    that sees many search paths does not grow without bound.
+
+    Args:
+        max_results (int): maximum number of memoized results
+
+        max_dirs (int): maximum number of memoized directory listings
+
+    Note:
+        Unlike :func:`_syspath_modname_to_modpath`, names are matched case
+        sensitively on all platforms, which is also how the import system
+        behaves.
+
+    Attributes:
+        hits (int): number of lookups answered from the memo
+        misses (int): number of lookups that had to search
+
+    Example:
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/resolver').delete().ensuredir()
+        >>> pkg = (dpath / 'resolver_pkg').ensuredir()
+        >>> (pkg / '__init__.py').write_text('')
+        >>> (pkg / 'mod.py').write_text('')
+        >>> # Recently modified directories are never trusted, so backdate them
+        >>> os.utime(pkg, (0, 0))
+        >>> os.utime(dpath, (0, 0))
+        >>> sys_path = [str(dpath)]
+        >>> resolver = ModnameResolver()
+        >>> modpath = resolver.resolve('resolver_pkg.mod', sys_path)
+        >>> assert modpath == _syspath_modname_to_modpath('resolver_pkg.mod', sys_path)
+        >>> assert resolver.resolve('resolver_pkg.mod', sys_path) == modpath
+        >>> assert resolver.hits == 1
+        >>> assert resolver.resolve('xdoctest', sys_path=[]) is None
+    """
+
+    def __init__(self, max_results=8192, max_dirs=2048):
+        from collections import OrderedDict
+
+        self.hits = 0
+        self.misses = 0
+        self.max_results = max_results
+        self.max_dirs = max_dirs
+        # Maps an absolute directory to (mtime_ns, entries, parsed_files)
+        self._dirs = OrderedDict()
+        # Maps a lookup key to (modpath, dependency mtimes)
+        self._memo = OrderedDict()
+        self._pylib_exts = None
+
+    def __repr__(self):
+        return '{}(hits={}, misses={})'.format(
+            self.__class__.__name__, self.hits, self.misses
+        )
+
+    def clear(self):
+        """
+        Forgets all cached listings and results
+        """
+        self._dirs.clear()
+        self._memo.clear()
+
+    def _stat_mtime(self, dpath):
+        try:
+            stat = os.stat(dpath)
+        except OSError:
+            return None
+        if (time.time() - stat.st_mtime) < _RACY_SECONDS:
+            # Never trust a recently modified directory
+            return -1
+        return stat.st_mtime_ns
+
+    def _entries(self, dpath, deps):
+        """
+        Returns a dictionary mapping the names in a directory to True if they
+        are directories and False otherwise.
+        """
+        dpath = abspath(dpath)
+        mtime = self._stat_mtime(dpath)
+        deps[dpath] = mtime
+        cached = self._dirs.get(dpath, None)
+        if cached is not None and mtime != -1 and cached[0] == mtime:
+            self._dirs.move_to_end(dpath)
+            return cached[1]
+        entries = {}
+        if mtime is not None:
+            try:
+                for entry in os.scandir(dpath):
+                    try:
+                        entries[entry.name] = entry.is_dir()
+                    except OSError:  # nocover
+                        entries[entry.name] = False
+            except OSError:
+                pass
+        self._dirs[dpath] = (mtime, entries, {})
+        self._dirs.move_to_end(dpath)
+        while len(self._dirs) > self.max_dirs:
+            self._dirs.popitem(last=False)
+        return entries
+
+    def _parsed_file(self, dpath, fname, parse):
+        # File contents are cached with the listing of their directory
+        cached = self._dirs.get(abspath(dpath), None)
+        parsed_files = {} if cached is None else cached[2]
+        try:
+            return parsed_files[fname]
+        except KeyError:
+            try:
+                value = parse(join(dpath, fname))
+            except Exception:
+                value = None
+            parsed_files[fname] = value
+            return value
+
+    def _is_package(self, dpath, name, deps):
+        entries = self._entries(dpath, deps)
+        if not entries.get(name, False):
+            return False
+        sub_entries = self._entries(join(dpath, name), deps)
+        return sub_entries.get('__init__.py', None) is False
+
+    def _check_dpath(self, dpath, parts, deps):
+        # Every directory up to the module must be a package
+        pkg_dpath = dpath
+        for part in parts[:-1]:
+            if not self._is_package(pkg_dpath, part, deps):
+                return None
+            pkg_dpath = join(pkg_dpath, part)
+        fname_we = os.path.sep.join(parts)
+        # Directory-based modules take precedence over files
+        if self._is_package(pkg_dpath, parts[-1], deps):
+            return join(dpath, fname_we)
+        entries = self._entries(pkg_dpath, deps)
+        if self._pylib_exts is None:
+            self._pylib_exts = ('.py',) + _platform_pylib_exts()
+        for ext in self._pylib_exts:
+            if entries.get(parts[-1] + ext, None) is False:
+                return join(dpath, fname_we + ext)
+        return None
+
+    def _editable_targets(self, dpath, pkg_name, deps):
+        """
+        Yields the directories editable installs in ``dpath`` point to
+        """
+        import fnmatch
+
+        entries = self._entries(dpath, deps)
+        if not entries:
+            return
+        names = sorted(entries)
+
+        def _parse_mapping(fpath):
+            return _static_parse('MAPPING', fpath)
+
+        def _parse_pth(fpath):
+            with open(fpath, 'r') as file:
+                return file.read().strip().split('\n')[-1]
+
+        def _parse_egglink(fpath):
+            with open(fpath, 'r') as file:
+                return file.readline().strip()
+
+        for fname in fnmatch.filter(names, '__editable___*_*finder.py'):
+            mapping = self._parsed_file(dpath, fname, _parse_mapping)
+            if isinstance(mapping, dict) and pkg_name in mapping:
+                yield dirname(mapping[pkg_name])
+
+        pth_pat = '__editable__.' + pkg_name + '-*.pth'
+        for fname in fnmatch.filter(names, pth_pat):
+            target = self._parsed_file(dpath, fname, _parse_pth)
+            if target:
+                yield target
+
+        for fname in [
+            pkg_name + '.egg-link',
+            pkg_name.replace('_', '-') + '.egg-link',
+        ]:
+            if entries.get(fname, None) is False:
+                target = self._parsed_file(dpath, fname, _parse_egglink)
+                if target:
+                    yield target
+                break
+
+    def resolve(self, modname, sys_path=None, exclude=None):
+        """
+        Finds the path to a module in the same way as
+        :func:`_syspath_modname_to_modpath`.
+
+        Args:
+            modname (str): name of module to find
+
+            sys_path (None | List[str | PathLike]):
+                The paths to search for the module.
+                If unspecified, defaults to ``sys.path``.
+
+            exclude (List[str | PathLike] | None):
+                If specified prevents these directories from being searched.
+
+        Returns:
+            str | None: path to the module.
+        """
+        if sys_path is None:
+            sys_path = sys.path
+        sys_path = tuple(os.fspath(p) for p in sys_path)
+        if exclude is not None:
+            exclude = tuple(os.fspath(p) for p in exclude)
+        key = (modname, sys_path, exclude, os.getcwd())
+
+        memo = self._memo.get(key, None)
+        if memo is not None:
+            modpath, deps = memo
+            if all(
+                mtime != -1 and self._stat_mtime(dpath) == mtime
+                for dpath, mtime in deps.items()
+            ):
+                self.hits += 1
+                self._memo.move_to_end(key)
+                return modpath
+
+        self.misses += 1
+        deps = {}
+        modpath = self._resolve(modname, sys_path, exclude, deps)
+        self._memo[key] = (modpath, deps)
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.max_results:
+            self._memo.popitem(last=False)
+        return modpath
+
+    def _resolve(self, modname, sys_path, exclude, deps):
+        parts = modname.split('.')
+        pkg_name = parts[0]
+
+        # the empty string in sys.path indicates cwd. Change this to a '.'
+        candidate_dpaths = ['.' if p == '' else p for p in sys_path]
+
+        def normalize(p):
+            if sys.platform.startswith('win32'):  # nocover
+                return realpath(p).lower()
+            else:
+                return realpath(p)
+
+        real_exclude = set()
+        if exclude:
+            # Keep only the paths not in exclude
+            real_exclude = {normalize(p) for p in exclude}
+            candidate_dpaths = [
+                p for p in candidate_dpaths if normalize(p) not in real_exclude
+            ]
+
+        for dpath in candidate_dpaths:
+            modpath = self._check_dpath(dpath, parts, deps)
+            if modpath:
+                return modpath
+            # Attempt to handle PEP660 import hooks and egg links
+            for target in self._editable_targets(dpath, pkg_name, deps):
+                if not real_exclude or normalize(target) not in real_exclude:
+                    modpath = self._check_dpath(target, parts, deps)
+                    if modpath:
+                        return modpath
+        return None
+
+
+_MODNAME_RESOLVER = ModnameResolver()
+
+
 def modname_to_modpath(modname, hide_init=True, hide_main=False, sys_path=None):
     """
     Finds the path to a python module from its name.
@@ -446,17 +734,9 @@ def modname_to_modpath(modname, hide_init=True, hide_main=False, sys_path=None):
         >>> modpath = basename(modname_to_modpath('_ctypes'))
         >>> assert 'ctypes' in modpath
     """
-    if hide_main or sys_path:
-        modpath = _syspath_modname_to_modpath(modname, sys_path)
-    else:
-        # import xdev
-        # with xdev.embed_on_exception_context:
-        # try:
-        #     modpath = _importlib_modname_to_modpath(modname)
-        # except Exception:
-        #     modpath = _syspath_modname_to_modpath(modname, sys_path)
-        # modpath = _pkgutil_modname_to_modpath(modname, sys_path)
-        modpath = _syspath_modname_to_modpath(modname, sys_path)
+    # Lookups are memoized, see :class:`ModnameResolver`
+    with phase('resolve'):
+        modpath = _MODNAME_RESOLVER.resolve(modname, sys_path)
 
     if modpath is None:
         return None
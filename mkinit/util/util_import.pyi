@@ -1,6 +1,23 @@
 from os import PathLike
 from typing import List, Tuple
 
+class ModnameResolver:
+    hits: int
+    misses: int
+    max_results: int
+    max_dirs: int
+
+    def __init__(
+        self, max_results: int = 8192, max_dirs: int = 2048
+    ) -> None: ...
+    def clear(self) -> None: ...
+    def resolve(
+        self,
+        modname: str,
+        sys_path: None | List[str | PathLike] = None,
+        exclude: List[str | PathLike] | None = None,
+    ) -> str | None: ...
+
 def modname_to_modpath(
     modname: str,
     hide_init: bool = True,
@@ -0,0 +1,374 @@
+"""
+Keeps ``__init__.py`` files up to date while a package is being edited.
+
+A :class:`Watcher` polls the modification times of the python files in a
+package and, when some of them change, regenerates only the packages whose
+inputs changed. The exported names of each module are kept in memory, so
+saving a file without changing the names it exports does not regenerate
+anything, a parent package is only regenerated if one of its subpackages'
+exported names changed, and regenerating a package only parses the files that
+changed.
+
+Bursts of changes (e.g. a "save all" in an editor or a branch checkout) are
+debounced: regeneration happens once the package has been quiet for
+``debounce`` seconds.
+
+The list of watched packages is only rediscovered when the modification time
+of one of their directories changes (i.e. when an entry is added, removed or
+renamed), or when a new ``__init__.py`` appears in a subdirectory.
+
+In dry mode nothing is written, so the new ``__init__.py`` text of each
+package is kept in memory and used instead of the file on disk when its
+parent is generated, like :func:`mkinit.static_mkinit.autogen_init` does.
+
+The watcher uses polling so it works everywhere without extra dependencies.
+"""
+
+import logging
+import os
+import time
+from os.path import abspath, basename, dirname, join
+
+from mkinit import static_analysis as static
+from mkinit.formatting import _ensure_options
+
+logger = logging.getLogger(__name__)
+
+
+def _mtime_ns(dpath):
+    try:
+        return os.stat(dpath).st_mtime_ns
+    except OSError:
+        return None
+
+
+class Watcher:
+    """
+    Regenerates the ``__init__.py`` files of a package when its modules change.
+
+    Args:
+        modpath_or_name (PathLike | str): path to or name of the package
+
+        respect_all (bool): see :func:`mkinit.static_mkinit.autogen_init`
+
+        options (dict | None): see :func:`mkinit.static_mkinit.autogen_init`
+
+        dry (bool): if True, show the generated text instead of writing it
+
+        diff (bool | str): if truthy, show a diff of the generated text, see
+            :func:`mkinit.static_mkinit.autogen_init`
+
+        recursive (bool): if True, watch all subpackages
+
+        interval (float): seconds between polls
+
+        debounce (float): seconds without further changes to wait before
+            regenerating
+
+    Example:
+        >>> from mkinit.watch import *  # NOQA
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/watch').delete().ensuredir()
+        >>> pkg = (dpath / 'watched_pkg').ensuredir()
+        >>> (pkg / '__init__.py').write_text('')
+        >>> (pkg / 'mod.py').write_text('def foo(): pass')
+        >>> self = Watcher(pkg, debounce=0)
+        >>> self.start()
+        >>> assert 'foo' in (pkg / '__init__.py').read_text()
+        >>> (pkg / 'mod.py').write_text('def bar(): pass')
+        >>> written = self.poll_once()
+        >>> assert written == [str(pkg / '__init__.py')]
+        >>> assert 'bar' in (pkg / '__init__.py').read_text()
+        >>> # Changes that do not affect exported names regenerate nothing
+        >>> (pkg / 'mod.py').write_text('def bar(): return 1')
+        >>> self.poll_once()
+        []
+    """
+
+    def __init__(
+        self,
+        modpath_or_name,
+        respect_all=True,
+        options=None,
+        dry=False,
+        diff=False,
+        recursive=False,
+        interval=0.5,
+        debounce=0.2,
+    ):
+        from mkinit.static_mkinit import _rectify_to_modpath
+
+        self.modpath = _rectify_to_modpath(modpath_or_name)
+        self.respect_all = respect_all
+        self.options = _ensure_options(options)
+        self.dry = dry
+        self.diff = diff
+        self.recursive = recursive
+        self.interval = interval
+        self.debounce = debounce
+        # Maps each watched file to its (mtime_ns, size)
+        self._stats = {}
+        # Maps each watched file to the names it exports
+        self._names = {}
+        # The watched package directories and their mtimes when discovered
+        self._packages = None
+        self._package_mtimes = {}
+        # Maps each init that would be written in dry mode to its new text
+        self._overlay = {}
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.modpath)
+
+    def _package_modpaths(self):
+        """
+        Returns:
+            List[str]: the watched package directories, parents first
+        """
+        if not self.recursive:
+            return [self.modpath]
+        if self._packages is not None and all(
+            _mtime_ns(pkg_modpath) == mtime
+            for pkg_modpath, mtime in self._package_mtimes.items()
+        ):
+            return self._packages
+        logger.debug('Discovering packages in {}'.format(self.modpath))
+        self._packages = [
+            dirname(fpath)
+            for fpath in static.package_modpaths(
+                self.modpath, with_pkg=True, with_mod=False
+            )
+        ]
+        self._package_mtimes = {
+            pkg_modpath: _mtime_ns(pkg_modpath)
+            for pkg_modpath in self._packages
+        }
+        return self._packages
+
+    def _scan(self):
+        """
+        Returns:
+            Dict[str, Tuple[int, int]]: the stat of every watched file
+        """
+        pkg_modpaths = self._package_modpaths()
+        stats = self._scan_packages(pkg_modpaths)
+        if self.recursive:
+            known = {abspath(p) for p in pkg_modpaths}
+            if any(
+                basename(fpath) == '__init__.py' and dirname(fpath) not in known
+                for fpath in stats
+            ):
+                # A subdirectory became a package without changing the mtime
+                # of its parent
+                self._packages = None
+                stats = self._scan_packages(self._package_modpaths())
+        return stats
+
+    def _scan_packages(self, pkg_modpaths):
+        stats = {}
+        for pkg_modpath in pkg_modpaths:
+            try:
+                entries = list(os.scandir(pkg_modpath))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith('.py'):
+                    fpath = entry.path
+                elif entry.is_dir():
+                    fpath = join(entry.path, '__init__.py')
+                else:
+                    continue
+                try:
+                    stat = os.stat(fpath)
+                except OSError:
+                    continue
+                stats[abspath(fpath)] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def _exported_names(self, fpath):
+        from mkinit.static_mkinit import _extract_attributes
+
+        try:
+            if fpath in self._overlay:
+                return _extract_attributes(
+                    source=self._overlay[fpath], respect_all=self.respect_all
+                )
+            return _extract_attributes(fpath, respect_all=self.respect_all)
+        except (OSError, SyntaxError):
+            # Treat unreadable or half-written files as having no names
+            return None
+
+    def start(self):
+        """
+        Generates every watched package once and records the current state.
+        """
+        from mkinit.static_mkinit import (
+            _emit_results,
+            _iter_bottom_up,
+            autogen_init,
+        )
+
+        self._overlay = {}
+        if self.dry:
+            # Keep the new text of each init so parents and later polls see it
+            for _, results, _ in _iter_bottom_up(
+                self._package_modpaths()[::-1],
+                respect_all=self.respect_all,
+                options=self.options,
+                overlay=self._overlay,
+            ):
+                self._add_overlay(results)
+                _emit_results(results, dry=True, diff=self.diff)
+        else:
+            autogen_init(
+                self.modpath,
+                respect_all=self.respect_all,
+                options=self.options,
+                diff=self.diff,
+                recursive=self.recursive,
+            )
+        self._stats = self._scan()
+        self._names = {
+            fpath: self._exported_names(fpath) for fpath in self._stats
+        }
+
+    def _add_overlay(self, results):
+        for init_fpath, old_text, new_text in results:
+            if init_fpath.endswith('.py') and old_text != new_text:
+                self._overlay[abspath(init_fpath)] = new_text
+
+    def _changed_fpaths(self):
+        new_stats = self._scan()
+        changed = {
+            fpath
+            for fpath in set(new_stats) | set(self._stats)
+            if new_stats.get(fpath, None) != self._stats.get(fpath, None)
+        }
+        return changed, new_stats
+
+    def poll_once(self):
+        """
+        Checks for changes once, waiting for changes to settle if there are
+        any, and regenerates the affected packages.
+
+        Returns:
+            List[str]: the files that were written (or would be in dry mode)
+        """
+        changed, new_stats = self._changed_fpaths()
+        if not changed:
+            return []
+        while self.debounce > 0:
+            time.sleep(self.debounce)
+            prev_stats = new_stats
+            changed, new_stats = self._changed_fpaths()
+            if new_stats == prev_stats:
+                break
+        self._stats = new_stats
+        return self.regenerate(changed)
+
+    def regenerate(self, changed):
+        """
+        Regenerates the packages affected by a set of changed files.
+
+        Args:
+            changed (Set[str]): paths of added, modified or removed files
+
+        Returns:
+            List[str]: the files that were written (or would be in dry mode)
+        """
+        from mkinit.static_mkinit import (
+            _emit_results,
+            _generate_package_tracked,
+        )
+
+        managed = set(self._package_modpaths())
+        affected = set()
+
+        def _on_names_changed(fpath):
+            pkg_modpath = dirname(fpath)
+            if basename(fpath) == '__init__.py':
+                # The names of a subpackage are used by its parent
+                pkg_modpath = dirname(pkg_modpath)
+            if pkg_modpath in managed:
+                affected.add(pkg_modpath)
+
+        for fpath in changed:
+            if basename(fpath) == '__init__.py' and dirname(fpath) in managed:
+                # The user section of the init may have changed
+                affected.add(dirname(fpath))
+                # The pending text of a dry run is based on the old file
+                self._overlay.pop(fpath, None)
+            names = (
+                self._exported_names(fpath) if fpath in self._stats else None
+            )
+            if names != self._names.get(fpath, None):
+                _on_names_changed(fpath)
+            if fpath in self._stats:
+                self._names[fpath] = names
+            else:
+                self._names.pop(fpath, None)
+
+        written = []
+        # Generate deeper packages first so their parents see the new names
+        while affected:
+            pkg_modpath = max(affected, key=lambda p: p.count(os.sep))
+            affected.remove(pkg_modpath)
+            logger.info('Regenerating {}'.format(pkg_modpath))
+            results, _ = _generate_package_tracked(
+                pkg_modpath,
+                respect_all=self.respect_all,
+                options=self.options,
+                overlay=self._overlay,
+                # Only the changed files are parsed again
+                extracted=self._names,
+            )
+            # In dry mode, compare against the text that would be written
+            results = [
+                r
+                for r in results
+                if self._overlay.get(abspath(r[0]), r[1]) != r[2]
+            ]
+            if not results:
+                continue
+            _emit_results(results, dry=self.dry, diff=self.diff)
+            if self.dry:
+                self._add_overlay(results)
+            for init_fpath, old_text, new_text in results:
+                init_fpath = abspath(init_fpath)
+                written.append(init_fpath)
+                if not init_fpath.endswith('.py'):
+                    continue
+                if not self.dry:
+                    # Do not treat our own write as a change on the next poll
+                    stat = os.stat(init_fpath)
+                    self._stats[init_fpath] = (stat.st_mtime_ns, stat.st_size)
+                    # Replacing the file also changes the package's mtime
+                    pkg_modpath = dirname(init_fpath)
+                    if pkg_modpath in self._package_mtimes:
+                        self._package_mtimes[pkg_modpath] = _mtime_ns(
+                            pkg_modpath
+                        )
+                names = self._exported_names(init_fpath)
+                if names != self._names.get(init_fpath, None):
+                    self._names[init_fpath] = names
+                    _on_names_changed(init_fpath)
+        return written
+
+    def run(self, max_polls=None):
+        """
+        Generates the package and then regenerates it on changes until
+        interrupted.
+
+        Args:
+            max_polls (int | None): stop after this many polls
+        """
+        self.start()
+        print('Watching {} for changes (Ctrl+C to stop)'.format(self.modpath))
+        num_polls = 0
+        try:
+            while max_polls is None or num_polls < max_polls:
+                for fpath in self.poll_once():
+                    print('Updated {}'.format(fpath))
+                num_polls += 1
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
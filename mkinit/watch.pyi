@@ -0,0 +1,32 @@
+from os import PathLike
+from typing import List, Set
+
+from _typeshed import Incomplete
+
+logger: Incomplete
+
+class Watcher:
+    modpath: str
+    respect_all: bool
+    options: dict
+    dry: bool
+    diff: bool
+    recursive: bool
+    interval: float
+    debounce: float
+
+    def __init__(
+        self,
+        modpath_or_name: PathLike | str,
+        respect_all: bool = True,
+        options: dict | None = None,
+        dry: bool = False,
+        diff: bool = False,
+        recursive: bool = False,
+        interval: float = 0.5,
+        debounce: float = 0.2,
+    ) -> None: ...
+    def start(self) -> None: ...
+    def poll_once(self) -> List[str]: ...
+    def regenerate(self, changed: Set[str]) -> List[str]: ...
+    def run(self, max_polls: int | None = None) -> None: ...
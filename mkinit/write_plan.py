@@ -0,0 +1,171 @@
+"""
+Plans and performs the writes of generated files.
+
+Rewriting a file with identical text still bumps its mtime, which invalidates
+``__pycache__`` and wakes up file watchers and build tools. The
+:class:`WritePlanner` compares each generated text with the existing file and
+only writes files whose text changed.
+
+Writes go to a temporary file in the same directory that is then renamed over
+the target, so readers never see a partially written file and an interrupted
+run leaves the previous file in place.
+
+The planner can also hold writes back and perform them together with
+:func:`WritePlanner.flush`. Until then :attr:`WritePlanner.pending` maps the
+absolute path of each planned file to its new text, which lets a recursive
+run read the new ``__init__.py`` of a subpackage before it is written.
+"""
+
+import logging
+import os
+import stat
+import tempfile
+from os.path import abspath, basename, dirname, exists, realpath
+
+from mkinit.profiling import phase
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['WritePlanner', 'atomic_write']
+
+_UMASK = None
+
+
+def _default_mode():
+    global _UMASK
+    if _UMASK is None:
+        # The umask can only be read by setting it
+        _UMASK = os.umask(0)
+        os.umask(_UMASK)
+    return 0o666 & ~_UMASK
+
+
+def atomic_write(fpath, text):
+    """
+    Writes text to a file by renaming a temporary file over it.
+
+    The permissions of an existing file are kept, and if the path is a
+    symlink its target is written.
+
+    Args:
+        fpath (str | PathLike): the file to write
+        text (str): the new text
+
+    Example:
+        >>> from mkinit.write_plan import *  # NOQA
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/atomic_write').delete().ensuredir()
+        >>> fpath = dpath / 'file.py'
+        >>> atomic_write(fpath, 'x = 1')
+        >>> assert fpath.read_text() == 'x = 1'
+        >>> atomic_write(fpath, 'x = 2')
+        >>> assert fpath.read_text() == 'x = 2'
+        >>> assert [p.name for p in dpath.iterdir()] == ['file.py']
+    """
+    fpath = realpath(os.fspath(fpath))
+    try:
+        mode = stat.S_IMODE(os.stat(fpath).st_mode)
+    except FileNotFoundError:
+        mode = _default_mode()
+    fd, tmp_fpath = tempfile.mkstemp(
+        dir=dirname(fpath), prefix='.' + basename(fpath) + '.', suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding='utf8') as file:
+            file.write(text)
+        os.chmod(tmp_fpath, mode)
+        os.replace(tmp_fpath, fpath)
+    except BaseException:
+        try:
+            os.unlink(tmp_fpath)
+        except OSError:  # nocover
+            pass
+        raise
+
+
+class WritePlanner:
+    r"""
+    Collects generated files, skipping those whose text is unchanged, and
+    writes the rest atomically.
+
+    Attributes:
+        pending (Dict[str, str]): maps the absolute path of each file that
+            will be written on the next flush to its new text.
+
+        written (List[str]): files that were written
+
+        unchanged (List[str]): files that were skipped because their text
+            did not change
+
+    Example:
+        >>> from mkinit.write_plan import *  # NOQA
+        >>> import ubelt as ub
+        >>> dpath = ub.Path.appdir('mkinit/doctests/write_plan').delete().ensuredir()
+        >>> (dpath / 'same.py').write_text('x = 1\n')
+        >>> (dpath / 'old.py').write_text('x = 1\n')
+        >>> planner = WritePlanner()
+        >>> assert not planner.add(dpath / 'same.py', 'x = 1\n')
+        >>> assert planner.add(dpath / 'old.py', 'x = 2\n')
+        >>> assert planner.add(dpath / 'new.py', 'x = 3\n')
+        >>> assert (dpath / 'old.py').read_text() == 'x = 1\n'
+        >>> planner.flush()
+        >>> assert (dpath / 'old.py').read_text() == 'x = 2\n'
+        >>> assert (dpath / 'new.py').read_text() == 'x = 3\n'
+        >>> assert len(planner.written) == 2 and len(planner.unchanged) == 1
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.written = []
+        self.unchanged = []
+
+    def __repr__(self):
+        return '{}(pending={}, written={}, unchanged={})'.format(
+            self.__class__.__name__,
+            len(self.pending),
+            len(self.written),
+            len(self.unchanged),
+        )
+
+    def add(self, fpath, new_text, old_text=None):
+        """
+        Plans to write a file if its text changed.
+
+        Args:
+            fpath (str | PathLike): the file to write
+
+            new_text (str): the generated text
+
+            old_text (str | None): the current text of the file, if it was
+                already read. Otherwise the file is read to compare.
+
+        Returns:
+            bool: True if the file will be written
+        """
+        fpath = abspath(os.fspath(fpath))
+        if old_text is None and exists(fpath):
+            with open(fpath, 'r', encoding='utf8') as file:
+                old_text = file.read()
+        if old_text == new_text and fpath not in self.pending:
+            logger.info('file is unchanged: %r' % fpath)
+            self.unchanged.append(fpath)
+            return False
+        self.pending[fpath] = new_text
+        return True
+
+    def flush(self):
+        """
+        Writes all pending files.
+
+        Returns:
+            List[str]: the files that were written
+        """
+        flushed = []
+        for fpath, text in self.pending.items():
+            logger.info('writing updated file: %r' % fpath)
+            with phase('write', fpath):
+                atomic_write(fpath, text)
+            flushed.append(fpath)
+        self.pending.clear()
+        self.written.extend(flushed)
+        return flushed
@@ -0,0 +1,19 @@
+from os import PathLike
+from typing import Dict, List
+
+from _typeshed import Incomplete
+
+logger: Incomplete
+
+def atomic_write(fpath: str | PathLike, text: str) -> None: ...
+
+class WritePlanner:
+    pending: Dict[str, str]
+    written: List[str]
+    unchanged: List[str]
+
+    def __init__(self) -> None: ...
+    def add(
+        self, fpath: str | PathLike, new_text: str, old_text: str | None = None
+    ) -> bool: ...
+    def flush(self) -> List[str]: ...
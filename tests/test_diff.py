@@ -0,0 +1,77 @@
+from mkinit.util.util_diff import difftext, unified_diff_lines
+
+
+def test_unified_difftext_headers_and_hunks():
+    text1 = '\n'.join('line{}'.format(idx) for idx in range(100)) + '\n'
+    text2 = text1.replace('line10\n', 'line10 changed\n').replace(
+        'line80\n', ''
+    )
+    got = difftext(
+        text1,
+        text2,
+        context_lines=1,
+        backend='unified',
+        fromfile='a/x.py',
+        tofile='b/x.py',
+    )
+    lines = got.split('\n')
+    assert lines[0:2] == ['--- a/x.py', '+++ b/x.py']
+    assert [line for line in lines if line.startswith('@@')] == [
+        '@@ -10,3 +10,3 @@',
+        '@@ -80,3 +80,2 @@',
+    ]
+    assert '-line10' in lines and '+line10 changed' in lines
+    assert '-line80' in lines
+    assert '\x1b' not in got
+
+
+def test_unified_diff_identical_and_full_context():
+    assert difftext('a\nb\n', 'a\nb\n', backend='unified') == ''
+    lines = list(unified_diff_lines('a\nb\nc\n', 'a\nB\nc\n', None))
+    assert lines[2:] == ['@@ -1,3 +1,3 @@', ' a', '-b', '+B', ' c']
+
+
+def test_unified_difftext_colored(monkeypatch):
+    from mkinit.util import util_diff
+
+    monkeypatch.setattr(util_diff, 'NO_COLOR', False)
+    got = difftext('a\n', 'b\n', backend='unified', colored=True)
+    assert '\x1b[32m+b' in got
+    monkeypatch.setattr(util_diff, 'NO_COLOR', True)
+    got = difftext('a\n', 'b\n', backend='unified', colored=True)
+    assert '\x1b' not in got
+
+
+def test_diff_default_is_ndiff(capsys):
+    """
+    ``--diff`` and ``autogen_init(diff=True)`` default to the ndiff format,
+    the unified format is opt-in.
+    """
+    import ubelt as ub
+
+    import mkinit
+    from mkinit.__main__ import main
+
+    dpath = ub.Path.appdir('mkinit/tests/diff_default').delete().ensuredir()
+    pkg = (dpath / 'diff_default_pkg').ensuredir()
+    (pkg / 'mod.py').write_text('def foo():\n    pass\n')
+    (pkg / '__init__.py').write_text('')
+
+    def is_unified(out):
+        return '@@ ' in out and '+++ ' in out
+
+    mkinit.autogen_init(pkg, dry=True, diff=True)
+    out = capsys.readouterr().out
+    assert '+ __all__' in out and not is_unified(out)
+
+    main([str(pkg), '--diff'])
+    out = capsys.readouterr().out
+    assert '+ __all__' in out and not is_unified(out)
+
+    main([str(pkg), '--diff', '--diff-format=unified'])
+    out = capsys.readouterr().out
+    assert '+__all__' in out and is_unified(out)
+
+    mkinit.autogen_init(pkg, dry=True, diff='unified')
+    out = capsys.readouterr().out
+    assert '+__all__' in out and is_unified(out)
@@ -0,0 +1,114 @@
+import json
+
+import ubelt as ub
+
+
+def _make_tree(dpath):
+    root = (dpath / 'mkinit_index_pkg').ensuredir()
+    sub = (root / 'sub').ensuredir()
+    (root / '__init__.py').write_text('')
+    (root / 'a.py').write_text('def a_func():\n    pass\n\nshared = 1\n')
+    (root / 'b.py').write_text("__all__ = ['b_func']\nb_func = 1\nhidden = 2\n")
+    (sub / '__init__.py').write_text('')
+    (sub / 'c.py').write_text('shared = 2\nclass C:\n    pass\n')
+    return root
+
+
+def test_export_index_recursive_run():
+    """
+    The index is populated by a recursive run that writes the inits, and
+    maps names to the modules that define them.
+    """
+    import mkinit
+    from mkinit.export_index import ExportIndex
+
+    dpath = ub.Path.appdir('mkinit/tests/export_index').delete().ensuredir()
+    root = _make_tree(dpath)
+
+    index = ExportIndex()
+    mkinit.autogen_init(root, recursive=True, export_index=index)
+    assert (
+        'from mkinit_index_pkg.sub import' in (root / '__init__.py').read_text()
+    )
+
+    assert index.modname == 'mkinit_index_pkg'
+    assert index.packages == {'mkinit_index_pkg', 'mkinit_index_pkg.sub'}
+    assert index.defining_modules('shared') == [
+        'mkinit_index_pkg.a',
+        'mkinit_index_pkg.sub.c',
+    ]
+    assert index.defining_modules('C') == ['mkinit_index_pkg.sub.c']
+    assert index.defining_modules('hidden') == []
+    assert index.exports('mkinit_index_pkg.b') == ['b_func']
+    assert index.exports('mkinit_index_pkg.sub') == ['C', 'c', 'shared']
+    assert {'C', 'a_func', 'b_func', 'sub'} <= set(
+        index.exports('mkinit_index_pkg')
+    )
+
+    # The same index is built with several workers
+    assert ExportIndex.build(root, jobs=2).to_dict() == index.to_dict()
+
+    # Building the index does not write anything
+    (root / 'd.py').write_text('d_func = 1\n')
+    built = ExportIndex.build(root)
+    assert built.defining_modules('d_func') == ['mkinit_index_pkg.d']
+    assert 'd_func' in built.exports('mkinit_index_pkg')
+    assert 'd_func' not in (root / '__init__.py').read_text()
+
+
+def test_export_index_cli(capsys):
+    from mkinit.__main__ import main
+    from mkinit.export_index import ExportIndex
+
+    dpath = ub.Path.appdir('mkinit/tests/export_index_cli').delete().ensuredir()
+    root = _make_tree(dpath)
+
+    assert main([str(root), '--export-index', '--lookup', 'C']) == 0
+    found = json.loads(capsys.readouterr().out)
+    assert found == {'C': ['mkinit_index_pkg.sub.c']}
+    assert main([str(root), '--export-index', '--lookup', 'C', 'missing']) == 1
+    capsys.readouterr()
+
+    out_fpath = dpath / 'index.json'
+    assert main([str(root), '--export-index', str(out_fpath)]) == 0
+    index = ExportIndex.load(out_fpath)
+    assert index.defining_modules('b_func') == ['mkinit_index_pkg.b']
+    assert (root / '__init__.py').read_text() == ''
+
+
+def test_export_index_cli_lookup_requires_index(capsys):
+    import pytest
+
+    from mkinit.__main__ import main
+
+    dpath = ub.Path.appdir('mkinit/tests/export_index_lookup').delete()
+    root = _make_tree(dpath.ensuredir())
+
+    with pytest.raises(SystemExit) as ex:
+        main([str(root), '--lookup', 'C'])
+    assert ex.value.code == 2
+    assert '--lookup requires --export-index' in capsys.readouterr().err
+    # Nothing was generated
+    assert (root / '__init__.py').read_text() == ''
+
+
+def test_cli_package_named_index(capsys):
+    """
+    A package named ``index`` is generated like any other.
+    """
+    import os
+
+    from mkinit.__main__ import main
+
+    dpath = ub.Path.appdir('mkinit/tests/export_index_named').delete()
+    root = (dpath / 'index').ensuredir()
+    (root / '__init__.py').write_text('')
+    (root / 'mod.py').write_text('def func():\n    pass\n')
+
+    cwd = os.getcwd()
+    try:
+        os.chdir(dpath)
+        assert main(['index', '-w']) == 0
+    finally:
+        os.chdir(cwd)
+    assert 'from index.mod import (func,)' in (root / '__init__.py').read_text()
@@ -85,3 +85,131 @@ def test_implicit_stacked_insert_points():
     ).split('\n')
     start, end, indent = _find_insert_points(lines)
     assert (start, end, indent) == (4, 5, '')
+
+
+def _legacy_find_insert_points(lines):
+    """
+    The previous implementation of ``_find_insert_points``, which located
+    statements with the xdoctest parser. Kept to check the new implementation
+    finds the same insert points.
+    """
+    from mkinit import static_analysis as static
+
+    startline = 0
+    endline = len(lines)
+    explicit_flag = False
+    init_indent = ''
+    source_lines = ['>>> ' + p.rstrip('\n') for p in lines]
+    try:
+        ps1_lines, _ = static._locate_ps1_linenos(source_lines)
+    except IndexError:
+        assert len(lines) == 0
+        ps1_lines = []
+    skipto = None
+    implicit_patterns = (
+        'from __future__',
+        '__version__',
+        '__submodules__',
+        '__external__',
+        '__explicit__',
+        '__extra_all__',
+        '__private__',
+        '__protected__',
+        '__ignore__',
+        '#',
+        '"""',
+        "'''",
+    )
+    for lineno, line in enumerate(lines):
+        if line.strip().startswith('# <AUTOGEN_INIT>'):
+            init_indent = line[: line.find('#')]
+            explicit_flag = True
+            startline = lineno + 1
+        if explicit_flag and line.strip().startswith('# </AUTOGEN_INIT>'):
+            endline = lineno
+        if not explicit_flag:
+            if skipto is not None:
+                if lineno != skipto:
+                    continue
+                else:
+                    skipto = None
+            if line.strip().startswith(implicit_patterns):
+                startline = lineno + 1
+                try:
+                    idx = ps1_lines.index(lineno)
+                    skipto = ps1_lines[idx + 1]
+                    startline = skipto
+                except ValueError:
+                    ...
+                except IndexError:
+                    startline = endline
+            else:
+                try:
+                    idx = ps1_lines.index(lineno)
+                    skipto = ps1_lines[idx + 1]
+                except ValueError:
+                    ...
+                except IndexError:
+                    ...
+    assert startline <= endline
+    return startline, endline, init_indent
+
+
+INSERT_POINT_CORPUS = [
+    '',
+    'x = 1',
+    '# comment',
+    '"""\ndocstring\n"""\nx = 1\n',
+    '"""\ndocstring\n"""\n# comment\n\nx = 1\ny = 2\n',
+    "__version__ = '1.0'\n__submodules__ = [\n    'a',\n    'b',\n]\nx = 1",
+    "__private__ = ['a']\n__protected__ = ['b']\n__ignore__ = ['c']\n",
+    "__explicit__ = ['x']; __external__ = ['os']\nfrom .a import b\n",
+    'from __future__ import annotations\nimport os\n\n\ndef f():\n    pass\n',
+    "# header\n@decorator\ndef f():\n    # inner comment\n    pass\n\n__version__ = '1'\n",
+    '# header\n@decorator(\n    1,\n)\nclass A:\n    pass\n# trailing\n',
+    "x = [\n    1,\n    2,\n]\n# comment\ny = {\n    'a': 1,\n}\n",
+    "'''\nmulti\n# not a comment\n'''\n__version__ = '2'\n",
+    'if True:\n    x = 1\nelse:\n    x = 2\n# c\nz = 3\n',
+    'try:\n    import numpy\nexcept ImportError:\n    numpy = None\n',
+    "__all__ = ['a']\n# <AUTOGEN_INIT>\nfrom .a import a\n# </AUTOGEN_INIT>\nextra = 1\n",
+    'x = 1\nif x:\n    # <AUTOGEN_INIT>\n    y = 2\n    # </AUTOGEN_INIT>\n',
+    'class __module_properties__:\n    @property\n    def foo(self):\n        return 1\n\n__version__ = "1"\n# comment\nfrom .a import b\n',
+    "x = '''\n'''\ny = 1\n''' z =\nw '''  # comment\n",
+    "__submodules__ = {\n    'a': ['b'],\n}\n\n\n\nfrom .a import b\n",
+    '#!/usr/bin/env python\n# -*- coding: utf-8 -*-\n"""\nDoc\n"""\nimport sys\n',
+]
+
+
+def test_insert_points_match_legacy_corpus():
+    """
+    The single pass statement detection should find the same insert points
+    as the previous xdoctest based implementation.
+    """
+    import textwrap
+
+    corpus = list(INSERT_POINT_CORPUS)
+    # Larger generated files exercise the skip logic over many statements
+    props = '\n'.join(
+        textwrap.dedent(
+            """
+            @property
+            def prop{idx}(self):
+                return {idx}
+            """
+        )
+        .replace('\n', '\n    ')
+        .format(idx=idx)
+        for idx in range(50)
+    )
+    corpus.append(
+        '"""\nBig init\n"""\n__version__ = "1"\n'
+        'class __module_properties__:\n    ' + props + '\n'
+        '__submodules__ = [\n'
+        + ''.join("    'mod{}',\n".format(i) for i in range(50))
+        + ']\nfrom .mod0 import x\n'
+    )
+    for text in corpus:
+        for lines in [text.split('\n'), text.splitlines(keepends=True)]:
+            got = _find_insert_points(lines)
+            want = _legacy_find_insert_points(lines)
+            assert got == want, text
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import ubelt as ub
+
+CHECK_CODE = ub.codeblock(
+    """
+    import sys
+    import {pkgname}
+    assert '{pkgname}.light' in sys.modules
+    assert '{pkgname}.heavy' not in sys.modules
+    assert {pkgname}.light_func() == 'light'
+    assert {pkgname}.heavy_func() == 'heavy'
+    assert '{pkgname}.heavy' in sys.modules
+    assert 'heavy_func' in dir({pkgname})
+    """
+)
+
+
+def _make_package(dpath, pkgname, init_text=''):
+    pkg_dpath = (dpath / pkgname).ensuredir()
+    (pkg_dpath / '__init__.py').write_text(init_text)
+    (pkg_dpath / 'light.py').write_text(
+        "def light_func():\n    return 'light'\n"
+    )
+    (pkg_dpath / 'heavy.py').write_text(
+        "def heavy_func():\n    return 'heavy'\n"
+    )
+    return pkg_dpath
+
+
+def _check_hybrid(dpath, pkgname):
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.fspath(dpath)
+    code = CHECK_CODE.format(pkgname=pkgname)
+    info = ub.cmd([sys.executable, '-c', code], env=env)
+    assert info['ret'] == 0, info['err']
+
+
+def test_hybrid_lazy_declaration():
+    import mkinit
+
+    pkgname = 'mkinit_hybrid_decl_pkg'
+    dpath = ub.Path.appdir('mkinit/tests/hybrid_lazy').ensuredir()
+    pkg_dpath = _make_package(dpath, pkgname, "__lazy__ = ['hea*']\n")
+    mkinit.autogen_init(pkg_dpath, dry=False)
+
+    text = (pkg_dpath / '__init__.py').read_text()
+    assert text.startswith("__lazy__ = ['hea*']")
+    assert 'import heavy' not in text
+    assert 'from mkinit_hybrid_decl_pkg.light import (light_func,)' in text
+    _check_hybrid(dpath, pkgname)
+
+    # Regenerating is idempotent
+    mkinit.autogen_init(pkg_dpath, dry=False)
+    assert (pkg_dpath / '__init__.py').read_text() == text
+
+
+def test_hybrid_lazy_import_costs():
+    import mkinit
+    from mkinit.import_profile import ImportCost, ImportProfile
+
+    pkgname = 'mkinit_hybrid_costs_pkg'
+    dpath = ub.Path.appdir('mkinit/tests/hybrid_lazy').ensuredir()
+    pkg_dpath = _make_package(dpath, pkgname)
+    costs_fpath = dpath / 'costs.json'
+    prof = ImportProfile(
+        pkgname,
+        [
+            ImportCost(pkgname + '.light', 100, 500),
+            ImportCost(pkgname + '.heavy', 100, 25000),
+        ],
+    )
+    costs_fpath.write_text(prof.dumps())
+
+    options = {'import_costs': os.fspath(costs_fpath), 'lazy_threshold': 20}
+    mkinit.autogen_init(pkg_dpath, options=options, dry=False)
+    _check_hybrid(dpath, pkgname)
+
+    # Above the threshold nothing is lazy
+    options['lazy_threshold'] = 30
+    text = mkinit.static_init(pkg_dpath, options=options)
+    assert 'lazy_import' not in text
+    assert 'heavy_func' in text
@@ -0,0 +1,68 @@
+import json
+import sys
+
+import ubelt as ub
+
+
+def test_profile_submodules():
+    """
+    Submodules are profiled in isolation from the package ``__init__``,
+    except when they need a name it defines.
+    """
+    from mkinit.import_profile import profile_submodules
+
+    pkgname = 'mkinit_import_profile_pkg'
+    dpath = ub.Path.appdir('mkinit/tests/import_profile').delete()
+    pkg_dpath = (dpath / pkgname).ensuredir()
+    (pkg_dpath / '__init__.py').write_text(
+        'import time\ntime.sleep(0.2)\nSETTING = 1\n'
+    )
+    (pkg_dpath / 'light.py').write_text('x = 1\n')
+    (pkg_dpath / 'heavy.py').write_text(
+        'import time\ntime.sleep(0.05)\nfrom . import light\n'
+    )
+    (pkg_dpath / 'needs_init.py').write_text(f'from {pkgname} import SETTING\n')
+    (pkg_dpath / 'broken.py').write_text('raise RuntimeError("nope")\n')
+
+    prof = profile_submodules(pkg_dpath)
+    costs = {cost.modname.split('.')[-1]: cost for cost in prof.costs}
+    assert set(costs) == {'broken', 'heavy', 'light', 'needs_init'}
+
+    heavy = costs['heavy']
+    assert heavy.isolated and heavy.error is None
+    assert heavy.self_us >= 50000
+    assert pkgname + '.light' in heavy.modules
+    # The sleep in the __init__ is not included
+    assert heavy.cumulative_us < 200000
+
+    assert not costs['needs_init'].isolated
+    assert costs['needs_init'].cumulative_us >= 200000
+    assert 'nope' in costs['broken'].error
+
+    # Failures go last, the rest is sorted by cumulative time
+    assert prof.costs[-1] is costs['broken']
+    assert prof.costs[0] is costs['needs_init']
+
+    data = json.loads(prof.dumps())
+    assert data['costs'][1]['num_modules'] == len(heavy.modules)
+    text = prof.format_table()
+    assert '(with parents)' in text and '(failed)' in text
+
+
+def test_import_profile_cli():
+    info = ub.cmd(
+        [
+            sys.executable,
+            '-m',
+            'mkinit',
+            'mkinit.util',
+            '--import-profile=json',
+        ],
+    )
+    assert info['ret'] == 0, info['err']
+    data = json.loads(info['out'])
+    assert data['modname'] == 'mkinit.util'
+    assert {cost['modname'] for cost in data['costs']} >= {
+        'mkinit.util.util_diff',
+        'mkinit.util.util_import',
+    }
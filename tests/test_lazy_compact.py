@@ -0,0 +1,73 @@
+import os
+import sys
+
+import ubelt as ub
+
+
+def _make_wide_package(dpath, pkgname, num_modules=3, num_attrs=40):
+    pkg_dpath = (dpath / pkgname).ensuredir()
+    (pkg_dpath / '__init__.py').write_text('')
+    for mod_idx in range(num_modules):
+        lines = [
+            f'm{mod_idx}_name{attr_idx} = {attr_idx}'
+            for attr_idx in range(num_attrs)
+        ]
+        (pkg_dpath / f'mod{mod_idx}.py').write_text('\n'.join(lines) + '\n')
+    return pkg_dpath
+
+
+def test_lazy_compact_import():
+    """
+    The compact table resolves the same names as the default one, both on
+    attribute access and with EAGER_IMPORT.
+    """
+    import mkinit
+
+    pkgname = 'mkinit_lazy_compact_pkg'
+    dpath = ub.Path.appdir('mkinit/tests/lazy_compact').delete()
+    pkg_dpath = _make_wide_package(dpath, pkgname)
+
+    default_text = mkinit.static_init(pkg_dpath, options={'lazy_import': True})
+    mkinit.autogen_init(
+        pkg_dpath,
+        options={'lazy_import': True, 'lazy_compact': True},
+        dry=False,
+    )
+    text = (pkg_dpath / '__init__.py').read_text()
+    assert "submodules='mod0 mod1 mod2'" in text
+    assert 'name_to_submod = {}' in text
+    assert len(text) < len(default_text)
+
+    code = ub.codeblock(
+        f"""
+        import sys
+        import {pkgname} as pkg
+        assert '{pkgname}.mod1' not in sys.modules
+        assert pkg.m1_name39 == 39
+        assert pkg.m0_name0 == 0
+        assert pkg.mod2.m2_name5 == 5
+        try:
+            pkg.does_not_exist
+        except AttributeError:
+            pass
+        else:
+            raise AssertionError('expected an AttributeError')
+        assert sorted(dir(pkg)) == sorted(pkg.__all__)
+        """
+    )
+    env = os.environ.copy()
+    env.pop('EAGER_IMPORT', None)
+    env['PYTHONPATH'] = os.fspath(dpath)
+    info = ub.cmd([sys.executable, '-c', code], env=env)
+    assert info['ret'] == 0, info['err']
+
+    code = ub.codeblock(
+        f"""
+        import {pkgname} as pkg
+        assert 'm2_name39' in vars(pkg)
+        assert 'mod1' in vars(pkg)
+        """
+    )
+    env['EAGER_IMPORT'] = '1'
+    info = ub.cmd([sys.executable, '-c', code], env=env)
+    assert info['ret'] == 0, info['err']
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import ubelt as ub
+
+RECORD_THREAD = ub.codeblock(
+    """
+    import threading
+    import time
+    time.sleep(0.05)
+    thread_ident = threading.get_ident()
+    """
+)
+
+
+def test_lazy_parallel_eager_warmup():
+    """
+    Independent submodules are warmed on worker threads, and a submodule that
+    imports its package is warmed on the importing thread without deadlock.
+    """
+    import mkinit
+
+    pkgname = 'mkinit_lazy_parallel_eager_pkg'
+    dpath = ub.Path.appdir('mkinit/tests/lazy_parallel_eager').delete()
+    pkg_dpath = (dpath / pkgname).ensuredir()
+    (pkg_dpath / '__init__.py').write_text('')
+    # a depends on c and d imports the package, so a, c and d are serial
+    (pkg_dpath / 'a.py').write_text(
+        'from .c import helper\n' + RECORD_THREAD + '\na_func = helper\n'
+    )
+    (pkg_dpath / 'c.py').write_text(RECORD_THREAD + '\nhelper = 1\n')
+    (pkg_dpath / 'd.py').write_text(
+        'from . import c\n' + RECORD_THREAD + '\nd_func = c\n'
+    )
+    # b and e are independent and f is imported by e
+    (pkg_dpath / 'b.py').write_text(RECORD_THREAD + '\nb_func = 1\n')
+    (pkg_dpath / 'e.py').write_text(
+        f'from {pkgname}.f import f_func\n' + RECORD_THREAD + '\ne_func = 1\n'
+    )
+    (pkg_dpath / 'f.py').write_text(RECORD_THREAD + '\nf_func = 1\n')
+
+    mkinit.autogen_init(
+        pkg_dpath,
+        options={'lazy_import': True, 'lazy_parallel_eager': True},
+        dry=False,
+    )
+    text = (pkg_dpath / '__init__.py').read_text()
+    assert "['b']" in text and "['f', 'e']" in text
+
+    code = ub.codeblock(
+        f"""
+        import sys
+        import threading
+        import {pkgname} as pkg
+        main = threading.get_ident()
+        for name in ['a', 'b', 'c', 'd', 'e', 'f']:
+            assert name + '_func' in vars(pkg) or name == 'c', name
+        mods = {{
+            name: sys.modules['{pkgname}.' + name]
+            for name in ['a', 'b', 'c', 'd', 'e', 'f']
+        }}
+        assert mods['d'].thread_ident == main
+        assert mods['a'].thread_ident == main
+        assert mods['b'].thread_ident != main
+        assert mods['e'].thread_ident != main
+        assert mods['e'].thread_ident == mods['f'].thread_ident
+        """
+    )
+    env = os.environ.copy()
+    env['EAGER_IMPORT'] = '1'
+    env['PYTHONPATH'] = os.fspath(dpath)
+    info = ub.cmd([sys.executable, '-c', code], env=env, timeout=60)
+    assert info['ret'] == 0, info['err']
@@ -0,0 +1,72 @@
+import json
+import os
+import sys
+
+import ubelt as ub
+
+
+def test_lazy_sidecar_index():
+    """
+    The lazy table is loaded from the sidecar index, and an index that does
+    not match the hash in the init is detected.
+    """
+    import mkinit
+
+    pkgname = 'mkinit_lazy_sidecar_pkg'
+    dpath = ub.Path.appdir('mkinit/tests/lazy_sidecar').delete()
+    pkg_dpath = (dpath / pkgname).ensuredir()
+    (pkg_dpath / '__init__.py').write_text('')
+    (pkg_dpath / 'a.py').write_text('a_func = 1\n')
+    (pkg_dpath / 'b.py').write_text('b_func = 2\nb_other = 3\n')
+
+    options = {'lazy_import': True, 'lazy_sidecar': True}
+    mkinit.autogen_init(pkg_dpath, options=options, dry=False)
+    index_fpath = pkg_dpath / '_mkinit_index.json'
+    index = json.loads(index_fpath.read_text())
+    assert index['name_to_submod'] == {
+        'a_func': 'a',
+        'b_func': 'b',
+        'b_other': 'b',
+    }
+    text = (pkg_dpath / '__init__.py').read_text()
+    assert "index_hash='{}'".format(index['hash']) in text
+    assert 'submod_attrs' not in text.split('def lazy_import')[0]
+    assert not mkinit.autogen_init(pkg_dpath, options=options, check=True)
+
+    code = ub.codeblock(
+        f"""
+        import sys
+        import {pkgname} as pkg
+        assert '{pkgname}.b' not in sys.modules
+        assert pkg.b_other == 3
+        assert pkg.a.a_func == 1
+        assert sorted(dir(pkg)) == sorted(pkg.__all__)
+        """
+    )
+    env = os.environ.copy()
+    env.pop('EAGER_IMPORT', None)
+    env['PYTHONPATH'] = os.fspath(dpath)
+    info = ub.cmd([sys.executable, '-c', code], env=env)
+    assert info['ret'] == 0, info['err']
+
+    code = f'import {pkgname} as pkg; assert "b_func" in vars(pkg)'
+    info = ub.cmd(
+        [sys.executable, '-c', code], env={**env, 'EAGER_IMPORT': '1'}
+    )
+    assert info['ret'] == 0, info['err']
+
+    # A new module makes both the init and the index out of date
+    (pkg_dpath / 'c.py').write_text('c_func = 4\n')
+    out_of_date = mkinit.autogen_init(pkg_dpath, options=options, check=True)
+    assert sorted(ub.Path(p).name for p in out_of_date) == [
+        '__init__.py',
+        '_mkinit_index.json',
+    ]
+
+    # An index that does not belong to the init is rejected at runtime
+    index['hash'] = '0' * 16
+    index_fpath.write_text(json.dumps(index))
+    code = f'import {pkgname} as pkg; pkg.a_func'
+    info = ub.cmd([sys.executable, '-c', code], env=env)
+    assert info['ret'] != 0
+    assert 'ImportError' in info['err'] and 'out of date' in info['err']
@@ -0,0 +1,51 @@
+import json
+import os
+import sys
+
+import ubelt as ub
+
+
+def test_lazy_telemetry_dump():
+    """
+    The instrumented boilerplate records the resolved names and dumps them at
+    exit when LAZY_IMPORT_TELEMETRY names a file.
+    """
+    import mkinit
+
+    pkgname = 'mkinit_lazy_telemetry_pkg'
+    dpath = ub.Path.appdir('mkinit/tests/lazy_telemetry').delete().ensuredir()
+    pkg_dpath = (dpath / pkgname).ensuredir()
+    (pkg_dpath / '__init__.py').write_text('')
+    (pkg_dpath / 'fast.py').write_text('def func():\n    pass\n')
+    (pkg_dpath / 'slow.py').write_text(
+        'import time\ntime.sleep(0.05)\n\n\ndef slow_func():\n    pass\n'
+    )
+    mkinit.autogen_init(
+        pkg_dpath,
+        options={'lazy_import': True, 'lazy_telemetry': True},
+        dry=False,
+    )
+
+    dump_fpath = dpath / 'telemetry.jsonl'
+    code = ub.codeblock(
+        f"""
+        import {pkgname}
+        {pkgname}.func
+        {pkgname}.slow_func
+        times = {pkgname}.__lazy_import_times__
+        assert sorted(times) == ['func', 'slow_func'], times
+        """
+    )
+    env = os.environ.copy()
+    env['LAZY_IMPORT_TELEMETRY'] = os.fspath(dump_fpath)
+    env['PYTHONPATH'] = os.fspath(dpath)
+    info = ub.cmd([sys.executable, '-c', code], env=env)
+    assert info['ret'] == 0, info['err']
+
+    records = [json.loads(line) for line in dump_fpath.read_text().splitlines()]
+    assert len(records) == 1
+    assert records[0]['module'] == pkgname
+    import_times = records[0]['import_times']
+    assert import_times['slow_func']['submodule'] == pkgname + '.slow'
+    assert import_times['func']['submodule'] == pkgname + '.fast'
+    assert import_times['slow_func']['seconds'] >= 0.05
@@ -0,0 +1,92 @@
+import os
+import random
+import sys
+import threading
+
+import ubelt as ub
+
+HEAVY_TEXT = ub.codeblock(
+    """
+    import threading
+    import time
+
+    __all__ = [
+        'resource_0', 'resource_1', 'resource_2', 'resource_3',
+        'resource_4', 'resource_5', 'resource_6', 'resource_7',
+    ]
+
+    num_resolved = {name: 0 for name in __all__}
+    _count_lock = threading.Lock()
+
+
+    def __getattr__(name):
+        # Simulates an expensive attribute that should only be built once
+        if name in num_resolved:
+            with _count_lock:
+                num_resolved[name] += 1
+            time.sleep(0.01)
+            return object()
+        raise AttributeError(name)
+    """
+)
+
+
+def test_lazy_thread_safe_stress():
+    """
+    Many threads access the names of a thread safe lazy module for the first
+    time at once. Each name must be resolved exactly once and every thread
+    must see the same object.
+    """
+    import mkinit
+
+    pkgname = 'mkinit_lazy_thread_safe_pkg'
+    dpath = ub.Path.appdir('mkinit/tests/lazy_thread_safe').delete().ensuredir()
+    pkg_dpath = (dpath / pkgname).ensuredir()
+    (pkg_dpath / '__init__.py').write_text('')
+    (pkg_dpath / 'heavy.py').write_text(HEAVY_TEXT)
+
+    mkinit.autogen_init(
+        pkg_dpath,
+        options={'lazy_import': True, 'lazy_thread_safe': True},
+        dry=False,
+    )
+    text = (pkg_dpath / '__init__.py').read_text()
+    assert 'name_locks' in text
+
+    num_threads = 32
+    barrier = threading.Barrier(num_threads)
+    results = [None] * num_threads
+    errors = []
+
+    with ub.util_import.PythonPathContext(os.fspath(dpath)):
+        module = ub.import_module_from_name(pkgname)
+        names = list(module.__all__)
+        names.remove('heavy')
+
+        def worker(idx):
+            order = names[:]
+            random.Random(idx).shuffle(order)
+            try:
+                barrier.wait()
+                results[idx] = {name: getattr(module, name) for name in order}
+            except Exception as ex:  # nocover
+                errors.append(ex)
+
+        threads = [
+            threading.Thread(target=worker, args=(idx,))
+            for idx in range(num_threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    try:
+        assert not errors
+        heavy = sys.modules[pkgname + '.heavy']
+        assert heavy.num_resolved == {name: 1 for name in names}
+        for name in names:
+            assert len({id(result[name]) for result in results}) == 1
+    finally:
+        for key in [pkgname, pkgname + '.heavy']:
+            sys.modules.pop(key, None)
@@ -0,0 +1,102 @@
+"""
+Tests for the memoized module name resolver
+"""
+
+import sys
+from os.path import join
+
+import ubelt as ub
+
+
+def test_resolver_matches_syspath_lookup():
+    from mkinit.util.util_import import (
+        ModnameResolver,
+        _syspath_modname_to_modpath,
+    )
+
+    resolver = ModnameResolver()
+    modnames = [
+        'xdoctest',
+        'xdoctest.static_analysis',
+        'xdoctest.__main__',
+        'mkinit.util.util_import',
+        'ubelt',
+        'os',
+        'json.decoder',
+        '_ctypes',
+        'this_module_does_not_exist',
+        'xdoctest.does_not_exist',
+    ]
+    for _ in range(2):
+        for modname in modnames:
+            expected = _syspath_modname_to_modpath(modname)
+            assert resolver.resolve(modname) == expected, modname
+            assert resolver.resolve(modname, sys_path=[]) is None
+    assert resolver.hits > 0
+
+    modname = 'xdoctest.static_analysis'
+    modpath = resolver.resolve(modname)
+    exclude = [modpath.split('xdoctest')[0]]
+    assert resolver.resolve(
+        modname, exclude=exclude
+    ) == _syspath_modname_to_modpath(modname, exclude=exclude)
+
+
+def test_resolver_invalidation():
+    from mkinit.util.util_import import ModnameResolver
+
+    dpath = ub.Path.appdir('mkinit/tests/resolver').delete().ensuredir()
+    resolver = ModnameResolver()
+    sys_path = [str(dpath)]
+
+    assert resolver.resolve('resolver_pkg.mod', sys_path=sys_path) is None
+
+    pkg = (dpath / 'resolver_pkg').ensuredir()
+    (pkg / '__init__.py').touch()
+    (pkg / 'mod.py').touch()
+    found = resolver.resolve('resolver_pkg.mod', sys_path=sys_path)
+    assert found == str(pkg / 'mod.py')
+
+    # A package directory takes precedence over a module file
+    (pkg / 'mod').ensuredir()
+    (pkg / 'mod' / '__init__.py').touch()
+    found = resolver.resolve('resolver_pkg.mod', sys_path=sys_path)
+    assert found == str(pkg / 'mod')
+
+    # Changes to the search path are respected
+    other = ub.Path.appdir('mkinit/tests/resolver_other').delete().ensuredir()
+    (other / 'resolver_pkg.py').touch()
+    found = resolver.resolve('resolver_pkg', sys_path=[str(other)] + sys_path)
+    assert found == str(other / 'resolver_pkg.py')
+    sys.path.insert(0, str(other))
+    try:
+        assert resolver.resolve('resolver_pkg') == str(
+            other / 'resolver_pkg.py'
+        )
+    finally:
+        sys.path.remove(str(other))
+    assert resolver.resolve('resolver_pkg') != str(other / 'resolver_pkg.py')
+
+
+def test_resolver_is_bounded():
+    from mkinit.util.util_import import ModnameResolver
+
+    dpath = ub.Path.appdir('mkinit/tests/resolver_bounded').delete()
+    dpath.ensuredir()
+    resolver = ModnameResolver(max_results=3, max_dirs=2)
+    sys_paths = []
+    for idx in range(5):
+        sub = (dpath / 'path{}'.format(idx)).ensuredir()
+        (sub / 'bounded_mod.py').touch()
+        sys_paths.append([str(sub)])
+
+    for sys_path in sys_paths:
+        found = resolver.resolve('bounded_mod', sys_path=sys_path)
+        assert found == join(sys_path[0], 'bounded_mod.py')
+    assert len(resolver._memo) == 3
+    assert len(resolver._dirs) == 2
+
+    # The most recently used results are kept and still correct
+    found = resolver.resolve('bounded_mod', sys_path=sys_paths[-1])
+    assert found == join(sys_paths[-1][0], 'bounded_mod.py')
+    assert list(resolver._memo)[-1][1] == tuple(sys_paths[-1])
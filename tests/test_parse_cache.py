@@ -0,0 +1,128 @@
+"""
+Tests for the persistent parse cache
+"""
+
+import os
+
+import ubelt as ub
+
+
+def test_parse_cache_invalidation():
+    from mkinit.cache import ParseCache
+    from mkinit.static_mkinit import _extract_attributes
+
+    dpath = ub.Path.appdir('mkinit/tests/parse_cache/invalidate')
+    dpath.delete().ensuredir()
+    fpath = dpath / 'mod.py'
+    fpath.write_text('def foo(): pass\n')
+
+    cache = ParseCache(dpath / 'cache')
+
+    def extract(source):
+        return _extract_attributes(source=source)
+
+    assert cache.extract_attributes(fpath, True, extract) == ['foo']
+    assert cache.extract_attributes(fpath, True, extract) == ['foo']
+    # respect_all is part of the key
+    assert cache.extract_attributes(fpath, False, extract) == ['foo']
+    assert cache.misses == 2
+
+    # Changing the content invalidates the entry, even with the same mtime
+    stat = os.stat(fpath)
+    fpath.write_text('def bar(): pass\n')
+    os.utime(fpath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.extract_attributes(fpath, True, extract) == ['bar']
+    assert cache.misses == 3
+
+    # Touching the file without changing content is still a hit
+    os.utime(fpath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.extract_attributes(fpath, True, extract) == ['bar']
+    assert cache.misses == 3
+
+
+def test_parse_cache_lru_eviction():
+    from mkinit.cache import ParseCache
+
+    dpath = ub.Path.appdir('mkinit/tests/parse_cache/evict')
+    dpath.delete().ensuredir()
+    cache = ParseCache(dpath / 'cache', max_entries=10)
+
+    fpaths = []
+    for idx in range(12):
+        fpath = dpath / 'mod{}.py'.format(idx)
+        fpath.write_text('attr{} = 1\n'.format(idx))
+        fpaths.append(fpath)
+
+    def extract(source):
+        return [source.split(' ')[0]]
+
+    for idx, fpath in enumerate(fpaths[:10]):
+        cache.extract_attributes(fpath, True, extract)
+        # Make the access order unambiguous on coarse filesystem clocks
+        for entry_fpath in cache._entry_fpaths():
+            stat = os.stat(entry_fpath)
+            os.utime(
+                entry_fpath, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9)
+            )
+
+    # Overflowing the cache evicts down to 90% of its capacity
+    cache.extract_attributes(fpaths[10], True, extract)
+    assert len(cache._entry_fpaths()) == 9
+    # The oldest entries are evicted first
+    misses = cache.misses
+    cache.extract_attributes(fpaths[0], True, extract)
+    assert cache.misses == misses + 1
+    cache.extract_attributes(fpaths[10], True, extract)
+    assert cache.misses == misses + 1
+
+
+def test_static_init_uses_parse_cache():
+    import mkinit
+    from mkinit import cache
+
+    dpath = ub.Path.appdir('mkinit/tests/parse_cache/static_init')
+    dpath.delete().ensuredir()
+    pkg = (dpath / 'cached_pkg').ensuredir()
+    (pkg / '__init__.py').write_text('')
+    (pkg / 'submod.py').write_text('def func(): pass\n')
+
+    parse_cache = cache.ParseCache(dpath / 'cache')
+    prev = cache.get_parse_cache()
+    cache.set_parse_cache(parse_cache)
+    try:
+        text1 = mkinit.static_init(pkg)
+        text2 = mkinit.static_init(pkg)
+    finally:
+        cache.set_parse_cache(prev)
+    assert text1 == text2
+    assert 'func' in text1
+    assert parse_cache.misses == 1
+    assert parse_cache.hits == 1
+
+
+def test_parse_cache_extract_schema_in_key(monkeypatch):
+    """
+    Bumping the extraction schema invalidates cached results and manifest
+    keys even if the mkinit version is the same.
+    """
+    from mkinit import cache, manifest
+    from mkinit.manifest import Manifest
+    from mkinit.static_mkinit import _extract_attributes
+
+    dpath = ub.Path.appdir('mkinit/tests/parse_cache/schema')
+    dpath.delete().ensuredir()
+    fpath = dpath / 'mod.py'
+    fpath.write_text('def foo(): pass\n')
+    parse_cache = cache.ParseCache(dpath / 'cache')
+
+    def extract(source):
+        return _extract_attributes(source=source)
+
+    parse_cache.extract_attributes(fpath, True, extract)
+    key1 = Manifest.package_key({})
+    new_version = cache._EXTRACT_SCHEMA_VERSION + 1
+    monkeypatch.setattr(cache, '_EXTRACT_SCHEMA_VERSION', new_version)
+    monkeypatch.setattr(manifest, '_EXTRACT_SCHEMA_VERSION', new_version)
+    parse_cache.extract_attributes(fpath, True, extract)
+    assert parse_cache.misses == 2
+    assert Manifest.package_key({}) != key1
@@ -0,0 +1,57 @@
+"""
+Tests for the per-phase profile of a run
+"""
+
+import ubelt as ub
+
+
+def _make_package(dpath):
+    root = (dpath / 'prof_root').ensuredir()
+    sub = (root / 'sub').ensuredir()
+    for pkg in [root, sub]:
+        (pkg / '__init__.py').write_text('')
+    (root / 'mod.py').write_text('def root_func(): pass\n')
+    (sub / 'leaf.py').write_text('def leaf_func(): pass\n')
+    return root, sub
+
+
+def test_profile_recursive_autogen():
+    from mkinit import cache
+    from mkinit.static_mkinit import autogen_init
+
+    dpath = ub.Path.appdir('mkinit/tests/profiling/serial').delete().ensuredir()
+    root, sub = _make_package(dpath)
+    prev = cache.get_parse_cache()
+    cache.set_parse_cache(None)
+    try:
+        prof = autogen_init(root, recursive=True, profile=True)
+    finally:
+        cache.set_parse_cache(prev)
+    phases = prof.phases
+    assert phases['discover']['calls'] >= 1
+    assert phases['parse']['calls'] >= 2
+    assert phases['write']['calls'] == 2
+    assert phases['format']['calls'] == 2
+    for row in phases.values():
+        assert 0 <= row['self_seconds'] <= row['seconds'] + 1e-9
+    fpaths = [fpath for fpath, _ in prof.slowest_files(top=None)]
+    assert str(sub / 'leaf.py') in fpaths
+    assert str(root / '__init__.py') in fpaths
+    assert len(prof.slowest_files(top=1)) == 1
+    assert 'leaf_func' in (root / '__init__.py').read_text()
+
+
+def test_profile_merges_worker_phases():
+    from mkinit.profiling import Profile
+    from mkinit.static_mkinit import autogen_init
+
+    dpath = ub.Path.appdir('mkinit/tests/profiling/jobs').delete().ensuredir()
+    root, sub = _make_package(dpath)
+    prof = Profile()
+    # A given profile is populated and the usual value is returned
+    ret = autogen_init(root, recursive=True, jobs=2, profile=prof)
+    assert ret is None
+    assert prof.phases['format']['calls'] == 2
+    data = prof.to_dict()
+    assert list(data['phases'])[0] == 'discover'
+    assert 'Slowest files' in prof.format_table()
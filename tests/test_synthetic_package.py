@@ -0,0 +1,61 @@
+"""
+Tests for the synthetic packages used by the benchmarks in dev/bench
+"""
+
+import subprocess
+import sys
+from os.path import dirname, join
+
+import pytest
+import ubelt as ub
+
+BENCH_DPATH = join(dirname(dirname(__file__)), 'dev', 'bench')
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_synthetic_package_survives_regeneration(lazy):
+    """
+    The user code of synthetic inits is kept when mkinit regenerates them,
+    and the generated package can be imported.
+    """
+    import mkinit
+
+    sys.path.insert(0, BENCH_DPATH)
+    try:
+        from synthetic_package import make_synthetic_package
+    finally:
+        sys.path.remove(BENCH_DPATH)
+
+    dpath = ub.Path.appdir('mkinit/tests/synthetic', str(lazy)).delete()
+    info = make_synthetic_package(
+        dpath.ensuredir(),
+        num_modules=30,
+        modules_per_package=5,
+        decl_density=1.0,
+        # Only the lazy boilerplate supports __module_properties__
+        module_properties=lazy,
+    )
+    root = ub.Path(info['root'])
+    init_fpaths = sorted(root.glob('**/__init__.py'))
+    user_fpaths = [p for p in init_fpaths if 'user_func' in p.read_text()]
+    assert user_fpaths
+
+    options = {'lazy_import': lazy}
+    for _ in range(2):
+        mkinit.autogen_init(root, recursive=True, options=options)
+    for fpath in user_fpaths:
+        assert 'def user_func' in fpath.read_text()
+
+    modnames = [
+        '.'.join(p.parent.relative_to(dpath).parts) for p in user_fpaths
+    ]
+    code = ub.codeblock(
+        """
+        import importlib
+        for modname in {!r}:
+            module = importlib.import_module(modname)
+            assert module.user_func() == 1
+            assert 'user_func' in module.__all__
+        """
+    ).format(modnames)
+    subprocess.run([sys.executable, '-c', code], cwd=dpath, check=True)
@@ -0,0 +1,170 @@
+"""
+Tests for the watch mode
+"""
+
+import ubelt as ub
+
+
+def test_watch_regenerates_affected_packages():
+    from mkinit.watch import Watcher
+
+    dpath = ub.Path.appdir('mkinit/tests/watch/recursive').delete().ensuredir()
+    root = (dpath / 'watched_root').ensuredir()
+    sub = (root / 'sub').ensuredir()
+    other = (root / 'other').ensuredir()
+    for pkg in [root, sub, other]:
+        (pkg / '__init__.py').write_text('')
+    (sub / 'leaf.py').write_text('def leaf_func(): pass\n')
+    (other / 'thing.py').write_text('def thing_func(): pass\n')
+
+    self = Watcher(root, recursive=True, debounce=0)
+    self.start()
+    assert 'leaf_func' in (root / '__init__.py').read_text()
+
+    # A new name propagates to the subpackage and its parent only
+    (sub / 'leaf.py').write_text(
+        'def leaf_func(): pass\ndef new_func(): pass\n'
+    )
+    written = self.poll_once()
+    assert written == [str(sub / '__init__.py'), str(root / '__init__.py')]
+    assert 'new_func' in (root / '__init__.py').read_text()
+
+    # Our own writes are not reported as changes
+    assert self.poll_once() == []
+
+    # Changing a module without changing its names regenerates nothing
+    (other / 'thing.py').write_text('def thing_func():\n    return 1\n')
+    assert self.poll_once() == []
+
+    # New modules are picked up
+    (other / 'added.py').write_text('def added_func(): pass\n')
+    written = self.poll_once()
+    assert written == [str(other / '__init__.py'), str(root / '__init__.py')]
+    assert 'added_func' in (root / '__init__.py').read_text()
+
+    # Editing the user section of an init regenerates that package
+    text = (sub / '__init__.py').read_text()
+    (sub / '__init__.py').write_text("__private__ = ['leaf']\n" + text)
+    written = self.poll_once()
+    assert str(sub / '__init__.py') in written
+    assert 'leaf_func' not in (root / '__init__.py').read_text()
+
+
+def test_watch_rediscovers_packages_only_on_dir_changes(monkeypatch):
+    from mkinit import static_analysis
+    from mkinit.watch import Watcher
+
+    dpath = ub.Path.appdir('mkinit/tests/watch/discover').delete().ensuredir()
+    root = (dpath / 'discover_root').ensuredir()
+    (root / '__init__.py').write_text('')
+    (root / 'mod.py').write_text('def mod_func(): pass\n')
+
+    num_discovers = 0
+    package_modpaths = static_analysis.package_modpaths
+
+    def counted(*args, **kwargs):
+        nonlocal num_discovers
+        if not kwargs.get('with_mod', True):
+            # Count the discovery of packages, not the modules of one package
+            num_discovers += 1
+        return package_modpaths(*args, **kwargs)
+
+    monkeypatch.setattr(static_analysis, 'package_modpaths', counted)
+
+    self = Watcher(root, recursive=True, debounce=0)
+    self.start()
+    num_discovers = 0
+
+    # Editing a module does not rediscover the packages
+    (root / 'mod.py').write_text('def mod_func(): pass\ndef new_func(): pass\n')
+    self.poll_once()
+    self.poll_once()
+    assert num_discovers == 0
+
+    # A directory that becomes a package is picked up
+    sub = (root / 'sub').ensuredir()
+    self.poll_once()
+    (sub / 'leaf.py').write_text('def leaf_func(): pass\n')
+    (sub / '__init__.py').write_text('')
+    written = self.poll_once()
+    assert num_discovers > 0
+    assert str(sub / '__init__.py') in written
+    assert 'leaf_func' in (root / '__init__.py').read_text()
+
+
+def test_watch_dry_uses_pending_child_inits(capsys):
+    from mkinit.watch import Watcher
+
+    dpath = ub.Path.appdir('mkinit/tests/watch/dry').delete().ensuredir()
+    root = (dpath / 'dry_root').ensuredir()
+    sub = (root / 'sub').ensuredir()
+    for pkg in [root, sub]:
+        (pkg / '__init__.py').write_text('')
+    (sub / 'leaf.py').write_text('def leaf_func(): pass\n')
+
+    self = Watcher(root, recursive=True, dry=True, debounce=0)
+    self.start()
+    out = capsys.readouterr().out
+    # The parent sees the names of the child init that was not written
+    assert 'from dry_root.sub import (leaf, leaf_func,)' in out
+    assert (root / '__init__.py').read_text() == ''
+
+    (sub / 'leaf.py').write_text(
+        'def leaf_func(): pass\ndef new_func(): pass\n'
+    )
+    written = self.poll_once()
+    assert written == [str(sub / '__init__.py'), str(root / '__init__.py')]
+    assert 'new_func' in capsys.readouterr().out
+    assert (sub / '__init__.py').read_text() == ''
+    assert self.poll_once() == []
+
+
+def test_watch_cli_rejects_incompatible_flags(capsys):
+    import pytest
+
+    from mkinit.__main__ import main
+
+    for flags in [
+        ['--jobs', '2'],
+        ['--manifest'],
+        ['--check'],
+        ['--report', 'r.json'],
+    ]:
+        with pytest.raises(SystemExit):
+            main(['mkinit', '--watch'] + flags)
+        err = capsys.readouterr().err
+        assert '{} cannot be used with --watch'.format(flags[0]) in err
+
+
+def test_watch_only_parses_changed_files(monkeypatch):
+    from mkinit import cache, static_mkinit
+    from mkinit.watch import Watcher
+
+    # Without the parse cache every module that is looked up is parsed
+    monkeypatch.setattr(cache, '_ACTIVE_CACHE', None)
+
+    dpath = ub.Path.appdir('mkinit/tests/watch/memo').delete().ensuredir()
+    root = (dpath / 'memo_root').ensuredir()
+    (root / '__init__.py').write_text('')
+    (root / 'mod_a.py').write_text('def a_func(): pass\n')
+    (root / 'mod_b.py').write_text('def b_func(): pass\n')
+
+    self = Watcher(root, debounce=0)
+    self.start()
+
+    parsed = []
+    from_source = static_mkinit.ModuleSummary.from_source
+
+    def counted(source, fpath=None, **kwargs):
+        parsed.append(fpath)
+        return from_source(source, fpath=fpath, **kwargs)
+
+    monkeypatch.setattr(static_mkinit.ModuleSummary, 'from_source', counted)
+
+    (root / 'mod_a.py').write_text('def a_func(): pass\ndef a_new(): pass\n')
+    assert self.poll_once() == [str(root / '__init__.py')]
+    assert 'a_new' in (root / '__init__.py').read_text()
+    assert 'b_func' in (root / '__init__.py').read_text()
+    parsed = [ub.Path(p).name for p in parsed if p is not None]
+    assert 'mod_a.py' in parsed
+    assert 'mod_b.py' not in parsed
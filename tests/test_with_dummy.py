@@ -4,7 +4,7 @@ Tests run on a dummy package
 
 import os
 import sys
-from os.path import dirname, join
+from os.path import basename, dirname, join
 
 import pytest
 import ubelt as ub
@@ -317,6 +317,54 @@ def test_static_init():
     check_dummy_root_init(text)
 
 
+def test_static_all_is_module_scope():
+    """
+    Only module scope assignments of ``__all__`` and the mkinit declaration
+    variables are respected, not ones in classes, functions or main blocks.
+    """
+    import mkinit
+    from mkinit.static_mkinit import _extract_attributes
+
+    source = ub.codeblock(
+        """
+        __all__ = ['a']
+
+        def a():
+            pass
+
+        def b():
+            pass
+
+        class C:
+            __all__ = ['c']
+
+        async def d():
+            __all__ = ['d']
+
+        if __name__ == '__main__':
+            __all__ = ['e']
+        """
+    )
+    assert _extract_attributes(source=source) == ['a']
+
+    dpath = ub.Path.appdir('mkinit/tests/all_scope').delete().ensuredir()
+    pkg = (dpath / 'all_scope_pkg').ensuredir()
+    (pkg / 'mod.py').write_text(source)
+    (pkg / '__init__.py').write_text(
+        ub.codeblock(
+            """
+            __submodules__ = ['mod']
+
+            if __name__ == '__main__':
+                __submodules__ = []
+            """
+        )
+    )
+    text = mkinit.static_init(pkg)
+    assert 'from all_scope_pkg.mod import (a,)' in text
+    assert "__all__ = ['a', 'mod']" in text
+
+
 def test_static_find_locals():
     """
     python ~/code/mkinit/tests/test_with_dummy.py test_static_find_locals
@@ -501,6 +549,33 @@ def test_typed_pyi_file():
         assert "__all__ = ['a_very_nested_function'" in text
 
 
+def test_typed_lazy_single_analysis():
+    """
+    The interface and runtime init of a typed lazy package are rendered from
+    one analysis, so the package is parsed as often as an untyped one.
+    """
+    from mkinit.profiling import Profile
+    from mkinit.static_mkinit import _generate_package
+
+    cache_dpath = ub.Path.appdir('mkinit/tests').ensuredir()
+    paths = make_dummy_package(cache_dpath)
+    pkg_path = paths['root']
+
+    typed_options = {'lazy_loader': 1, 'lazy_loader_typed': 1, 'relative': 1}
+    with Profile() as typed_prof:
+        results = _generate_package(pkg_path, options=typed_options)
+    assert [basename(r[0]) for r in results] == ['__init__.pyi', '__init__.py']
+    assert 'lazy_loader.attach_stub' in results[1][2]
+    assert 'from .submod1 import (attr1, attr2' in results[0][2]
+
+    with Profile() as untyped_prof:
+        _generate_package(pkg_path, options={'lazy_loader': 1})
+    assert (
+        typed_prof.phases['parse']['calls']
+        == untyped_prof.phases['parse']['calls']
+    )
+
+
 def test_recursive_eager_autogen():
     """
     xdoctest ~/code/mkinit/tests/test_with_dummy.py test_recursive_eager_autogen
@@ -549,6 +624,243 @@ def test_recursive_eager_autogen():
         mkinit_rec_eager_autogen.a_very_nested_function()
 
 
+@pytest.mark.parametrize('dry', [False, True])
+def test_recursive_parallel_autogen(dry, capsys):
+    """
+    Parallel recursive generation should match a serial run exactly
+    """
+    import mkinit
+
+    cache_dpath = ub.Path.appdir('mkinit/tests').ensuredir()
+
+    def _run(jobs):
+        paths = make_dummy_package(cache_dpath, pkgname='mkinit_rec_parallel')
+        mkinit.autogen_init(
+            paths['root'], dry=dry, diff=dry, recursive=True, jobs=jobs
+        )
+        output = capsys.readouterr().out
+        texts = {
+            os.path.relpath(fpath, paths['root']): ub.Path(fpath).read_text()
+            for fpath in sorted(ub.Path(paths['root']).glob('**/__init__.py'))
+        }
+        return output, texts
+
+    serial = _run(jobs=1)
+    parallel = _run(jobs=3)
+    assert serial == parallel
+    if not dry:
+        assert 'a_very_nested_function' in serial[1]['__init__.py']
+
+
+def test_recursive_autogen_reads_each_init_once(monkeypatch):
+    """
+    The manifest check, the ``__external__`` lookup, the sidecar and the
+    generation of a package share one read of its files.
+    """
+    import builtins
+
+    import mkinit
+
+    dpath = ub.Path.appdir('mkinit/tests/read_once').delete().ensuredir()
+    root = (dpath / 'read_once_pkg').ensuredir()
+    (root / 'mod.py').write_text('def func():\n    pass\n')
+    (root / '__init__.py').write_text(
+        "__external__ = ['mkinit.util.util_diff']\n"
+    )
+    manifest_fpath = dpath / 'manifest.json'
+    options = {'lazy_import': True, 'lazy_sidecar': True}
+    mkinit.autogen_init(
+        root, recursive=True, options=options, manifest=manifest_fpath
+    )
+    # Make the package stale, so it is checked and then generated
+    (root / 'mod.py').write_text('def func2():\n    pass\n')
+
+    own_fpaths = {str(root / '__init__.py'), str(root / '_mkinit_index.json')}
+    reads = []
+    orig_open = builtins.open
+
+    def counting_open(file, mode='r', *args, **kwargs):
+        if str(file) in own_fpaths and 'r' in mode:
+            reads.append(str(file))
+        return orig_open(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', counting_open)
+    mkinit.autogen_init(
+        root, recursive=True, options=options, manifest=manifest_fpath
+    )
+    monkeypatch.undo()
+    assert sorted(reads) == sorted(own_fpaths)
+    assert 'func2' in (root / '__init__.py').read_text()
+    assert 'difftext' in (root / '_mkinit_index.json').read_text()
+
+
+def test_recursive_manifest_autogen(capsys):
+    """
+    Packages whose inputs are unchanged should be skipped when a manifest is
+    given, without changing the output.
+    """
+    import mkinit
+    from mkinit.manifest import Manifest
+
+    cache_dpath = ub.Path.appdir('mkinit/tests').ensuredir()
+    paths = make_dummy_package(cache_dpath, pkgname='mkinit_rec_manifest')
+    root = ub.Path(paths['root'])
+    manifest_fpath = cache_dpath / '.mkinit-manifest.json'
+    manifest_fpath.delete()
+    init_fpaths = sorted(root.glob('**/__init__.py'))
+
+    mkinit.autogen_init(root, recursive=True, manifest=True)
+    assert manifest_fpath.exists()
+    texts1 = {fpath: fpath.read_text() for fpath in init_fpaths}
+
+    manifest = Manifest(manifest_fpath)
+    mkinit.autogen_init(root, recursive=True, manifest=manifest)
+    assert manifest.num_skipped == len(init_fpaths)
+    assert texts1 == {fpath: fpath.read_text() for fpath in init_fpaths}
+
+    # Changing a nested module regenerates its package and the parents
+    ub.Path(paths['long_submod']).write_text('def new_func(): pass\n')
+    manifest = Manifest(manifest_fpath)
+    mkinit.autogen_init(root, recursive=True, manifest=manifest)
+    assert manifest.num_skipped == 2
+    assert 'new_func' in (root / '__init__.py').read_text()
+
+    # Adding a submodule is detected via the directory listing
+    (root / 'submod3.py').write_text('def added_func(): pass\n')
+    manifest = Manifest(manifest_fpath)
+    mkinit.autogen_init(root, recursive=True, manifest=manifest)
+    assert manifest.num_skipped == len(init_fpaths) - 1
+    assert 'added_func' in (root / '__init__.py').read_text()
+
+    # In diff mode skipped packages produce the same output as a full run
+    (root / 'submod3.py').write_text('def changed_func(): pass\n')
+    capsys.readouterr()
+    mkinit.autogen_init(root, recursive=True, dry=True, diff=True)
+    expected = capsys.readouterr().out
+    manifest = Manifest(manifest_fpath)
+    for _ in range(2):
+        mkinit.autogen_init(
+            root, recursive=True, dry=True, diff=True, manifest=manifest
+        )
+        assert capsys.readouterr().out == expected
+    # The root is out of date on disk, so it is never skipped in dry mode
+    assert manifest.num_skipped == 2 * (len(init_fpaths) - 1)
+    assert 'changed_func' not in (root / '__init__.py').read_text()
+
+
+def test_recursive_run_report():
+    """
+    The run report should list every package and tell if anything changed.
+    """
+    import mkinit
+    from mkinit import cache
+
+    cache_dpath = ub.Path.appdir('mkinit/tests').ensuredir()
+    paths = make_dummy_package(cache_dpath, pkgname='mkinit_rec_report')
+    root = ub.Path(paths['root'])
+    init_fpaths = sorted(root.glob('**/__init__.py'))
+    parse_cache_dpath = (cache_dpath / 'report_parse_cache').delete()
+
+    prev = cache.get_parse_cache()
+    cache.set_parse_cache(parse_cache_dpath)
+    try:
+        report = mkinit.autogen_init(root, recursive=True, report=True)
+        assert len(report.packages) == len(init_fpaths)
+        assert report.packages[-1].modpath == str(root)
+        assert report.changed
+        assert report.files_parsed > 0 and report.cache_hits == 0
+        assert report.bytes_written > 0 and report.bytes_read > 0
+        assert all(p.seconds > 0 for p in report.packages)
+
+        # Nothing changes on later runs and names come from the cache. The
+        # new __init__ files were not on disk when their parents read them,
+        # so they are only cached by the second run.
+        report = mkinit.autogen_init(root, recursive=True, report=True)
+        assert not report.changed and report.cache_hits > 0
+        report = mkinit.autogen_init(root, recursive=True, report=True, jobs=2)
+        assert not report.changed
+        assert report.changed_fpaths == []
+        assert report.files_parsed == 0 and report.cache_hits > 0
+        assert report.bytes_written == 0
+        assert [p.modpath for p in report.packages][-1] == str(root)
+        num_packages = len(report.packages)
+
+        ub.Path(paths['long_submod']).write_text('def new_func(): pass\n')
+        report = mkinit.autogen_init(
+            root, recursive=True, report=True, manifest=True
+        )
+        assert str(root / '__init__.py') in report.changed_fpaths
+        assert report.to_dict()['changed']
+
+        # With an up to date manifest every package is skipped
+        report = mkinit.autogen_init(
+            root, recursive=True, report=True, manifest=True
+        )
+        assert len(report.packages) == num_packages
+        assert all(p.skipped for p in report.packages)
+        assert not report.changed and report.bytes_read == 0
+    finally:
+        cache.set_parse_cache(prev)
+        (cache_dpath / '.mkinit-manifest.json').delete()
+
+
+def test_recursive_check(capsys):
+    """
+    Check mode should report out of date files without writing or
+    displaying anything, including the manifest.
+    """
+    import mkinit
+    from mkinit.__main__ import main
+    from mkinit.manifest import Manifest
+
+    cache_dpath = ub.Path.appdir('mkinit/tests').ensuredir()
+    paths = make_dummy_package(cache_dpath, pkgname='mkinit_rec_check')
+    root = ub.Path(paths['root'])
+    init_fpaths = sorted(root.glob('**/__init__.py'))
+    texts = {fpath: fpath.read_text() for fpath in init_fpaths}
+
+    capsys.readouterr()
+    first = mkinit.autogen_init(root, recursive=True, check=True)
+    assert len(first) == 1
+    stale = mkinit.autogen_init(
+        root, recursive=True, check=True, check_all=True, jobs=2
+    )
+    assert first[0] in stale and str(root / '__init__.py') in stale
+    assert capsys.readouterr().out == ''
+    assert texts == {fpath: fpath.read_text() for fpath in init_fpaths}
+
+    manifest_fpath = cache_dpath / '.mkinit-manifest.json'
+    manifest_fpath.delete()
+    # Check mode only reads the manifest
+    stale = mkinit.autogen_init(
+        root, recursive=True, check=True, check_all=True, manifest=True
+    )
+    assert len(stale) == len(init_fpaths)
+    assert not manifest_fpath.exists()
+
+    mkinit.autogen_init(root, recursive=True, manifest=True)
+    manifest_text = manifest_fpath.read_text()
+    manifest = Manifest(manifest_fpath)
+    stale = mkinit.autogen_init(
+        root, recursive=True, check=True, check_all=True, manifest=manifest
+    )
+    assert stale == []
+    assert manifest.num_skipped == len(init_fpaths)
+
+    # A stale package is reported without recording it in the manifest
+    ub.Path(paths['long_submod']).write_text('def new_func(): pass\n')
+    stale = mkinit.autogen_init(
+        root, recursive=True, check=True, check_all=True, manifest=True
+    )
+    assert str(root / '__init__.py') in stale
+    assert manifest_fpath.read_text() == manifest_text
+
+    # Likewise on the command line
+    assert main([str(root), '--recursive', '--check', '--manifest']) == 1
+    assert manifest_fpath.read_text() == manifest_text
+    manifest_fpath.delete()
+
+
 def test_private_module_filtering():
     """Test that __private__ filters module imports, not just attributes."""
     import mkinit
@@ -689,6 +1001,84 @@ def test_ignore_filtering():
         assert 'PUBLIC_VAR' in import_line[0], 'PUBLIC_VAR should be included'
 
 
+def test_external_declaration():
+    """Test that names from __external__ modules are exposed."""
+    import mkinit
+
+    cache_dpath = ub.Path.appdir('mkinit/tests').ensuredir()
+    root = ub.ensuredir(join(cache_dpath, 'test_external_pkg'))
+    ub.delete(root)
+    ub.ensuredir(root)
+
+    ub.Path(join(root, 'mymodule.py')).write_text('def func(): pass\n')
+    ub.Path(join(root, '__init__.py')).write_text(
+        "__external__ = ['textwrap']\n"
+    )
+
+    text = mkinit.static_init(root)
+    assert 'from textwrap import (' in text
+    assert 'dedent' in text
+    assert 'func' in text
+
+
+def test_recursive_external_resolved_once(monkeypatch):
+    """
+    Externals shared by several packages are resolved once per recursive run
+    """
+    import mkinit
+    from mkinit.util import util_import
+
+    cache_dpath = ub.Path.appdir('mkinit/tests').ensuredir()
+    root = ub.Path(cache_dpath, 'test_external_batch_pkg').delete().ensuredir()
+    (root / '__init__.py').write_text("__external__ = ['textwrap']\n")
+    for name in ['sub1', 'sub2', 'sub3']:
+        sub = (root / name).ensuredir()
+        (sub / '__init__.py').write_text("__external__ = ['textwrap']\n")
+
+    calls = []
+    orig = util_import.modname_to_modpath
+
+    def counted(modname, *args, **kwargs):
+        calls.append(modname)
+        return orig(modname, *args, **kwargs)
+
+    monkeypatch.setattr(util_import, 'modname_to_modpath', counted)
+    mkinit.autogen_init(root, recursive=True)
+    assert calls.count('textwrap') == 1
+    for fpath in root.glob('**/__init__.py'):
+        assert 'dedent' in fpath.read_text()
+
+
+def test_init_file_read_once(monkeypatch):
+    """Test that autogen_init reads the existing __init__.py only once."""
+    import builtins
+
+    import mkinit
+
+    cache_dpath = ub.Path.appdir('mkinit/tests').ensuredir()
+    root = ub.ensuredir(join(cache_dpath, 'test_init_read_once_pkg'))
+    ub.delete(root)
+    ub.ensuredir(root)
+    ub.Path(join(root, 'mymodule.py')).write_text('def func(): pass\n')
+    init_fpath = join(root, '__init__.py')
+    ub.Path(init_fpath).write_text(
+        "__protected__ = ['mymodule']\ncustom = 1\n# autogen below\n"
+    )
+
+    num_reads = []
+    orig_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        if os.fspath(file) == init_fpath:
+            num_reads.append(file)
+        return orig_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', counting_open)
+    _, text = mkinit.autogen_init(root, dry=True, diff=True)
+    assert len(num_reads) == 1
+    assert "'custom'" in text
+
+
 def test_source_order():
     """Test that source_order preserves declaration order instead of sorting."""
     import re
@@ -0,0 +1,66 @@
+"""
+Tests for skipping unchanged files and batching writes
+"""
+
+import os
+
+import pytest
+import ubelt as ub
+
+
+def _make_package(dpath):
+    root = (dpath / 'planned_root').ensuredir()
+    sub = (root / 'sub').ensuredir()
+    for pkg in [root, sub]:
+        (pkg / '__init__.py').write_text('')
+    (sub / 'leaf.py').write_text('def leaf_func(): pass\n')
+    return root, sub
+
+
+def test_unchanged_inits_are_not_rewritten():
+    from mkinit.static_mkinit import autogen_init
+
+    dpath = ub.Path.appdir('mkinit/tests/write_plan/same').delete().ensuredir()
+    root, sub = _make_package(dpath)
+    autogen_init(root, recursive=True)
+    # The parent sees the new names of its child in the same run
+    assert 'leaf_func' in (root / '__init__.py').read_text()
+
+    init_fpaths = [root / '__init__.py', sub / '__init__.py']
+    for fpath in init_fpaths:
+        os.utime(fpath, ns=(0, 0))
+    report = autogen_init(root, recursive=True, report=True)
+    assert [os.stat(f).st_mtime_ns for f in init_fpaths] == [0, 0]
+    assert report.bytes_written == 0
+    assert not any(o['written'] for p in report.packages for o in p.outputs)
+
+    (sub / 'leaf.py').write_text('def other_func(): pass\n')
+    report = autogen_init(root, recursive=True, report=True)
+    assert all(os.stat(f).st_mtime_ns > 0 for f in init_fpaths)
+    assert sorted(report.changed_fpaths) == sorted(map(str, init_fpaths))
+
+
+def test_failed_recursive_run_writes_nothing():
+    from mkinit.static_mkinit import autogen_init
+
+    dpath = ub.Path.appdir('mkinit/tests/write_plan/fail').delete().ensuredir()
+    root, sub = _make_package(dpath)
+    (root / '__init__.py').write_text("__submodules__ = ['does_not_exist']\n")
+    with pytest.raises(Exception):
+        autogen_init(root, recursive=True)
+    # The subpackage was generated first, but is not written
+    assert (sub / '__init__.py').read_text() == ''
+
+
+def test_dry_run_parent_sees_planned_child(capsys):
+    from mkinit.static_mkinit import autogen_init
+
+    dpath = ub.Path.appdir('mkinit/tests/write_plan/dry').delete().ensuredir()
+    root, sub = _make_package(dpath)
+    report = autogen_init(root, recursive=True, dry=True, report=True)
+    assert (sub / '__init__.py').read_text() == ''
+    # The root shows what it will be once the subpackage is written
+    assert capsys.readouterr().out.count('leaf_func') >= 3
+    assert report.bytes_written == 0
+    root_output = report.packages[-1].outputs[-1]
+    assert root_output['changed'] and not root_output['written']